@@ -0,0 +1,97 @@
+"""
+Benchmark del modo assets estáticos (render.assets_estaticos).
+
+Renderiza el HTML de Contraprestaciones de un agente típico con el logo en base64 y el CSS
+en línea (modo actual) y con el logo y el CSS referenciados como archivos locales, y compara:
+- tamaño del HTML que recibe wkhtmltopdf,
+- tiempo de render Jinja2,
+- tiempo de conversión a PDF por documento (solo si wkhtmltopdf está disponible).
+
+Uso:
+    python -m benchmarks.bench_assets --operaciones 40 --documentos 20
+    python -m benchmarks.bench_assets --wkhtmltopdf "C:/Program Files/wkhtmltopdf/bin/wkhtmltopdf.exe"
+"""
+import os
+import base64
+import shutil
+import argparse
+import tempfile
+import threading
+import subprocess
+from benchmarks.bench_contexto import datos_sinteticos, medir, STORE_ID
+from modules.assets_estaticos import preparar_assets
+from modules.pdf_generator import PDFGeneratorContraprestaciones
+from modules.render_pool import OPCIONES_PDF, argumentos_wkhtmltopdf
+
+TEMPLATE = "templates/template_contraprestaciones.html"
+
+
+def convertir(wkhtmltopdf: str, htmls: list, directorio: str) -> None:
+    for i, html in enumerate(htmls):
+        entrada = os.path.join(directorio, f"{i}.html")
+        with open(entrada, "w", encoding="utf-8") as f:
+            f.write(html)
+        subprocess.run(
+            [wkhtmltopdf, "--quiet", *argumentos_wkhtmltopdf(OPCIONES_PDF), entrada, os.path.join(directorio, f"{i}.pdf")],
+            check=True
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--operaciones", type=int, default=40)
+    parser.add_argument("--documentos", type=int, default=20, help="PDFs por modo al medir wkhtmltopdf")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--wkhtmltopdf", default=shutil.which("wkhtmltopdf"))
+    args = parser.parse_args()
+
+    with open("logo_kasnet.png", "rb") as logo:
+        logo_base64 = base64.b64encode(logo.read()).decode("utf-8")
+
+    directorio = tempfile.mkdtemp(prefix="bench_assets_")
+    config = {
+        "periodo": {"mes": 7, "anio": 2025},
+        "logo_base64": logo_base64,
+        "textos_fijos": {"informacion_adicional": "", "nota_importante": "", "campanas_activas": ""},
+        "rutas": {"logo": "logo_kasnet.png", "template_contraprestaciones": TEMPLATE},
+        "render": {"directorio_assets": os.path.join(directorio, "assets")}
+    }
+    config_estatico = dict(config, assets=preparar_assets(config))
+
+    datos = datos_sinteticos(args.operaciones, 4)
+    agente = datos["agentes"].to_dict(orient="records")[0]
+    generador = PDFGeneratorContraprestaciones.__new__(PDFGeneratorContraprestaciones)
+    generador.config = config
+    generador._templates = {}
+    generador._lock_templates = threading.Lock()
+    generador._fijos = {}
+    template = generador._obtener_template(TEMPLATE)
+
+    modos = {
+        "en línea": generador.construir_contexto(STORE_ID, agente, datos, config),
+        "estático": generador.construir_contexto(STORE_ID, agente, datos, config_estatico)
+    }
+
+    print(f"Agente sintético: {args.operaciones} operaciones")
+    resultados = {}
+    for modo, contexto in modos.items():
+        contexto = dict(contexto, fijos=generador.fragmentos_fijos(TEMPLATE, contexto))
+        html = template.render(contexto)
+        render_ms = medir(lambda: template.render(contexto), args.repeticiones) * 1000
+        resultados[modo] = html
+        print(f"  {modo:9s} HTML {len(html.encode('utf-8')) / 1024:8.1f} KB   render Jinja2 {render_ms:8.2f} ms")
+
+    if not args.wkhtmltopdf:
+        print("wkhtmltopdf no encontrado (--wkhtmltopdf): se omite la medición de conversión a PDF.")
+    else:
+        for modo, html in resultados.items():
+            salida = os.path.join(directorio, modo.replace(" ", "_"))
+            os.makedirs(salida, exist_ok=True)
+            segundos = medir(lambda: convertir(args.wkhtmltopdf, [html] * args.documentos, salida), 1)
+            print(f"  {modo:9s} wkhtmltopdf {segundos / args.documentos * 1000:8.1f} ms/PDF")
+
+    shutil.rmtree(directorio, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
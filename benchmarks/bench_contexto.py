@@ -0,0 +1,133 @@
+"""
+Micro-benchmark del armado de contexto de Contraprestaciones para un agente grande.
+
+Compara la implementación anterior (iterrows + filtro por entidad) con
+PDFGeneratorContraprestaciones.construir_contexto (una pasada columnar).
+
+Uso:
+    python -m benchmarks.bench_contexto --operaciones 50000 --entidades 12
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from modules.data_processor import normalizar_tablas, armar_resultado, obtener_filas_store
+from modules.pdf_generator import PDFGeneratorContraprestaciones
+
+STORE_ID = "100001"
+
+
+def datos_sinteticos(operaciones: int, entidades: int, semilla: int = 7) -> dict:
+    rng = np.random.default_rng(semilla)
+    contra = pd.DataFrame({
+        "store_id": STORE_ID,
+        "entity_description": rng.choice([f"ENTIDAD {i}" for i in range(entidades)], operaciones),
+        "transaction_date": rng.choice(pd.date_range("2025-07-01", "2025-07-31").strftime("%Y-%m-%d"), operaciones),
+        "transaction_id": rng.integers(10**8, 10**9, operaciones),
+        "operation_description": rng.choice(["PAGO DE SERVICIO", "RETIRO", "DEPOSITO", "RECARGA"], operaciones),
+        "pos": rng.integers(1, 5, operaciones),
+        "transaction_amount": np.round(rng.uniform(1, 500, operaciones), 2),
+        "comission_amount": np.round(rng.uniform(0.1, 2, operaciones), 2),
+        "comission_amount_igv": np.round(rng.uniform(0.01, 0.4, operaciones), 2),
+    })
+    bonos = pd.DataFrame({"store_id": [STORE_ID] * 3, "description": ["META", "CAMPAÑA", "YAPE"], "amount": [50.0, 20.0, 10.0], "amount_igv": 0.0})
+    desc = pd.DataFrame({"store_id": [STORE_ID], "discount_item": ["ALQUILER POS"], "total_discount_amount": [-15.0], "total_discount_amount_igv": 0.0})
+    def vacio(*columnas):
+        return pd.DataFrame({c: pd.Series([], dtype=object) for c in ("store_id",) + columnas})
+
+    agentes = pd.DataFrame([{
+        "store_id": STORE_ID, "merchant": "BODEGA", "store_owner": "TITULAR", "address": "AV. LIMA 123",
+        "province": "LIMA", "region": "LIMA", "email": "agente@example.com"
+    }])
+    reembolso = vacio("company_description", "entity_descripcion", "transaction_amount", "comission",
+                      "comission_amount_igv", "transaction_date", "transaction_id")
+    adquirencia = vacio("transaction_date", "transaction_amount", "comission_amount_igv", "credited_amount")
+
+    tablas = normalizar_tablas({
+        "agentes": agentes, "contraprestacion": contra, "bonos": bonos,
+        "descuentos": desc, "reembolso": reembolso, "adquirencia": adquirencia
+    })
+    return armar_resultado(tablas)
+
+
+def contexto_iterrows(datos: dict) -> dict:
+    """
+    Implementación anterior (referencia): iterrows y un filtro por entidad.
+    """
+    agente_ops = obtener_filas_store(datos, "detalle_contra", STORE_ID)
+    resumen = (
+        agente_ops.groupby("entity_description")
+        .agg(cantidad=("transaction_amount", "count"), total_comision=("comission_amount", "sum"))
+        .reset_index()
+    )
+    agente_ops = agente_ops.sort_values(by=["transaction_date", "transaction_id"])
+    bonos_agente = obtener_filas_store(datos, "detalle_bonos", STORE_ID)
+    return {
+        "resumen_entidades": [
+            {"descripcion_entidad": r.entity_description, "cantidad": r.cantidad, "total_comision": r.total_comision}
+            for _, r in resumen.iterrows()
+        ],
+        "detalle_entidades": [
+            {
+                "nombre": entidad,
+                "operaciones": [
+                    {
+                        "entidad_financiera": op["entity_description"],
+                        "fecha": op["transaction_date"],
+                        "descripcion": op["operation_description"],
+                        "pos": op["pos"],
+                        "numero_operacion": op["transaction_id"],
+                        "importe": float(op["transaction_amount"] or 0.0),
+                        "comision": float(op["comission_amount"] or 0.0)
+                    }
+                    for _, op in agente_ops[agente_ops["entity_description"] == entidad].iterrows()
+                ]
+            }
+            for entidad in resumen["entity_description"]
+        ],
+        "bonos": [{"descripcion": r["bonus_type"], "monto": r["monto"], "igv": r["igv"]} for _, r in bonos_agente.iterrows()],
+    }
+
+
+def medir(funcion, repeticiones: int) -> float:
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--operaciones", type=int, default=50000)
+    parser.add_argument("--entidades", type=int, default=12)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    datos = datos_sinteticos(args.operaciones, args.entidades)
+    config = {
+        "periodo": {"mes": 7, "anio": 2025}, "logo_base64": "",
+        "textos_fijos": {"informacion_adicional": "", "nota_importante": "", "campanas_activas": ""}
+    }
+    agente = datos["agentes"].to_dict(orient="records")[0]
+    # Solo se usa construir_contexto: no hace falta cliente S3 ni wkhtmltopdf
+    generador = PDFGeneratorContraprestaciones.__new__(PDFGeneratorContraprestaciones)
+
+    antes = contexto_iterrows(datos)
+    despues = generador.construir_contexto(STORE_ID, agente, datos, config)
+    for clave in antes:
+        if antes[clave] != despues[clave]:
+            raise SystemExit(f"El contexto difiere en '{clave}'")
+
+    t_antes = medir(lambda: contexto_iterrows(datos), args.repeticiones)
+    t_despues = medir(lambda: generador.construir_contexto(STORE_ID, agente, datos, config), args.repeticiones)
+
+    print(f"Agente sintético: {args.operaciones} operaciones, {args.entidades} entidades")
+    print(f"  iterrows:  {t_antes * 1000:10.1f} ms")
+    print(f"  columnar:  {t_despues * 1000:10.1f} ms")
+    print(f"  speedup:   {t_antes / t_despues:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
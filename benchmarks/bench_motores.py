@@ -0,0 +1,66 @@
+"""
+Benchmark de motores de render (render.motor).
+
+Genera el PDF de Contraprestaciones de un agente sintético con cada motor y compara:
+- PDFs por segundo (un solo hilo),
+- tamaño del PDF resultante.
+El motor wkhtmltopdf solo se mide si el ejecutable está disponible.
+
+Uso:
+    python -m benchmarks.bench_motores --operaciones 40 --documentos 50
+    python -m benchmarks.bench_motores --wkhtmltopdf "C:/Program Files/wkhtmltopdf/bin/wkhtmltopdf.exe"
+"""
+import json
+import base64
+import shutil
+import argparse
+import threading
+from benchmarks.bench_contexto import datos_sinteticos, medir, STORE_ID
+from modules.pdf_generator import PDFGeneratorContraprestaciones, MOTORES
+
+TEMPLATE = "templates/template_contraprestaciones.html"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--operaciones", type=int, default=40)
+    parser.add_argument("--documentos", type=int, default=50, help="PDFs por motor")
+    parser.add_argument("--wkhtmltopdf", default=shutil.which("wkhtmltopdf"))
+    args = parser.parse_args()
+
+    with open("logo_kasnet.png", "rb") as logo:
+        logo_base64 = base64.b64encode(logo.read()).decode("utf-8")
+    with open("config.json", encoding="utf-8") as f:
+        textos_fijos = json.load(f)["textos_fijos"]
+
+    config = {
+        "periodo": {"mes": 7, "anio": 2025},
+        "logo_base64": logo_base64,
+        "textos_fijos": textos_fijos,
+        "rutas": {"template_contraprestaciones": TEMPLATE},
+        "render": {"wkhtmltopdf": args.wkhtmltopdf}
+    }
+
+    datos = datos_sinteticos(args.operaciones, 4)
+    agente = datos["agentes"].to_dict(orient="records")[0]
+    # Sin __init__: no se necesita cliente S3 para renderizar
+    generador = PDFGeneratorContraprestaciones.__new__(PDFGeneratorContraprestaciones)
+    generador.config = config
+    generador._templates = {}
+    generador._lock_templates = threading.Lock()
+    generador._fijos = {}
+    contexto = generador.construir_contexto(STORE_ID, agente, datos, config)
+
+    print(f"Agente sintético: {args.operaciones} operaciones, {args.documentos} PDFs por motor")
+    for nombre, motor in MOTORES.items():
+        if nombre == "wkhtmltopdf" and not args.wkhtmltopdf:
+            print(f"  {nombre:12s} no encontrado (--wkhtmltopdf): se omite.")
+            continue
+        pdf = motor.renderizar(generador, TEMPLATE, contexto, STORE_ID)
+        segundos = medir(lambda: [motor.renderizar(generador, TEMPLATE, contexto, STORE_ID) for _ in range(args.documentos)], 1)
+        print(f"  {nombre:12s} {args.documentos / segundos:8.1f} PDF/s   {segundos / args.documentos * 1000:8.1f} ms/PDF   "
+              f"{len(pdf) / 1024:8.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""
+Benchmark de punta a punta sin credenciales: Parquet sintéticos en disco local,
+lectura con cargar_parquets (filesystem local en lugar de S3), procesamiento,
+armado de contexto, render y subida a un directorio local (rutas file:// de modules.almacenamiento).
+
+Por etapa reporta cantidad, throughput y latencias p50/p95/p99; con --guardar-baseline
+deja las mediciones en JSON y con --baseline las compara contra una corrida anterior
+(termina con código 1 si alguna etapa empeora más que --tolerancia).
+
+Uso:
+    python -m benchmarks.bench_pipeline --agentes 500 --ops-por-agente 40 --sesgo 1.1
+    python -m benchmarks.bench_pipeline --guardar-baseline output/baseline_pipeline.json
+    python -m benchmarks.bench_pipeline --baseline output/baseline_pipeline.json --tolerancia 0.15
+"""
+import os
+import sys
+import json
+import time
+import base64
+import shutil
+import argparse
+import tempfile
+import platform
+import threading
+import subprocess
+import numpy as np
+from datetime import datetime
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from benchmarks.datos_sinteticos import escribir_dataset
+from modules.data_processor import normalizar_tablas, armar_resultado
+from modules.parquet_loader import cargar_parquets
+from modules.pdf_generator import cabecera_agente, obtener_motor
+from modules.ejecucion import GENERADORES, trabajos_por_agente
+from modules.almacenamiento import cliente_salida, obtener_filesystem
+
+ETAPAS = ["ingesta", "procesamiento", "contexto", "render", "subida"]
+# Métricas que se comparan contra el baseline y si un valor mayor es peor
+METRICAS = {"p50_ms": True, "p95_ms": True, "p99_ms": True, "por_segundo": False}
+
+
+def resumen_etapa(latencias: list, unidades: int, total_s: float) -> dict:
+    """
+    latencias: segundos por tarea. unidades: elementos procesados (filas, contextos, PDFs).
+    """
+    ms = np.array(latencias) * 1000
+    return {
+        "n": len(latencias),
+        "unidades": unidades,
+        "total_s": round(total_s, 3),
+        "por_segundo": round(unidades / total_s, 1) if total_s else 0.0,
+        "p50_ms": round(float(np.percentile(ms, 50)), 2),
+        "p95_ms": round(float(np.percentile(ms, 95)), 2),
+        "p99_ms": round(float(np.percentile(ms, 99)), 2)
+    }
+
+
+def version_codigo() -> str:
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconocida"
+
+
+def correr(args, directorio: str) -> dict:
+    rutas = escribir_dataset(os.path.join(directorio, "parquet"), args.agentes, args.ops_por_agente, args.sesgo, semilla=args.semilla)
+
+    with open("logo_kasnet.png", "rb") as logo:
+        logo_base64 = base64.b64encode(logo.read()).decode("utf-8")
+    with open("config.json", encoding="utf-8") as f:
+        config_base = json.load(f)
+    config = {
+        "periodo": {"mes": 7, "anio": 2025},
+        "logo_base64": logo_base64,
+        "textos_fijos": config_base["textos_fijos"],
+        "rutas": dict(
+            {clave: ruta for clave, ruta in config_base["rutas"].items() if clave.startswith("template_")},
+            salida_s3={tipo: Path(directorio, "s3", tipo).as_uri() + "/" for tipo in GENERADORES}
+        ),
+        "render": {"motor": args.motor, "wkhtmltopdf": args.wkhtmltopdf or "wkhtmltopdf"}
+    }
+    etapas = {}
+
+    # === Ingesta: los seis Parquet con el mismo cargador que producción ===
+    inicio = time.perf_counter()
+    fs = obtener_filesystem(Path(directorio).as_uri())
+    dfs, tiempos = cargar_parquets(fs, rutas, config, filtrar_por="agentes")
+    etapas["ingesta"] = resumen_etapa(
+        [t["total_s"] for t in tiempos.values()], sum(t["filas"] for t in tiempos.values()), time.perf_counter() - inicio
+    )
+
+    # === Procesamiento: normalización, índices y resúmenes ===
+    inicio = time.perf_counter()
+    datos = armar_resultado(normalizar_tablas(dfs))
+    duracion = time.perf_counter() - inicio
+    etapas["procesamiento"] = resumen_etapa([duracion], len(datos["agentes"]), duracion)
+
+    # === Contexto, render y subida por agente y tipo ===
+    s3_client = cliente_salida(config)
+    generadores = {tipo: clase(config, s3_client=s3_client) for tipo, (clase, _) in GENERADORES.items()}
+    motores = {tipo: obtener_motor(config, tipo) for tipo in GENERADORES}
+    pendientes = {tipo: datos["agentes"]["store_id"].tolist() for tipo in GENERADORES}
+    trabajos = trabajos_por_agente(datos, pendientes)
+
+    muestras = {"contexto": [], "render": [], "subida": []}
+    lock = threading.Lock()
+
+    def trabajo_agente(trabajo):
+        store_id, row, tipos = trabajo
+        cabecera = cabecera_agente(store_id, row, config)
+        locales = {"contexto": [], "render": [], "subida": []}
+        for tipo in tipos:
+            generador = generadores[tipo]
+            t0 = time.perf_counter()
+            context = generador.construir_contexto(store_id, row, datos, config, cabecera)
+            t1 = time.perf_counter()
+            locales["contexto"].append(t1 - t0)
+            if context is None:
+                continue
+            template_path = config["rutas"][generador.template_key]
+            pdf_bytes = motores[tipo].renderizar(generador, template_path, context, store_id)
+            t2 = time.perf_counter()
+            bucket, key = generador._destino_s3(tipo, f"{store_id}.pdf")
+            s3_client.put_object(Bucket=bucket, Key=key, Body=pdf_bytes, ContentType="application/pdf")
+            t3 = time.perf_counter()
+            locales["render"].append(t2 - t1)
+            locales["subida"].append(t3 - t2)
+        with lock:
+            for etapa, valores in locales.items():
+                muestras[etapa].extend(valores)
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.hilos) as executor:
+        list(executor.map(trabajo_agente, trabajos))
+    total = time.perf_counter() - inicio
+
+    # Con varios hilos las etapas se solapan: el throughput se reparte según su tiempo acumulado
+    acumulado = sum(sum(valores) for valores in muestras.values()) or 1
+    for etapa, valores in muestras.items():
+        etapas[etapa] = resumen_etapa(valores or [0.0], len(valores), total * sum(valores) / acumulado)
+
+    return {
+        "version": version_codigo(),
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "maquina": {"python": platform.python_version(), "sistema": platform.platform(), "cpus": os.cpu_count()},
+        "parametros": {
+            "agentes": args.agentes, "ops_por_agente": args.ops_por_agente, "sesgo": args.sesgo,
+            "semilla": args.semilla, "hilos": args.hilos, "motor": args.motor
+        },
+        "pdfs": len(muestras["render"]),
+        "pdfs_por_segundo": round(len(muestras["render"]) / total, 1) if total else 0.0,
+        "etapas": etapas
+    }
+
+
+def imprimir(resultado: dict):
+    print(f"Versión {resultado['version']} - {resultado['pdfs']} PDFs a {resultado['pdfs_por_segundo']} PDF/s")
+    print(f"  {'etapa':14s} {'n':>7s} {'total s':>9s} {'unid/s':>11s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s}")
+    for etapa in ETAPAS:
+        e = resultado["etapas"][etapa]
+        print(f"  {etapa:14s} {e['n']:7d} {e['total_s']:9.2f} {e['por_segundo']:11.1f} "
+              f"{e['p50_ms']:9.2f} {e['p95_ms']:9.2f} {e['p99_ms']:9.2f}")
+
+
+def comparar(resultado: dict, baseline: dict, tolerancia: float) -> list:
+    """
+    Devuelve las regresiones (etapa, métrica, antes, ahora, variación) que superan la tolerancia.
+    """
+    if baseline.get("parametros") != resultado["parametros"]:
+        print(f"Aviso: parámetros distintos al baseline ({baseline.get('parametros')}); la comparación es orientativa.")
+
+    regresiones = []
+    print(f"Comparación contra baseline {baseline.get('version')} ({baseline.get('fecha')}):")
+    for etapa in ETAPAS:
+        antes, ahora = baseline["etapas"].get(etapa), resultado["etapas"][etapa]
+        if not antes:
+            continue
+        for metrica, mayor_es_peor in METRICAS.items():
+            if not antes[metrica]:
+                continue
+            variacion = (ahora[metrica] - antes[metrica]) / antes[metrica]
+            empeora = variacion if mayor_es_peor else -variacion
+            marca = "  REGRESIÓN" if empeora > tolerancia else ""
+            print(f"  {etapa:14s} {metrica:12s} {antes[metrica]:10.2f} -> {ahora[metrica]:10.2f} ({variacion:+.1%}){marca}")
+            if marca:
+                regresiones.append((etapa, metrica, antes[metrica], ahora[metrica], variacion))
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--agentes", type=int, default=500)
+    parser.add_argument("--ops-por-agente", type=int, default=40)
+    parser.add_argument("--sesgo", type=float, default=1.0)
+    parser.add_argument("--semilla", type=int, default=7)
+    parser.add_argument("--hilos", type=int, default=1)
+    parser.add_argument("--motor", default="pdf_directo", help="wkhtmltopdf requiere el ejecutable (--wkhtmltopdf)")
+    parser.add_argument("--wkhtmltopdf", default=shutil.which("wkhtmltopdf"))
+    parser.add_argument("--guardar-baseline", help="ruta JSON donde guardar las mediciones")
+    parser.add_argument("--baseline", help="ruta JSON de una corrida anterior para comparar")
+    parser.add_argument("--tolerancia", type=float, default=0.15, help="empeoramiento relativo admitido por métrica")
+    parser.add_argument("--conservar", action="store_true", help="no borrar los Parquet ni los PDF generados")
+    args = parser.parse_args()
+
+    directorio = tempfile.mkdtemp(prefix="bench_pipeline_")
+    try:
+        resultado = correr(args, directorio)
+    finally:
+        if args.conservar:
+            print(f"Archivos generados en {directorio}")
+        else:
+            shutil.rmtree(directorio, ignore_errors=True)
+
+    imprimir(resultado)
+
+    if args.guardar_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.guardar_baseline)), exist_ok=True)
+        with open(args.guardar_baseline, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, indent=2, ensure_ascii=False)
+        print(f"Baseline guardado en {args.guardar_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regresiones = comparar(resultado, json.load(f), args.tolerancia)
+        if regresiones:
+            print(f"{len(regresiones)} métricas empeoraron más de {args.tolerancia:.0%}.")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Generador de Parquet sintéticos con los seis esquemas que lee procesar_datos
+(nombres de columna tal como vienen en los archivos de origen, antes de normalizar_tablas).
+
+Uso:
+    python -m benchmarks.datos_sinteticos --directorio output/sinteticos --agentes 2000 --ops-por-agente 40 --sesgo 1.1
+"""
+import os
+import argparse
+import numpy as np
+import pandas as pd
+
+TIPOS = ["agentes", "contraprestacion", "bonos", "descuentos", "reembolso", "adquirencia"]
+
+ENTIDADES = [
+    "BANCO DE LA NACION", "BCP", "INTERBANK", "SCOTIABANK", "BBVA", "CAJA AREQUIPA",
+    "CAJA HUANCAYO", "MIBANCO", "YAPE", "PLIN", "CLARO", "MOVISTAR"
+]
+OPERACIONES = ["PAGO DE SERVICIO", "RETIRO", "DEPOSITO", "RECARGA", "PAGO DE CREDITO", "TRANSFERENCIA"]
+EMPRESAS = ["RECARGA CLARO", "RECARGA MOVISTAR", "RECARGA ENTEL", "REEMBOLSO SEDAPAL", "REEMBOLSO LUZ DEL SUR"]
+BONOS = ["BONO META", "BONO CAMPAÑA", "BONO YAPE"]
+DESCUENTOS = ["ALQUILER POS", "DEVOLUCIÓN", "AJUSTE"]
+PROVINCIAS = [("LIMA", "LIMA"), ("AREQUIPA", "AREQUIPA"), ("TRUJILLO", "LA LIBERTAD"), ("PIURA", "PIURA"), ("CUSCO", "CUSCO")]
+
+# Reparto de las operaciones de cada agente entre los tres tipos de estado de cuenta
+REPARTO = {"contraprestacion": 0.6, "reembolso": 0.25, "adquirencia": 0.15}
+
+
+def operaciones_por_agente(rng, agentes: int, ops_por_agente: int, sesgo: float) -> np.ndarray:
+    """
+    Cantidad de operaciones de cada agente con media ops_por_agente y una cola tipo Zipf:
+    sesgo 0 reparte todo igual; con sesgo ~1 unos pocos agentes concentran miles de operaciones.
+    """
+    pesos = 1.0 / np.arange(1, agentes + 1) ** sesgo
+    cantidades = np.maximum(1, np.round(pesos / pesos.mean() * ops_por_agente)).astype(int)
+    return rng.permutation(cantidades)
+
+
+def _fechas(rng, n: int, anio: int, mes: int) -> np.ndarray:
+    dias = pd.Period(f"{anio}-{mes:02d}").days_in_month
+    return pd.date_range(f"{anio}-{mes:02d}-01", periods=dias).strftime("%Y-%m-%d").to_numpy()[rng.integers(0, dias, n)]
+
+
+def _montos(rng, n: int, minimo: float, maximo: float) -> np.ndarray:
+    return np.round(rng.uniform(minimo, maximo, n), 2)
+
+
+def generar_tablas(agentes: int, ops_por_agente: int, sesgo: float = 1.0, anio: int = 2025, mes: int = 7,
+                   semilla: int = 7) -> dict:
+    """
+    Arma los seis DataFrames de un mes sintético. store_id sale como entero (como en origen)
+    para ejercitar la normalización de tipos.
+
+    Returns:
+        dict: tipo -> DataFrame
+    """
+    rng = np.random.default_rng(semilla)
+    store_ids = np.arange(100001, 100001 + agentes)
+    provincias = [PROVINCIAS[i] for i in rng.integers(0, len(PROVINCIAS), agentes)]
+    tablas = {
+        "agentes": pd.DataFrame({
+            "store_id": store_ids,
+            "merchant": [f"BODEGA {i}" for i in store_ids],
+            "store_owner": [f"TITULAR {i}" for i in store_ids],
+            "address": [f"AV. PRINCIPAL {i % 900 + 100}" for i in store_ids],
+            "province": [p for p, _ in provincias],
+            "region": [r for _, r in provincias],
+            "email": [f"agente{i}@example.com" for i in store_ids]
+        })
+    }
+
+    cantidades = operaciones_por_agente(rng, agentes, ops_por_agente, sesgo)
+    por_tipo = {tipo: np.round(cantidades * fraccion).astype(int) for tipo, fraccion in REPARTO.items()}
+    # Solo una parte de los agentes tiene POS de adquirencia
+    por_tipo["adquirencia"][rng.random(agentes) > 0.3] = 0
+
+    n = por_tipo["contraprestacion"].sum()
+    comision = _montos(rng, n, 0.1, 2)
+    tablas["contraprestacion"] = pd.DataFrame({
+        "store_id": np.repeat(store_ids, por_tipo["contraprestacion"]),
+        "entity_description": rng.choice(ENTIDADES, n),
+        "transaction_date": _fechas(rng, n, anio, mes),
+        "transaction_id": rng.integers(10**8, 10**9, n),
+        "operation_description": rng.choice(OPERACIONES, n),
+        "pos": rng.integers(1, 5, n),
+        "transaction_amount": _montos(rng, n, 1, 500),
+        "comission_amount": comision,
+        "comission_amount_igv": np.round(comision * 0.18, 2),
+        "igv": np.round(comision * 0.18, 2)
+    })
+
+    n = por_tipo["reembolso"].sum()
+    comision = _montos(rng, n, 0.05, 1)
+    tablas["reembolso"] = pd.DataFrame({
+        "store_id": np.repeat(store_ids, por_tipo["reembolso"]),
+        "company_description": rng.choice(EMPRESAS, n),
+        "entity_descripcion": rng.choice(EMPRESAS, n),
+        "transaction_date": _fechas(rng, n, anio, mes),
+        "transaction_id": rng.integers(10**8, 10**9, n),
+        "operation_description": rng.choice(OPERACIONES, n),
+        "pos": rng.integers(1, 5, n),
+        "transaction_amount": _montos(rng, n, 1, 100),
+        "comission": comision,
+        "comission_amount_igv": np.round(comision * 0.18, 2),
+        "igv": np.round(comision * 0.18, 2)
+    })
+
+    n = por_tipo["adquirencia"].sum()
+    venta = _montos(rng, n, 5, 800)
+    comision = np.round(venta * 0.035, 2)
+    tablas["adquirencia"] = pd.DataFrame({
+        "store_id": np.repeat(store_ids, por_tipo["adquirencia"]),
+        "transaction_date": _fechas(rng, n, anio, mes),
+        "transaction_hour": [f"{h:02d}:{m:02d}:00" for h, m in zip(rng.integers(7, 23, n), rng.integers(0, 60, n))],
+        "pos": rng.integers(1, 5, n),
+        "entity_transaction_id": rng.integers(10**9, 10**10, n),
+        "transaction_amount": venta,
+        "comission_amount_igv": comision,
+        "credited_amount": np.round(venta - comision, 2)
+    })
+
+    con_bono = store_ids[rng.random(agentes) < 0.4]
+    monto = _montos(rng, len(con_bono), 10, 150)
+    tablas["bonos"] = pd.DataFrame({
+        "store_id": con_bono,
+        "description": rng.choice(BONOS, len(con_bono)),
+        "amount": monto,
+        "amount_igv": np.round(monto * 0.18, 2),
+        "igv": np.round(monto * 0.18, 2)
+    })
+
+    con_descuento = store_ids[rng.random(agentes) < 0.2]
+    monto = -_montos(rng, len(con_descuento), 5, 40)
+    tablas["descuentos"] = pd.DataFrame({
+        "store_id": con_descuento,
+        "discount_item": rng.choice(DESCUENTOS, len(con_descuento)),
+        "total_discount_amount": monto,
+        "total_discount_amount_igv": np.round(monto * 0.18, 2),
+        "igv": np.round(monto * 0.18, 2)
+    })
+    return tablas
+
+
+def escribir_dataset(directorio: str, agentes: int, ops_por_agente: int, sesgo: float = 1.0, anio: int = 2025,
+                     mes: int = 7, semilla: int = 7) -> dict:
+    """
+    Escribe los seis Parquet en directorio.
+
+    Returns:
+        dict: tipo -> ruta del Parquet (formato de rutas de cargar_parquets)
+    """
+    os.makedirs(directorio, exist_ok=True)
+    rutas = {}
+    for tipo, df in generar_tablas(agentes, ops_por_agente, sesgo, anio, mes, semilla).items():
+        rutas[tipo] = os.path.join(os.path.abspath(directorio), f"{tipo}_{anio}{mes:02d}.parquet")
+        df.to_parquet(rutas[tipo], index=False)
+    return rutas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--directorio", default="output/sinteticos")
+    parser.add_argument("--agentes", type=int, default=2000)
+    parser.add_argument("--ops-por-agente", type=int, default=40)
+    parser.add_argument("--sesgo", type=float, default=1.0, help="0 = uniforme; mayor = más concentrado")
+    parser.add_argument("--semilla", type=int, default=7)
+    args = parser.parse_args()
+
+    rutas = escribir_dataset(args.directorio, args.agentes, args.ops_por_agente, args.sesgo, semilla=args.semilla)
+    for tipo, ruta in rutas.items():
+        print(f"  {tipo:17s} {len(pd.read_parquet(ruta, columns=['store_id'])):9d} filas  {ruta}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Verificación del pool persistente (render.pool_persistente) contra un wkhtmltopdf real.
+
+El protocolo de WorkerWkhtmltopdf (líneas por stdin, fin de cada conversión leído de stderr)
+depende de la salida de la versión instalada de wkhtmltopdf. Correr este script con el
+binario de producción antes de habilitar render.pool_persistente; revisa:
+- un lote de conversiones correctas en un mismo worker,
+- una conversión fallida ("Error: ..." + "Exit with code ...") seguida de una correcta en el
+  mismo worker (el fallo no debe desfasar la conversión siguiente),
+- timeout (página con JavaScript que no termina) y reemplazo del worker en el pool,
+- caída del proceso a mitad de trabajo y reemplazo del worker en el pool.
+
+Uso:
+    python -m benchmarks.verificar_pool_wkhtmltopdf
+    python -m benchmarks.verificar_pool_wkhtmltopdf --wkhtmltopdf "C:/Program Files/wkhtmltopdf/bin/wkhtmltopdf.exe"
+"""
+import sys
+import shutil
+import argparse
+from pathlib import Path
+from modules.render_pool import OPCIONES_PDF, ErrorRender, PoolRender, WorkerWkhtmltopdf
+
+HTML = "<html><body><h1>Agente {}</h1><p>Verificación del pool persistente.</p></body></html>"
+HTML_COLGADO = "<html><body><script>while (true) {}</script></body></html>"
+
+
+def verificar(descripcion: str, prueba) -> bool:
+    try:
+        prueba()
+    except Exception as e:
+        print(f"FALLA  {descripcion}: {type(e).__name__}: {e}")
+        return False
+    print(f"OK     {descripcion}")
+    return True
+
+
+def esperar_error(funcion, *args):
+    try:
+        funcion(*args)
+    except ErrorRender as e:
+        return str(e)
+    raise AssertionError("se esperaba ErrorRender")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--wkhtmltopdf", default=shutil.which("wkhtmltopdf"))
+    parser.add_argument("--timeout", type=float, default=10, help="segundos para la prueba de timeout")
+    args = parser.parse_args()
+    if not args.wkhtmltopdf:
+        sys.exit("wkhtmltopdf no encontrado; indicar --wkhtmltopdf")
+
+    def lote_correcto():
+        worker = WorkerWkhtmltopdf(args.wkhtmltopdf, OPCIONES_PDF, args.timeout)
+        try:
+            pdfs = worker.renderizar_lote([HTML.format(i) for i in range(5)])
+        finally:
+            worker.cerrar()
+        assert len(pdfs) == 5 and all(pdf.startswith(b"%PDF") for pdf in pdfs), "PDFs inválidos"
+
+    def fallo_y_siguiente():
+        worker = WorkerWkhtmltopdf(args.wkhtmltopdf, OPCIONES_PDF, args.timeout)
+        try:
+            salida = Path(worker.directorio, "no_existe.pdf")
+            worker.proceso.stdin.write(f'"{Path(worker.directorio, "no_existe.html").as_posix()}" "{salida.as_posix()}"\n')
+            worker.proceso.stdin.flush()
+            mensaje = esperar_error(worker._esperar_conversion)
+            assert "Exit with code" in mensaje, mensaje
+            pdf = worker.renderizar_lote([HTML.format("tras fallo")])[0]
+        finally:
+            worker.cerrar()
+        assert pdf.startswith(b"%PDF"), "PDF inválido tras un fallo"
+
+    def timeout_y_reemplazo():
+        pool = PoolRender(args.wkhtmltopdf, OPCIONES_PDF, 1, 500, args.timeout)
+        try:
+            mensaje = esperar_error(pool.renderizar, HTML_COLGADO)
+            assert mensaje.startswith("Timeout"), mensaje
+            assert pool.renderizar(HTML.format("tras timeout")).startswith(b"%PDF")
+        finally:
+            pool.cerrar()
+
+    def caida_y_reemplazo():
+        pool = PoolRender(args.wkhtmltopdf, OPCIONES_PDF, 1, 500, args.timeout)
+        try:
+            pool.renderizar(HTML.format("antes de la caída"))
+            worker = pool._libres.get_nowait()
+            worker.proceso.kill()
+            worker.proceso.wait()
+            pool._libres.put(worker)
+            mensaje = esperar_error(pool.renderizar, HTML.format("durante la caída"))
+            assert "terminó inesperadamente" in mensaje, mensaje
+            assert pool.renderizar(HTML.format("tras la caída")).startswith(b"%PDF")
+        finally:
+            pool.cerrar()
+
+    print(f"wkhtmltopdf: {args.wkhtmltopdf}")
+    resultados = [
+        verificar("lote de 5 conversiones en un worker", lote_correcto),
+        verificar("conversión fallida seguida de una correcta", fallo_y_siguiente),
+        verificar(f"timeout ({args.timeout}s) y reemplazo del worker", timeout_y_reemplazo),
+        verificar("caída del proceso y reemplazo del worker", caida_y_reemplazo),
+    ]
+    sys.exit(0 if all(resultados) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,21 +2,26 @@ import logging
 from modules.logger_config import LoggerConfig
 from modules.config_loader import load_config
 from modules.data_processor import procesar_datos
+from modules.streaming import cargar_agentes, generar_en_streaming
 import time
 from modules.email_sender import EmailSender
 import os
 import calendar
-from modules.utils_s3 import download_pdf_from_s3_if_exists
-import boto3
-from modules.pdf_generator import (PDFGeneratorContraprestaciones, PDFGeneratorReembolso, PDFGeneratorAdquirencia,)
+from modules.utils_s3 import obtener_pdfs_s3, separar_uri_s3
+from modules.inventario_s3 import crear_inventario
+from modules.transferencias_s3 import obtener_transferencias, cerrar_transferencias
 from modules.progress_tracker_s3 import ProgressTrackerS3
+from modules.render_pool import cerrar_pool
+from modules.ejecucion import generar_pdfs, crear_generadores
+from modules.assets_estaticos import preparar_assets
+from modules.concurrencia import crear_controlador
 from datetime import datetime
 import pandas as pd
 from concurrent.futures import ThreadPoolExecutor
 import base64
 import signal
 import sys
-from modules.aws_credentials import aws_input, aws_output
+from modules.almacenamiento import cliente_salida
 
 def signal_handler(sig, frame):
     print("\n Interrupción detectada con Ctrl + C. Cerrando procesos...")
@@ -50,27 +55,52 @@ def main():
             logo_base64 = base64.b64encode(logo_file.read()).decode("utf-8")
         config["logo_base64"] = logo_base64
 
+        # === ASSETS ESTÁTICOS (logo y CSS escritos una vez y referenciados por ruta) ===
+        if config.get("render", {}).get("assets_estaticos", False):
+            config["assets"] = preparar_assets(config)
+
+        flags = config.get("ejecucion", {})
+        modo_streaming = flags.get("modo_streaming", False)
+
         # === Procesar datos ===
         logging.info("Iniciando procesamiento de datos...")
-        resultado = procesar_datos(config)
+        if modo_streaming:
+            # Solo agentes en memoria; el detalle se lee agente por agente al generar
+            df_agentes_origen = cargar_agentes(config)
+            df_agentes_str = df_agentes_origen.copy()
+            df_agentes_str["store_id"] = df_agentes_str["store_id"].astype(str)
+            resultado = {"agentes": df_agentes_str}
+        else:
+            resultado = procesar_datos(config)
         logging.info(f"Datos procesados para {resultado['agentes'].shape[0]} agentes")
         print(f"Datos procesados para {resultado['agentes'].shape[0]} agentes")
 
         # === Inicializar generadores de PDFs ===
         logging.info("Inicializando generadores de PDFs...")
-        pdf_contra = PDFGeneratorContraprestaciones(config)
-        pdf_reembolso = PDFGeneratorReembolso(config)
-        pdf_adquirencia = PDFGeneratorAdquirencia(config)
+        # Un generador por tipo, compartiendo un único cliente S3
+        generadores_pdf = crear_generadores(config, ["contraprestacion", "reembolso", "adquirencia"])
+        pdf_contra = generadores_pdf["contraprestacion"]
+        pdf_reembolso = generadores_pdf["reembolso"]
+        pdf_adquirencia = generadores_pdf["adquirencia"]
 
 
         # === Generar PDFs ===
         logging.info("Iniciando generación de PDFs para todos los agentes...")
 
-        # === Cargar log de PDFs ya generados (si existe)
+        # === PDFs ya generados: inventario de S3 del periodo (list_objects_v2 en paralelo),
+        # o log_pdfs_existentes.csv si s3.inventario.habilitado = false
         path_log = "log_pdfs_existentes.csv"
         df_log = None
-
-        if os.path.exists(path_log):
+        # Cliente de salida: S3, o ClienteLocal si rutas.salida_s3 usa file:// (corridas sin red)
+        s3_client = cliente_salida(config)
+        inventario = crear_inventario(s3_client, config)
+
+        if periodo.get("reproceso", False):
+            # En reproceso se evalúan todos los agentes: el hash del contexto decide cuáles regenerar
+            logging.info("[main.py] Reproceso: solo se regenerarán los agentes cuyos datos cambiaron.")
+        elif inventario is not None:
+            logging.info("[main.py] Inventario S3 cargado: se omiten los agentes con PDF existente.")
+        elif os.path.exists(path_log):
             df_log = pd.read_csv(path_log, usecols=["store_id", "estado", "tipo"], dtype={"store_id": str})
 
             df_log = df_log[df_log["estado"] == 1]  # Solo los generados correctamente
@@ -81,7 +111,9 @@ def main():
         # === Función auxiliar para obtener store_ids faltantes por tipo
         def obtener_faltantes(tipo: str, df_datos_tipo: pd.DataFrame):
             store_ids_generados = set()
-            if df_log is not None:
+            if inventario is not None and not periodo.get("reproceso", False):
+                store_ids_generados = inventario.store_ids(tipo)
+            elif df_log is not None:
                 store_ids_generados = set(
                     df_log[(df_log["tipo"] == tipo) & (df_log["estado"] == 1)]["store_id"]
                 )
@@ -89,63 +121,54 @@ def main():
             return [sid for sid in store_ids_origen if sid not in store_ids_generados]
 
 
-        # === Filtrar store_ids por tipo
-        store_ids_contra_faltantes = obtener_faltantes("contraprestacion", resultado["detalle_contra"])
-        store_ids_reembolso_faltantes = obtener_faltantes("reembolso", resultado["detalle_reembolso"])
-        store_ids_adquirencia_faltantes = obtener_faltantes("adquirencia", resultado["detalle_adquirencia"])
-
-        # === DataFrames de agentes por tipo
-        df_agentes = resultado["agentes"]
-        df_agentes_contra = df_agentes[df_agentes["store_id"].isin(store_ids_contra_faltantes)]
-        df_agentes_reembolso = df_agentes[df_agentes["store_id"].isin(store_ids_reembolso_faltantes)]
-        df_agentes_adquirencia = df_agentes[df_agentes["store_id"].isin(store_ids_adquirencia_faltantes)]
-
-        # === Logs
-        logging.info(f"[main.py] {len(store_ids_contra_faltantes)} agentes pendientes para Contraprestaciones.")
-        logging.info(f"[main.py] {len(store_ids_reembolso_faltantes)} agentes pendientes para Reembolso.")
-        logging.info(f"[main.py] {len(store_ids_adquirencia_faltantes)} agentes pendientes para Adquirencia.")
+        if modo_streaming:
+            generadores = {
+                tipo: par for tipo, par in {
+                    "contraprestacion": (pdf_contra, "detalle_contra"),
+                    "reembolso": (pdf_reembolso, "detalle_reembolso"),
+                    "adquirencia": (pdf_adquirencia, "detalle_adquirencia")
+                }.items() if flags.get(f"generar_{tipo}", False)
+            }
+            generados = {}
+            if inventario is not None and not periodo.get("reproceso", False):
+                generados = {tipo: inventario.store_ids(tipo) for tipo in generadores}
+            elif df_log is not None:
+                generados = {tipo: set(df_log[df_log["tipo"] == tipo]["store_id"]) for tipo in generadores}
+
+            if flags.get("backend", "hilos") != "hilos":
+                logging.warning("[main.py] El modo streaming se ejecuta siempre con hilos; ejecucion.backend se ignora.")
+            logging.info(f"[main.py] Generando PDFs en modo streaming para: {', '.join(generadores) or 'ninguno'}")
+            if generadores:
+                generar_en_streaming(config, df_agentes_origen, generadores, generados)
 
-        flags = config.get("ejecucion", {})
-
-
-        if flags.get("generar_contraprestacion", False):
-            logging.info("[main.py] Generando PDFs de contraprestaciones en paralelo...")
-
-            with ThreadPoolExecutor(max_workers=10) as executor:
-                executor.map(
-                    lambda sid: pdf_contra.generar_individual(sid, df_agentes_contra, resultado, config),
-                    store_ids_contra_faltantes
-                )
-
-            logging.info("[main.py] Generación de contraprestaciones finalizada.")
         else:
-            logging.info("[main.py] generar_contraprestacion=False → Contraprestaciones omitidas.")
-
-        if flags.get("generar_reembolso", False):
-            logging.info("[main.py] Generando PDFs de reembolso en paralelo...")
-
-            with ThreadPoolExecutor(max_workers=10) as executor:
-                executor.map(
-                    lambda sid: pdf_reembolso.generar_individual(sid, df_agentes_reembolso, resultado, config),
-                    store_ids_reembolso_faltantes
-                )
-
-            logging.info("[main.py] Generación de reembolso finalizada.")
-        else:
-            logging.info("[main.py] generar_reembolso=False → Reembolsos omitidos.")
-
-        if flags.get("generar_adquirencia", False):
-            logging.info("[main.py] Generando PDFs de adquirencia en paralelo...")
-
-            with ThreadPoolExecutor(max_workers=10) as executor:
-                executor.map(
-                    lambda sid: pdf_adquirencia.generar_individual(sid, df_agentes_adquirencia, resultado, config),
-                    store_ids_adquirencia_faltantes
-                )
-
-            logging.info("[main.py] Generación de adquirencia finalizada.")
-        else:
-            logging.info("[main.py] generar_adquirencia=False → Adquirencia omitida.")
+            # === Filtrar store_ids por tipo
+            store_ids_contra_faltantes = obtener_faltantes("contraprestacion", resultado["detalle_contra"])
+            store_ids_reembolso_faltantes = obtener_faltantes("reembolso", resultado["detalle_reembolso"])
+            store_ids_adquirencia_faltantes = obtener_faltantes("adquirencia", resultado["detalle_adquirencia"])
+
+            # === Logs
+            logging.info(f"[main.py] {len(store_ids_contra_faltantes)} agentes pendientes para Contraprestaciones.")
+            logging.info(f"[main.py] {len(store_ids_reembolso_faltantes)} agentes pendientes para Reembolso.")
+            logging.info(f"[main.py] {len(store_ids_adquirencia_faltantes)} agentes pendientes para Adquirencia.")
+
+            # === Generación con el backend configurado (ejecucion.backend: hilos | procesos),
+            # un trabajo por agente con todos los tipos que le corresponden
+            pendientes = {}
+            generadores = {}
+            for tipo, faltantes, generador, omitido in [
+                ("contraprestacion", store_ids_contra_faltantes, pdf_contra, "Contraprestaciones omitidas"),
+                ("reembolso", store_ids_reembolso_faltantes, pdf_reembolso, "Reembolsos omitidos"),
+                ("adquirencia", store_ids_adquirencia_faltantes, pdf_adquirencia, "Adquirencia omitida")
+            ]:
+                if flags.get(f"generar_{tipo}", False):
+                    pendientes[tipo] = faltantes
+                    generadores[tipo] = generador
+                else:
+                    logging.info(f"[main.py] generar_{tipo}=False → {omitido}.")
+
+            generar_pdfs(config, resultado, pendientes, generadores)
+            logging.info("[main.py] Generación de PDFs finalizada.")
 
 
         agentes = resultado["agentes"].to_dict(orient="records")
@@ -179,16 +202,15 @@ def main():
             smtp_password=config["correo"]["smtp_password"],
             remitente=config["correo"]["remitente"],
             destinatario_pruebas=config["correo"]["destinatario_pruebas"],
-            pruebas=not config["correo"]["enviar_a_todos"]
+            pruebas=not config["correo"]["enviar_a_todos"],
+            s3_client=s3_client
         )
 
-        s3_client = boto3.client(
-            "s3",
-            aws_access_key_id=aws_output["aws_access_key_id"],
-            aws_secret_access_key=aws_output["aws_secret_access_key"],
-            aws_session_token=aws_output["aws_session_token"]
-        )
+        # La generación acaba de subir PDFs: se vuelve a inventariar para el envío
+        if inventario is not None and any(flags.get(f"generar_{tipo}", False) for tipo in ["contraprestacion", "reembolso", "adquirencia"]):
+            inventario = crear_inventario(s3_client, config)
 
+        transferencias = obtener_transferencias(config, "output")
         enviados = cargar_log_envios(log_path)
         anio, mes = config["periodo"]["anio"], config["periodo"]["mes"]
         periodo_folder = f"{anio}{mes:02}"
@@ -206,23 +228,21 @@ def main():
                     logging.info(f"Agente {store_id} ya tiene correo enviado. Omitido.")
                     return
 
-                from urllib.parse import urlparse
-                def construir_s3_key(s3_uri_base, tipo):
-                    parsed = urlparse(s3_uri_base)
-                    bucket = parsed.netloc
-                    base_key = parsed.path.lstrip("/")
-                    key = f"{base_key}{periodo_folder}/{store_id}.pdf"
-                    return bucket, key
+                def construir_s3_key(s3_uri_base):
+                    bucket, base_key = separar_uri_s3(s3_uri_base)
+                    return bucket, f"{base_key}{periodo_folder}/{store_id}.pdf"
 
                 rutas = config["rutas"]["salida_s3"]
-                keys = {tipo: construir_s3_key(rutas[tipo], tipo) for tipo in ["contraprestacion", "reembolso", "adquirencia"]}
-
-                archivos = {}
-                for tipo, (bucket, key) in keys.items():
-                    archivos[tipo] = download_pdf_from_s3_if_exists(s3_client, bucket, key, subfolder=tipo)
-
-                pdfs_validos = [ruta for ruta in archivos.values() if ruta and os.path.exists(ruta)]
-                if not pdfs_validos:
+                keys = {
+                    tipo: construir_s3_key(rutas[tipo]) for tipo in ["contraprestacion", "reembolso", "adquirencia"]
+                    if inventario is None or inventario.contiene(tipo, store_id)
+                }
+
+                # Una petición get_object por PDF, las tres en paralelo y en memoria (sin temp_emails);
+                # con s3.transferencias.habilitado van al event loop de TransferenciasS3
+                pdfs = transferencias.descargar_varios(keys) if transferencias else obtener_pdfs_s3(s3_client, keys)
+                adjuntos = [(os.path.basename(keys[tipo][1]), contenido) for tipo, contenido in pdfs.items() if contenido]
+                if not adjuntos:
                     logging.warning(f"[main.py] - Archivos PDF no encontrados o no descargados correctamente para {store_id}. Correo omitido.")
                     return
 
@@ -234,9 +254,7 @@ def main():
                     destinatario=email,
                     asunto=config["correo"]["asunto"].format(NOMBRE_MES=nombre_mes, ANIO=anio),
                     mensaje=config["correo"]["mensaje"].format(NOMBRE_MES=nombre_mes, ANIO=anio),
-                    ruta_pdf_contra=archivos["contraprestacion"],
-                    ruta_pdf_reembolso=archivos["reembolso"],
-                    ruta_pdf_adquirencia=archivos["adquirencia"]
+                    adjuntos=adjuntos
                 )
 
                 with open("log_pdfs_existentes.csv", "a", encoding="utf-8") as f:
@@ -246,8 +264,12 @@ def main():
             except Exception as e:
                 logging.error(f"Error enviando correo a {store_id}: {str(e)}")
 
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            executor.map(procesar_agente, agentes)
+        # Pool de correo: 10 hilos fijos, o límite adaptativo (ejecucion.concurrencia_adaptativa)
+        controlador_correo = crear_controlador(config, "correo", 10)
+        with ThreadPoolExecutor(max_workers=controlador_correo.maximo if controlador_correo else 10) as executor:
+            executor.map(controlador_correo.envolver(procesar_agente) if controlador_correo else procesar_agente, agentes)
+        if controlador_correo is not None:
+            controlador_correo.resumen()
 
         logging.info("Envío de correos finalizado.")
 
@@ -274,6 +296,12 @@ def main():
         LoggerConfig.log_exception(e, "main.py")
         print("\nPROCESO ABORTADO. Revisar logs para más detalles.")
 
+    finally:
+        # Cierra los workers wkhtmltopdf persistentes (si se usaron)
+        cerrar_pool()
+        # Termina las subidas/descargas asíncronas pendientes (si se usaron)
+        cerrar_transferencias()
+
 
 if __name__ == "__main__":
     main()
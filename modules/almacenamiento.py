@@ -0,0 +1,141 @@
+import io
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+import fsspec
+from modules.clientes_s3 import obtener_cliente_s3, obtener_filesystem_s3
+
+# Esquemas de URI soportados en rutas.salida_s3 y s3.input.uri_base
+ESQUEMAS = ("s3", "file")
+# Objetos por página en list_objects_v2 (mismo máximo que S3)
+OBJETOS_POR_PAGINA = 1000
+
+
+def esquema(uri: str) -> str:
+    """
+    "s3://bucket/ruta" -> "s3", "file:///datos/ruta" -> "file".
+    """
+    valor = urlparse(uri).scheme
+    if valor not in ESQUEMAS:
+        raise ValueError(f"[almacenamiento] - Esquema no soportado ({', '.join(ESQUEMAS)}): {uri}")
+    return valor
+
+
+class _PaginadorLocal:
+    def __init__(self, cliente):
+        self.cliente = cliente
+
+    def paginate(self, Bucket: str, Prefix: str = "", StartAfter: str = ""):
+        directorio = self.cliente.ruta(Bucket, os.path.dirname(Prefix))
+        keys = []
+        for raiz, _, archivos in os.walk(directorio):
+            for archivo in archivos:
+                if archivo.endswith(".tmp"):
+                    continue
+                relativa = os.path.relpath(os.path.join(raiz, archivo), directorio).replace(os.sep, "/")
+                key = f"{os.path.dirname(Prefix)}/{relativa}" if os.path.dirname(Prefix) else relativa
+                if key.startswith(Prefix) and key > StartAfter:
+                    keys.append(key)
+        keys.sort()
+        for inicio in range(0, max(len(keys), 1), OBJETOS_POR_PAGINA):
+            contenidos = [self.cliente._objeto(Bucket, key) for key in keys[inicio:inicio + OBJETOS_POR_PAGINA]]
+            yield {"Contents": contenidos, "KeyCount": len(contenidos)}
+
+
+class ClienteLocal:
+    """
+    Subconjunto del cliente boto3 S3 sobre el disco local, para rutas file://: la parte
+    "bucket" y la key de la URI forman la ruta del archivo. Generadores, manifiestos,
+    inventario y descarga de adjuntos lo usan igual que al cliente S3, sin red ni credenciales.
+    """
+
+    class exceptions:
+        class NoSuchKey(Exception):
+            pass
+
+    @staticmethod
+    def ruta(bucket: str, key: str) -> str:
+        # file:///datos/x -> bucket "" y key "datos/x" (absoluta); file://salida/x -> relativa al directorio actual
+        return os.path.normpath(os.path.join(bucket or os.sep, key))
+
+    def _objeto(self, bucket: str, key: str) -> dict:
+        stat = os.stat(self.ruta(bucket, key))
+        return {
+            "Key": key,
+            "Size": stat.st_size,
+            "ETag": f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"',
+            "LastModified": datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc)
+        }
+
+    def put_object(self, Bucket: str, Key: str, Body: bytes, **kwargs):
+        ruta = self.ruta(Bucket, Key)
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        # Escritura atómica: un lector nunca ve un PDF a medio escribir
+        with tempfile.NamedTemporaryFile(dir=os.path.dirname(ruta), suffix=".tmp", delete=False) as tmp:
+            tmp.write(Body)
+        os.replace(tmp.name, ruta)
+
+    def upload_file(self, Filename: str, Bucket: str, Key: str, ExtraArgs: dict = None):
+        ruta = self.ruta(Bucket, Key)
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        shutil.copyfile(Filename, ruta)
+
+    def get_object(self, Bucket: str, Key: str) -> dict:
+        try:
+            with open(self.ruta(Bucket, Key), "rb") as f:
+                contenido = f.read()
+        except FileNotFoundError:
+            raise self.exceptions.NoSuchKey(Key)
+        return {"Body": io.BytesIO(contenido), "ContentLength": len(contenido)}
+
+    def head_object(self, Bucket: str, Key: str) -> dict:
+        try:
+            objeto = self._objeto(Bucket, Key)
+        except FileNotFoundError:
+            raise self.exceptions.NoSuchKey(Key)
+        return {"ContentLength": objeto["Size"], "ETag": objeto["ETag"], "LastModified": objeto["LastModified"]}
+
+    def get_paginator(self, operacion: str):
+        if operacion != "list_objects_v2":
+            raise ValueError(f"[ClienteLocal] - Operación no soportada: {operacion}")
+        return _PaginadorLocal(self)
+
+
+_cliente_local = ClienteLocal()
+
+
+def obtener_cliente(uri: str, cuenta: str = "output", config: dict = None):
+    """
+    Cliente con la API de boto3 S3 para la URI: el cliente S3 compartido de la cuenta o ClienteLocal.
+    """
+    if esquema(uri) == "file":
+        return _cliente_local
+    return obtener_cliente_s3(cuenta, config)
+
+
+def salida_local(config: dict) -> bool:
+    """
+    True si rutas.salida_s3 apunta a directorios locales (file://). Todos los tipos usan el mismo esquema.
+    """
+    esquemas = {esquema(uri) for uri in (config or {}).get("rutas", {}).get("salida_s3", {}).values()}
+    if len(esquemas) > 1:
+        raise ValueError("[almacenamiento] - rutas.salida_s3 mezcla rutas s3:// y file://")
+    return esquemas == {"file"}
+
+
+def cliente_salida(config: dict):
+    """
+    Cliente de salida (PDFs, manifiestos, inventario y adjuntos) según el esquema de rutas.salida_s3.
+    """
+    return _cliente_local if salida_local(config) else obtener_cliente_s3("output", config)
+
+
+def obtener_filesystem(uri: str, cuenta: str = "input", config: dict = None):
+    """
+    Filesystem fsspec para leer la URI: S3FileSystem compartido de la cuenta o el disco local.
+    """
+    if esquema(uri) == "file":
+        return fsspec.filesystem("file")
+    return obtener_filesystem_s3(cuenta, config)
@@ -0,0 +1,40 @@
+import os
+import shutil
+import logging
+from pathlib import Path
+
+DIRECTORIO_ESTILOS = "estilos"   # relativo al directorio de templates
+
+
+def preparar_assets(config: dict) -> dict:
+    """
+    Modo assets estáticos (render.assets_estaticos): copia una sola vez el logo y la hoja de
+    estilos de cada template a render.directorio_assets y devuelve sus rutas file://.
+    Los templates las referencian en lugar de incrustar el logo en base64 y el CSS en cada HTML
+    (wkhtmltopdf corre con enable-local-file-access).
+
+    Returns:
+        dict: {"ruta_logo": uri, "css": {template_key: uri}}
+    """
+    directorio = Path(config.get("render", {}).get("directorio_assets", "output/assets")).resolve()
+    os.makedirs(directorio, exist_ok=True)
+
+    logo = Path(config["rutas"]["logo"])
+    destino_logo = directorio / logo.name
+    shutil.copyfile(logo, destino_logo)
+
+    css = {}
+    for clave, ruta in config["rutas"].items():
+        if not clave.startswith("template_"):
+            continue
+        template = Path(ruta)
+        origen = template.parent / DIRECTORIO_ESTILOS / f"{template.stem}.css"
+        if not origen.exists():
+            logging.warning(f"[assets_estaticos] - {ruta} no tiene hoja de estilos en {origen}; se usará CSS en línea.")
+            continue
+        destino = directorio / origen.name
+        shutil.copyfile(origen, destino)
+        css[clave] = destino.as_uri()
+
+    logging.info(f"[assets_estaticos] - Logo y {len(css)} hojas de estilo publicadas en {directorio}")
+    return {"ruta_logo": destino_logo.as_uri(), "css": css}
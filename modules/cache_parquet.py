@@ -0,0 +1,87 @@
+import os
+import hashlib
+import logging
+import tempfile
+import threading
+
+MB = 1024 * 1024
+
+
+class CacheParquetS3:
+    """
+    Caché local en disco para los Parquet de entrada.
+    - La clave es el contenido: bucket/key + ETag (o tamaño + LastModified si no hay ETag).
+    - La frescura se valida con fs.info (una llamada de metadatos, sin descargar).
+    - Al superar max_mb se eliminan los archivos usados hace más tiempo (LRU por mtime).
+    """
+
+    def __init__(self, directorio: str, max_mb: float):
+        self.directorio = directorio
+        self.max_bytes = int(max_mb * MB)
+        self._lock = threading.Lock()
+        os.makedirs(directorio, exist_ok=True)
+
+    @staticmethod
+    def clave(path: str, info: dict) -> str:
+        version = info.get("ETag") or info.get("etag")
+        if not version:
+            version = f"{info.get('size')}-{info.get('LastModified') or info.get('mtime')}"
+        return hashlib.sha256(f"{path}|{version}".encode("utf-8")).hexdigest()
+
+    def _ruta(self, clave: str) -> str:
+        return os.path.join(self.directorio, f"{clave}.parquet")
+
+    def buscar(self, path: str, info: dict):
+        """
+        Devuelve el contenido si el archivo está en caché y vigente; None si no.
+        Se lee a memoria para que una expulsión concurrente no lo invalide.
+        """
+        ruta = self._ruta(self.clave(path, info))
+        try:
+            with open(ruta, "rb") as f:
+                contenido = f.read()
+            os.utime(ruta)  # marca de uso reciente para el LRU
+        except FileNotFoundError:
+            return None
+
+        logging.info(f"[CacheParquetS3] - Hit: {path}")
+        return contenido
+
+    def guardar(self, path: str, info: dict, contenido: bytes) -> str:
+        """
+        Guarda el contenido de forma atómica y aplica la política de expulsión.
+        """
+        ruta = self._ruta(self.clave(path, info))
+        with tempfile.NamedTemporaryFile(dir=self.directorio, suffix=".tmp", delete=False) as tmp:
+            tmp.write(contenido)
+        os.replace(tmp.name, ruta)
+        logging.info(f"[CacheParquetS3] - Guardado: {path} ({len(contenido) / MB:.1f} MB)")
+
+        self._expulsar(conservar=ruta)
+        return ruta
+
+    def _expulsar(self, conservar: str = None):
+        with self._lock:
+            archivos = []
+            for nombre in os.listdir(self.directorio):
+                if not nombre.endswith(".parquet"):
+                    continue
+                ruta = os.path.join(self.directorio, nombre)
+                try:
+                    estado = os.stat(ruta)
+                except FileNotFoundError:
+                    continue
+                archivos.append((estado.st_mtime, estado.st_size, ruta))
+
+            total = sum(tamano for _, tamano, _ in archivos)
+            for _, tamano, ruta in sorted(archivos):
+                if total <= self.max_bytes:
+                    break
+                if ruta == conservar:
+                    continue
+                try:
+                    os.remove(ruta)
+                    total -= tamano
+                    logging.info(f"[CacheParquetS3] - Expulsado por tamaño: {ruta}")
+                except OSError:
+                    pass
@@ -0,0 +1,125 @@
+import os
+import logging
+import threading
+import boto3
+import s3fs
+from botocore.config import Config
+from modules.parquet_loader import opciones_lectura
+
+# Valores por defecto de config["s3"]["cliente"]
+OPCIONES_CLIENTE = {
+    "max_pool_connections": None,   # None = según la concurrencia configurada
+    "modo_reintentos": "adaptive",  # "standard" o "adaptive" (con limitación de tasa del lado cliente)
+    "max_reintentos": 10,
+    "tcp_keepalive": True,
+    "connect_timeout": 10,
+    "read_timeout": 60
+}
+
+# Conexiones extra sobre los hilos de trabajo (manifiestos, listados, reintentos en curso)
+MARGEN_CONEXIONES = 8
+# Hilos del pool de correo en main.py
+HILOS_CORREO = 10
+
+_clientes = {}
+_filesystems = {}
+_lock = threading.Lock()
+
+
+def _reiniciar_tras_fork():
+    """
+    Un proceso hijo (backend procesos) no reutiliza los sockets del padre: crea sus propios clientes.
+    """
+    global _lock
+    _clientes.clear()
+    _filesystems.clear()
+    _lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reiniciar_tras_fork)
+
+
+def credenciales(cuenta: str) -> dict:
+    """
+    Credenciales temporales de la cuenta (input: Parquet de origen, output: PDFs y manifiestos).
+    Se importan al crear el primer cliente: una corrida con rutas file:// no necesita aws_credentials.
+    """
+    from modules.aws_credentials import aws_input, aws_output
+    return {"input": aws_input, "output": aws_output}[cuenta]
+
+
+def opciones_cliente(config: dict = None) -> dict:
+    opciones = dict(OPCIONES_CLIENTE)
+    opciones.update((config or {}).get("s3", {}).get("cliente", {}))
+    return opciones
+
+
+def conexiones_necesarias(config: dict, cuenta: str) -> int:
+    """
+    Tamaño del pool de conexiones para la concurrencia configurada:
+    - input: descargas de Parquet en paralelo (archivos x peticiones por rango),
+    - output: hilos que suben PDFs o descargan adjuntos (generación, concurrencia adaptativa, correo).
+    """
+    ejecucion = config.get("ejecucion", {})
+    if cuenta == "input":
+        lectura = opciones_lectura(config)
+        hilos = lectura["max_workers"] * lectura["workers_por_archivo"]
+    else:
+        hilos = max(ejecucion.get("max_workers") or os.cpu_count() or 1, HILOS_CORREO)
+        if ejecucion.get("concurrencia_adaptativa", False):
+            hilos = max(hilos, ejecucion.get("concurrencia", {}).get("maximo", hilos))
+    return hilos + MARGEN_CONEXIONES
+
+
+def configuracion_botocore(config: dict, cuenta: str) -> dict:
+    """
+    Argumentos de botocore.config.Config (también los usa s3fs vía config_kwargs).
+    """
+    opciones = opciones_cliente(config)
+    return {
+        "max_pool_connections": opciones["max_pool_connections"] or conexiones_necesarias(config or {}, cuenta),
+        "retries": {"mode": opciones["modo_reintentos"], "max_attempts": opciones["max_reintentos"]},
+        "tcp_keepalive": opciones["tcp_keepalive"],
+        "connect_timeout": opciones["connect_timeout"],
+        "read_timeout": opciones["read_timeout"]
+    }
+
+
+def obtener_cliente_s3(cuenta: str = "output", config: dict = None):
+    """
+    Cliente boto3 S3 compartido por todo el proceso para la cuenta "input" u "output".
+    El primero que lo pide fija el tamaño del pool (pasar config para dimensionarlo según
+    la concurrencia); los siguientes reciben el mismo cliente (boto3 es thread-safe).
+    """
+    with _lock:
+        if cuenta not in _clientes:
+            cuenta_aws = credenciales(cuenta)
+            argumentos = configuracion_botocore(config, cuenta)
+            sesion = boto3.session.Session(
+                aws_access_key_id=cuenta_aws["aws_access_key_id"],
+                aws_secret_access_key=cuenta_aws["aws_secret_access_key"],
+                aws_session_token=cuenta_aws["aws_session_token"]
+            )
+            logging.info(
+                f"[clientes_s3] - Cliente S3 {cuenta}: {argumentos['max_pool_connections']} conexiones, "
+                f"reintentos {argumentos['retries']['mode']} ({argumentos['retries']['max_attempts']})"
+            )
+            _clientes[cuenta] = sesion.client("s3", config=Config(**argumentos))
+        return _clientes[cuenta]
+
+
+def obtener_filesystem_s3(cuenta: str = "input", config: dict = None):
+    """
+    S3FileSystem compartido para la cuenta, con el mismo dimensionamiento y reintentos que el cliente.
+    """
+    with _lock:
+        if cuenta not in _filesystems:
+            cuenta_aws = credenciales(cuenta)
+            _filesystems[cuenta] = s3fs.S3FileSystem(
+                key=cuenta_aws["aws_access_key_id"],
+                secret=cuenta_aws["aws_secret_access_key"],
+                token=cuenta_aws["aws_session_token"],
+                config_kwargs=configuracion_botocore(config, cuenta)
+            )
+        return _filesystems[cuenta]
@@ -0,0 +1,181 @@
+import os
+import time
+import logging
+import threading
+import numpy as np
+from collections import deque
+from contextlib import contextmanager
+
+try:
+    import psutil
+except ImportError:  # opcional: sin psutil no se mide el RSS de wkhtmltopdf (la memoria del host solo en Linux)
+    psutil = None
+
+# Valores por defecto de config["ejecucion"]["concurrencia"]
+OPCIONES_CONCURRENCIA = {
+    "minimo": 2,                   # tareas en vuelo nunca por debajo de este valor
+    "maximo": 32,                  # ni por encima (también es el tamaño del pool de hilos)
+    "inicial": None,               # None = max_workers de la etapa
+    "intervalo_segundos": 10,      # cada cuánto se reevalúa el límite
+    "min_muestras": 10,            # tareas terminadas necesarias para reevaluar
+    "min_memoria_libre_pct": 15,   # por debajo se reduce el límite a la fracción "reduccion"
+    "max_rss_hijos_mb": 0,         # RSS total de procesos hijos (wkhtmltopdf); 0 = sin tope
+    "factor_latencia": 1.5,        # p50 sobre la referencia que se considera saturación
+    "ventana_referencia": 6,       # la referencia es la mejor p50 de los últimos N ajustes (no de toda la corrida)
+    "reduccion": 0.7
+}
+
+
+def opciones_concurrencia(config: dict) -> dict:
+    opciones = dict(OPCIONES_CONCURRENCIA)
+    opciones.update(config.get("ejecucion", {}).get("concurrencia", {}))
+    return opciones
+
+
+def memoria_libre_pct():
+    """
+    Porcentaje de memoria disponible del host, o None si no se puede medir.
+    """
+    if psutil is not None:
+        memoria = psutil.virtual_memory()
+        return memoria.available / memoria.total * 100
+    try:
+        with open("/proc/meminfo") as f:
+            valores = {linea.split(":")[0]: int(linea.split()[1]) for linea in f}
+        return valores["MemAvailable"] / valores["MemTotal"] * 100
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def rss_hijos_mb():
+    """
+    Memoria residente sumada de los procesos hijos (workers wkhtmltopdf), o None sin psutil.
+    """
+    if psutil is None:
+        return None
+    total = 0
+    for hijo in psutil.Process(os.getpid()).children(recursive=True):
+        try:
+            total += hijo.memory_info().rss
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            pass
+    return total / (1024 * 1024)
+
+
+class ControladorConcurrencia:
+    """
+    Límite ajustable de tareas en vuelo para un pool de hilos de tamaño "maximo".
+    Cada intervalo_segundos revisa memoria libre del host, RSS de los procesos hijos y la
+    latencia p50 de las tareas terminadas:
+    - con presión de memoria reduce el límite de forma multiplicativa,
+    - si la latencia supera factor_latencia veces la referencia lo baja en uno,
+    - si no, lo sube en uno.
+    La referencia es la mejor p50 de los últimos ventana_referencia ajustes: una racha de
+    agentes chicos no fija un piso que los lotes normales "superen" el resto de la corrida.
+    """
+
+    def __init__(self, nombre: str, opciones: dict, inicial: int):
+        self.nombre = nombre
+        self.minimo = max(1, opciones["minimo"])
+        self.maximo = max(self.minimo, opciones["maximo"])
+        self.opciones = opciones
+        self.limite = min(self.maximo, max(self.minimo, opciones["inicial"] or inicial))
+        self.limite_alcanzado = self.limite
+        self.en_vuelo = 0
+        self._condicion = threading.Condition()
+        self._latencias = []
+        self._p50_recientes = deque(maxlen=max(1, opciones["ventana_referencia"]))
+        self._referencia = None
+        self._ultimo_ajuste = time.monotonic()
+        if opciones["max_rss_hijos_mb"] and psutil is None:
+            logging.warning(
+                f"[ControladorConcurrencia] - {nombre}: max_rss_hijos_mb configurado pero psutil no está "
+                "instalado; el RSS de los procesos hijos no se controla."
+            )
+
+    def adquirir(self):
+        with self._condicion:
+            while self.en_vuelo >= self.limite:
+                self._condicion.wait()
+            self.en_vuelo += 1
+
+    def liberar(self, duracion: float):
+        with self._condicion:
+            self.en_vuelo -= 1
+            self._latencias.append(duracion)
+            if (
+                len(self._latencias) >= self.opciones["min_muestras"]
+                and time.monotonic() - self._ultimo_ajuste >= self.opciones["intervalo_segundos"]
+            ):
+                self._ajustar()
+            self._condicion.notify_all()
+
+    @contextmanager
+    def cupo(self):
+        self.adquirir()
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.liberar(time.perf_counter() - inicio)
+
+    def envolver(self, funcion):
+        """
+        Devuelve funcion ejecutándose dentro de un cupo del controlador.
+        """
+        def envuelta(*args, **kwargs):
+            with self.cupo():
+                return funcion(*args, **kwargs)
+        return envuelta
+
+    def _ajustar(self):
+        p50 = float(np.percentile(self._latencias, 50))
+        self._latencias = []
+        self._ultimo_ajuste = time.monotonic()
+        self._p50_recientes.append(p50)
+        self._referencia = min(self._p50_recientes)
+
+        memoria = memoria_libre_pct()
+        rss = rss_hijos_mb() if self.opciones["max_rss_hijos_mb"] else None
+        presion = (
+            (memoria is not None and memoria < self.opciones["min_memoria_libre_pct"])
+            or (rss is not None and rss > self.opciones["max_rss_hijos_mb"])
+        )
+
+        anterior = self.limite
+        if presion:
+            self.limite = max(self.minimo, int(self.limite * self.opciones["reduccion"]))
+        elif p50 > self._referencia * self.opciones["factor_latencia"]:
+            self.limite = max(self.minimo, self.limite - 1)
+        else:
+            self.limite = min(self.maximo, self.limite + 1)
+        self.limite_alcanzado = max(self.limite_alcanzado, self.limite)
+
+        if self.limite != anterior:
+            logging.info(
+                f"[ControladorConcurrencia] - {self.nombre}: límite {anterior} -> {self.limite} "
+                f"(p50 {p50 * 1000:.0f} ms, referencia {self._referencia * 1000:.0f} ms"
+                f"{f', memoria libre {memoria:.0f}%' if memoria is not None else ''}"
+                f"{f', RSS hijos {rss:.0f} MB' if rss is not None else ''})"
+            )
+
+    def resumen(self):
+        logging.info(
+            f"[ControladorConcurrencia] - {self.nombre}: límite final {self.limite} "
+            f"(máximo alcanzado {self.limite_alcanzado}, rango {self.minimo}-{self.maximo})"
+        )
+
+
+def crear_controlador(config: dict, nombre: str, inicial: int):
+    """
+    Controlador de la etapa si ejecucion.concurrencia_adaptativa está activo; si no, None
+    (la etapa usa su cantidad fija de hilos).
+    """
+    if not config.get("ejecucion", {}).get("concurrencia_adaptativa", False):
+        return None
+    controlador = ControladorConcurrencia(nombre, opciones_concurrencia(config), inicial)
+    logging.info(
+        f"[ControladorConcurrencia] - {nombre}: concurrencia adaptativa entre {controlador.minimo} y "
+        f"{controlador.maximo} tareas (inicial {controlador.limite})"
+    )
+    return controlador
@@ -1,28 +1,294 @@
 import pandas as pd
+import numpy as np
 import logging
-from modules.aws_credentials import aws_input
-import s3fs
+from modules.parquet_loader import cargar_parquets
+from modules.almacenamiento import obtener_filesystem
+
+
+def uri_base_input(config: dict) -> str:
+    """
+    Raíz de los Parquet de origen: s3.input.uri_base (p.ej. "file:///datos/kasnet" para una
+    corrida sin red) o, si no se indica, s3://<s3.input.bucket>.
+    """
+    entrada = config["s3"]["input"]
+    return (entrada.get("uri_base") or f"s3://{entrada['bucket']}").rstrip("/")
+
 
 def construir_path_parquet(tipo: str, config: dict) -> str:
-    bucket = config["s3"]["input"]["bucket"]
     base_path = config["s3"]["input"]["base_path"]
     subcarpeta = config["s3"]["input"]["archivos"][tipo]
     anio = config["periodo"]["anio"]
     mes = str(config["periodo"]["mes"]).zfill(2)
     nombre_archivo = f"{subcarpeta}_{anio}{mes}.parquet"
 
-    return f"s3://{bucket}/{base_path}/{subcarpeta}/{anio}/{mes}/{nombre_archivo}"
+    return f"{uri_base_input(config)}/{base_path}/{subcarpeta}/{anio}/{mes}/{nombre_archivo}"
+
+# Columnas para el modo compacto (config["opciones"]["modo_compacto"])
+COLUMNAS_ID = ["store_id", "pos", "transaction_id", "entity_transaction_id"]
+COLUMNAS_DESCRIPCION = [
+    "entity_description", "company_description", "operation_description", "bonus_type", "discount_type"
+]
+
+
+def memoria_mb(df: pd.DataFrame) -> float:
+    return df.memory_usage(deep=True).sum() / (1024 * 1024)
+
+
+def compactar_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Reduce la memoria del DataFrame sin alterar sus valores:
+    - Descripciones de baja cardinalidad -> category.
+    - Identificadores -> string respaldado por Arrow (sin objetos Python por fila).
+    - Columnas float64 -> float32 solo si todos los valores se representan exactamente
+      (enteros o fracciones binarias como .5); enteros al tipo más pequeño que los contenga.
+
+    Los montos con céntimos (12.34) no tienen representación exacta en float32 y quedan
+    en float64 a propósito: los totales se suman sobre estas columnas y en float32 perderían
+    céntimos. El ahorro de memoria viene de descripciones e identificadores, no de los montos.
+    """
+    df = df.copy()
+
+    for col in COLUMNAS_DESCRIPCION:
+        if col in df.columns and len(df) and df[col].nunique(dropna=False) <= len(df) // 2:
+            df[col] = df[col].astype("category")
+
+    for col in COLUMNAS_ID:
+        if col in df.columns:
+            df[col] = df[col].astype(pd.StringDtype("pyarrow"))
+
+    for col in df.select_dtypes(include=["float64"]).columns:
+        reducida = df[col].astype("float32")
+        if (reducida.astype("float64").fillna(0) == df[col].fillna(0)).all():
+            df[col] = reducida
+
+    for col in df.select_dtypes(include=["int64"]).columns:
+        df[col] = pd.to_numeric(df[col], downcast="integer")
+
+    return df
+
+
+def construir_indice_store(df: pd.DataFrame):
+    """
+    Ordena el DataFrame por store_id (orden estable) y construye un índice
+    store_id -> (inicio, fin) con los offsets de sus filas.
+
+    Returns:
+        tuple: (DataFrame ordenado, dict de offsets por store_id)
+    """
+    df = df.sort_values("store_id", kind="stable").reset_index(drop=True)
+    if df.empty:
+        return df, {}
+
+    ids = df["store_id"].to_numpy()
+    cortes = np.flatnonzero(ids[1:] != ids[:-1]) + 1
+    inicios = np.concatenate(([0], cortes))
+    fines = np.concatenate((cortes, [len(ids)]))
+
+    indice = dict(zip(ids[inicios].tolist(), zip(inicios.tolist(), fines.tolist())))
+    return df, indice
+
+
+def obtener_filas_store(datos: dict, clave: str, store_id: str) -> pd.DataFrame:
+    """
+    Devuelve las filas de datos[clave] del agente en O(1) usando el índice
+    construido en procesar_datos. Si el agente no tiene filas, devuelve un DataFrame vacío.
+    """
+    inicio, fin = datos["indices"][clave].get(store_id, (0, 0))
+    return datos[clave].iloc[inicio:fin]
+
+
+def crear_filesystem_input(config: dict = None):
+    """
+    Filesystem de lectura según el esquema de s3.input.uri_base: S3FileSystem con las credenciales
+    temporales de aws_input (compartido por el proceso) o el disco local para file://.
+    """
+    uri = uri_base_input(config) if config else "s3://"
+    return obtener_filesystem(uri, "input", config)
+
+
+def normalizar_tablas(tablas: dict) -> dict:
+    """
+    Normaliza tipos (store_id, pos, transaction_id siempre str), agrega igv si falta
+    y homologa nombres de campos. tablas: tipo de dataset -> DataFrame tal como se leyó.
+    """
+    tablas = dict(tablas)
+
+    # === NORMALIZACIÓN TIPOS (store_id, pos, transaction_id siempre str) ===
+    for df in tablas.values():
+
+        if "store_id" in df.columns:
+            df["store_id"] = df["store_id"].astype(str)
+        if "pos" in df.columns:
+            df["pos"] = df["pos"].astype(str)
+        if "transaction_id" in df.columns:
+            df["transaction_id"] = df["transaction_id"].astype(str)
+        if "entity_transaction_id" in df.columns:
+            df["entity_transaction_id"] = df["entity_transaction_id"].astype(str)
+
+    # === AGREGAR CAMPO IGV TOTAL SI NO EXISTE (TEMPORAL) ===
+    for tipo in ["contraprestacion", "bonos", "descuentos", "reembolso"]:
+        if "igv" not in tablas[tipo].columns:
+            tablas[tipo]["igv"] = 0.0
+
+    # === RENOMBRAR CAMPOS PARA HOMOGENEIDAD (solo donde aplique) ===
+    # rename sobre un DataFrame vacío no tiene efecto salvo dejar las columnas homologadas,
+    # necesario cuando la tabla de un agente (modo streaming) viene vacía.
+    tablas["reembolso"] = tablas["reembolso"].rename(columns={
+        "entity_descripcion": "entity_description",
+        "comission": "comission_amount"
+    })
+
+    # === RENOMBRAR CAMPOS PARA HOMOGENEIDAD (df_adquirencia) ===
+    tablas["adquirencia"] = tablas["adquirencia"].rename(columns={
+        "credited_amount": "importe_abonado"
+    })
+
+    # === RENOMBRAR CAMPOS PARA COMPATIBILIDAD CON PDF (BONOS Y DESCUENTOS) ===
+    tablas["bonos"] = tablas["bonos"].rename(columns={
+        "description": "bonus_type",
+        "amount": "monto",
+        "amount_igv": "monto_igv"
+    })
+
+    tablas["descuentos"] = tablas["descuentos"].rename(columns={
+        "discount_item": "discount_type",
+        "total_discount_amount": "monto",
+        "total_discount_amount_igv": "monto_igv"
+    })
+
+    return tablas
+
+
+def _totales_por_store(df: pd.DataFrame, **columnas) -> dict:
+    """
+    Suma las columnas indicadas por store_id y devuelve store_id -> {nombre: total}.
+    columnas: nombre del total -> columna a sumar.
+    """
+    if df.empty:
+        return {}
+    totales = df.groupby("store_id", observed=True)[list(columnas.values())].sum()
+    totales.columns = list(columnas.keys())
+    return totales.to_dict(orient="index")
+
+
+def armar_resultado(tablas: dict) -> dict:
+    """
+    Construye el diccionario que consumen los generadores a partir de las tablas
+    normalizadas: detalle indexado por store_id y resúmenes por agente.
+    """
+    df_agentes = tablas["agentes"]
+
+    # === ÍNDICE POR AGENTE (una sola pasada por tabla de detalle) ===
+    df_contra, indice_contra = construir_indice_store(tablas["contraprestacion"])
+    df_bonos, indice_bonos = construir_indice_store(tablas["bonos"])
+    df_desc, indice_desc = construir_indice_store(tablas["descuentos"])
+    df_reembolso, indice_reembolso = construir_indice_store(tablas["reembolso"])
+    df_adquirencia, indice_adquirencia = construir_indice_store(tablas["adquirencia"])
+
+    # === RESÚMENES ===
+    resumen_contra = (
+        df_contra.groupby("store_id")
+        .agg(
+            total_comision=("comission_amount", "sum"),
+            total_operaciones=("transaction_amount", "sum"),
+            total_igv=("comission_amount_igv", "sum"),  # NUEVO CAMPO IGV TOTAL
+            igv=("igv", "sum")   # NUEVO CAMPO IGV
+        )
+        .reset_index()
+    )
+
+
+    resumen_reembolso = (
+        df_reembolso.groupby("store_id")
+        .agg(total_comision=("comission_amount", "sum"),
+             total_operaciones=("transaction_amount", "sum"),
+             total_igv=("comission_amount_igv", "sum"),  # NUEVO CAMPO IGV TOTAL
+             igv=("igv", "sum")   # NUEVO CAMPO IGV
+             )
+        .reset_index()
+    )
+
+    resumen_adquirencia = (
+        df_adquirencia.groupby("store_id")
+        .agg(total_operaciones=("transaction_amount", "sum"),
+             total_comision=("comission_amount_igv", "sum"),
+             importe_abonado=("importe_abonado", "sum")
+             )
+        .reset_index()
+    )
+
+    # === RESÚMENES QUE USAN LOS TEMPLATES (una sola pasada para todo el mes) ===
+    # Por (store_id, entidad/fecha), ordenados igual que el groupby por agente que reemplazan.
+    resumen_contra_entidad, indice_contra_entidad = construir_indice_store(
+        df_contra.groupby(["store_id", "entity_description"], observed=True)
+        .agg(cantidad=("transaction_amount", "count"),
+             total_comision=("comission_amount", "sum"),
+             total_igv=("comission_amount_igv", "sum"),
+             igv=("igv", "sum"))
+        .reset_index()
+    )
+    resumen_reembolso_entidad, indice_reembolso_entidad = construir_indice_store(
+        df_reembolso.groupby(["store_id", "company_description"], observed=True)
+        .agg(cantidad=("transaction_amount", "count"),
+             total_comision=("comission_amount", "sum"))
+        .reset_index()
+    )
+    resumen_adquirencia_fecha, indice_adquirencia_fecha = construir_indice_store(
+        df_adquirencia.groupby(["store_id", "transaction_date"], observed=True)
+        .agg(cantidad=("transaction_amount", "count"),
+             importe_venta=("transaction_amount", "sum"),
+             comision_venta=("comission_amount_igv", "sum"),
+             importe_abonado=("importe_abonado", "sum"))
+        .reset_index()
+    )
+
+    # Totales por agente: store_id -> dict (búsqueda O(1) desde los generadores)
+    totales = {
+        "contra": _totales_por_store(resumen_contra_entidad, cantidad="cantidad", total_comision="total_comision", igv="igv"),
+        "reembolso": _totales_por_store(
+            resumen_reembolso_entidad, cantidad="cantidad", total_comision="total_comision"
+        ),
+        "reembolso_igv": _totales_por_store(df_reembolso, igv="igv"),
+        "adquirencia": _totales_por_store(
+            resumen_adquirencia_fecha, cantidad="cantidad", importe_venta="importe_venta",
+            comision_venta="comision_venta", importe_abonado="importe_abonado"
+        ),
+        "bonos": _totales_por_store(df_bonos, monto="monto", igv="igv"),
+        "desc": _totales_por_store(df_desc, monto="monto", igv="igv")
+    }
+
+    return {
+        "agentes": df_agentes,
+        "detalle_contra": df_contra,
+        "detalle_bonos": df_bonos,
+        "detalle_desc": df_desc,
+        "detalle_reembolso": df_reembolso,
+        "detalle_adquirencia": df_adquirencia,
+        "resumen_contra": resumen_contra,
+        "resumen_reembolso": resumen_reembolso,
+        "resumen_adquirencia": resumen_adquirencia,
+        "resumen_contra_entidad": resumen_contra_entidad,
+        "resumen_reembolso_entidad": resumen_reembolso_entidad,
+        "resumen_adquirencia_fecha": resumen_adquirencia_fecha,
+        "totales": totales,
+        "indices": {
+            "resumen_contra_entidad": indice_contra_entidad,
+            "resumen_reembolso_entidad": indice_reembolso_entidad,
+            "resumen_adquirencia_fecha": indice_adquirencia_fecha,
+            "detalle_contra": indice_contra,
+            "detalle_bonos": indice_bonos,
+            "detalle_desc": indice_desc,
+            "detalle_reembolso": indice_reembolso,
+            "detalle_adquirencia": indice_adquirencia
+        }
+    }
+
 
 def procesar_datos(config: dict) -> dict:
     try:
         logging.info("Cargando datos de los Parquet desde S3...")
 
-        # Crear S3FileSystem con credenciales temporales
-        fs = s3fs.S3FileSystem(
-            key=aws_input["aws_access_key_id"],
-            secret=aws_input["aws_secret_access_key"],
-            token=aws_input["aws_session_token"]
-        )
+        fs = crear_filesystem_input(config)
 
         # # === CARGA DE PARQUET ===
         # df_agentes = pd.read_parquet(config["rutas"]["parquet_agentes"])
@@ -33,12 +299,19 @@ def procesar_datos(config: dict) -> dict:
         # df_reembolso = pd.read_parquet(config["rutas"]["parquet_reembolso"])
         # df_adquirencia = pd.read_parquet(config["rutas"]["parquet_adquirencia"])
 
-        df_agentes = pd.read_parquet(construir_path_parquet("agentes", config), filesystem=fs, engine="pyarrow")
-        df_contra = pd.read_parquet(construir_path_parquet("contraprestacion", config), filesystem=fs, engine="pyarrow")
-        df_bonos = pd.read_parquet(construir_path_parquet("bonos", config), filesystem=fs, engine="pyarrow")
-        df_desc = pd.read_parquet(construir_path_parquet("descuentos", config), filesystem=fs, engine="pyarrow")
-        df_reembolso = pd.read_parquet(construir_path_parquet("reembolso", config), filesystem=fs, engine="pyarrow")
-        df_adquirencia = pd.read_parquet(construir_path_parquet("adquirencia", config), filesystem=fs, engine="pyarrow")
+        # === CARGA CONCURRENTE DE LOS SEIS PARQUET ===
+        # Los detalles se decodifican solo con las columnas declaradas y las filas
+        # de los store_id presentes en agentes (filtro empujado a pyarrow).
+        tipos = ["agentes", "contraprestacion", "bonos", "descuentos", "reembolso", "adquirencia"]
+        rutas = {tipo: construir_path_parquet(tipo, config) for tipo in tipos}
+        dfs, tiempos_carga = cargar_parquets(fs, rutas, config, filtrar_por="agentes")
+
+        df_agentes = dfs["agentes"]
+        df_contra = dfs["contraprestacion"]
+        df_bonos = dfs["bonos"]
+        df_desc = dfs["descuentos"]
+        df_reembolso = dfs["reembolso"]
+        df_adquirencia = dfs["adquirencia"]
 
         logging.info(
             f"Parquet cargados correctamente: "
@@ -50,63 +323,26 @@ def procesar_datos(config: dict) -> dict:
             f"Adquirencia: {df_adquirencia.shape}"
         )
 
-        # === NORMALIZACIÓN TIPOS (store_id, pos, transaction_id siempre str) ===
-        for df in [df_agentes, df_contra, df_bonos, df_desc, df_reembolso, df_adquirencia]:
-
-            if "store_id" in df.columns:
-                df["store_id"] = df["store_id"].astype(str)
-            if "pos" in df.columns:
-                df["pos"] = df["pos"].astype(str)
-            if "transaction_id" in df.columns:
-                df["transaction_id"] = df["transaction_id"].astype(str)
-            if "entity_transaction_id" in df.columns:
-                df["entity_transaction_id"] = df["entity_transaction_id"].astype(str)
-
-        # === AGREGAR CAMPO IGV TOTAL SI NO EXISTE (TEMPORAL) ===
-        if "igv" not in df_contra.columns:
-            df_contra["igv"] = 0.0
-
-        if "igv" not in df_bonos.columns:
-            df_bonos["igv"] = 0.0
+        # === NORMALIZACIÓN DE TIPOS Y NOMBRES DE CAMPOS ===
+        tablas = normalizar_tablas(dfs)
 
-        if "igv" not in df_desc.columns:
-            df_desc["igv"] = 0.0
-
-        if "igv" not in df_reembolso.columns:
-            df_reembolso["igv"] = 0.0
-
-
-        # === RENOMBRAR CAMPOS PARA HOMOGENEIDAD (solo donde aplique) ===
-        if not df_reembolso.empty:
-            df_reembolso = df_reembolso.rename(columns={
-                "entity_descripcion": "entity_description",
-                "comission": "comission_amount"
-            }
-            )
+        # === MODO COMPACTO (opcional) ===
+        if config.get("opciones", {}).get("modo_compacto", False):
+            antes = {nombre: memoria_mb(df) for nombre, df in tablas.items()}
+            tablas = {nombre: compactar_dataframe(df) for nombre, df in tablas.items()}
 
-        # === RENOMBRAR CAMPOS PARA HOMOGENEIDAD (df_adquirencia) ===
-        if not df_adquirencia.empty:
-            df_adquirencia = df_adquirencia.rename(columns={
-                "credited_amount": "importe_abonado"
-            }
+            for nombre, df in tablas.items():
+                logging.info(f"[data_processor] - Modo compacto {nombre}: {antes[nombre]:.1f} MB -> {memoria_mb(df):.1f} MB")
+            logging.info(
+                f"[data_processor] - Modo compacto total: {sum(antes.values()):.1f} MB -> "
+                f"{sum(memoria_mb(df) for df in tablas.values()):.1f} MB"
             )
 
-        # === RENOMBRAR CAMPOS PARA COMPATIBILIDAD CON PDF (BONOS Y DESCUENTOS) ===
-        if not df_bonos.empty:
-            df_bonos = df_bonos.rename(columns={
-                "description": "bonus_type",
-                "amount": "monto",
-                "amount_igv": "monto_igv"
-            })
-
-        if not df_desc.empty:
-            df_desc = df_desc.rename(columns={
-                "discount_item": "discount_type",
-                "total_discount_amount": "monto",
-                "total_discount_amount_igv": "monto_igv"
-            })
+        df_agentes, df_contra, df_bonos = tablas["agentes"], tablas["contraprestacion"], tablas["bonos"]
+        df_desc, df_reembolso, df_adquirencia = tablas["descuentos"], tablas["reembolso"], tablas["adquirencia"]
 
         # === CRUCE CONTRA TABLA PRINCIPAL (AGENTES) ===
+        # Ya filtrado en la lectura; se mantiene por si algún archivo no admitió el filtro.
         df_contra = df_contra[df_contra["store_id"].isin(df_agentes["store_id"])]
         df_bonos = df_bonos[df_bonos["store_id"].isin(df_agentes["store_id"])]
         df_desc = df_desc[df_desc["store_id"].isin(df_agentes["store_id"])]
@@ -122,37 +358,11 @@ def procesar_datos(config: dict) -> dict:
         logging.info(f"Agentes con reembolso: {df_reembolso['store_id'].nunique()}")
         logging.info(f"Agentes con adquirencia: {df_adquirencia['store_id'].nunique()}")  
 
-        # === RESÚMENES ===
-        resumen_contra = (
-            df_contra.groupby("store_id")
-            .agg(
-                total_comision=("comission_amount", "sum"),
-                total_operaciones=("transaction_amount", "sum"),
-                total_igv=("comission_amount_igv", "sum"),  # NUEVO CAMPO IGV TOTAL
-                igv=("igv", "sum")   # NUEVO CAMPO IGV
-            )
-            .reset_index()
-        )
-
-
-        resumen_reembolso = (
-            df_reembolso.groupby("store_id")
-            .agg(total_comision=("comission_amount", "sum"),
-                 total_operaciones=("transaction_amount", "sum"),
-                 total_igv=("comission_amount_igv", "sum"),  # NUEVO CAMPO IGV TOTAL
-                 igv=("igv", "sum")   # NUEVO CAMPO IGV
-                 )
-            .reset_index()
-        )
-
-        resumen_adquirencia = (
-            df_adquirencia.groupby("store_id")
-            .agg(total_operaciones=("transaction_amount", "sum"),
-                 total_comision=("comission_amount_igv", "sum"),
-                 importe_abonado=("importe_abonado", "sum")
-                 )
-            .reset_index()
-        )
+        resultado = armar_resultado({
+            "agentes": df_agentes, "contraprestacion": df_contra, "bonos": df_bonos,
+            "descuentos": df_desc, "reembolso": df_reembolso, "adquirencia": df_adquirencia
+        })
+        resultado["tiempos_carga"] = tiempos_carga
 
         logging.info("Procesamiento de datos finalizado correctamente.")
         logging.info(
@@ -164,18 +374,7 @@ def procesar_datos(config: dict) -> dict:
             f"Adquirencia: {df_adquirencia['store_id'].nunique()}"
         )
 
-        return {
-            "agentes": df_agentes,
-            "detalle_contra": df_contra,
-            "detalle_bonos": df_bonos,
-            "detalle_desc": df_desc,
-            "detalle_reembolso": df_reembolso,
-            "detalle_adquirencia": df_adquirencia,
-            "resumen_contra": resumen_contra,
-            "resumen_reembolso": resumen_reembolso,
-            "resumen_adquirencia": resumen_adquirencia
-            
-        }
+        return resultado
 
     except Exception as e:
         logging.error("Error procesando los datos desde los Parquet.", exc_info=True)
@@ -0,0 +1,306 @@
+import os
+import logging
+import numpy as np
+from multiprocessing.util import Finalize
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from modules.logger_config import LoggerConfig
+from modules.pdf_generator import (
+    PDFGeneratorContraprestaciones, PDFGeneratorReembolso, PDFGeneratorAdquirencia, cabecera_agente,
+    precompilar_templates
+)
+from modules.render_pool import cerrar_pool
+from modules.transferencias_s3 import cerrar_transferencias
+from modules.concurrencia import crear_controlador
+from modules.almacenamiento import cliente_salida
+
+# tipo -> (clase generadora, clave del detalle en el resultado de procesar_datos)
+GENERADORES = {
+    "contraprestacion": (PDFGeneratorContraprestaciones, "detalle_contra"),
+    "reembolso": (PDFGeneratorReembolso, "detalle_reembolso"),
+    "adquirencia": (PDFGeneratorAdquirencia, "detalle_adquirencia")
+}
+
+# Valores por defecto de config["ejecucion"]
+OPCIONES_EJECUCION = {
+    "backend": "hilos",          # "hilos" o "procesos"
+    "max_workers": 10,           # hilos, o procesos (None = núcleos de la máquina)
+    "hilos_por_proceso": 2,      # en modo procesos: PDFs simultáneos dentro de cada proceso
+    "lotes_por_worker": 1,       # en modo procesos: porciones de agentes por proceso
+    "concurrencia_adaptativa": False  # en modo hilos: límite de PDFs en vuelo ajustado en marcha (ejecucion.concurrencia)
+}
+
+
+def opciones_ejecucion(config: dict) -> dict:
+    opciones = dict(OPCIONES_EJECUCION)
+    opciones.update({k: v for k, v in config.get("ejecucion", {}).items() if k in OPCIONES_EJECUCION})
+    if opciones["backend"] not in ("hilos", "procesos"):
+        raise ValueError(f"[ejecucion] - backend desconocido: {opciones['backend']}")
+    if not opciones["max_workers"]:
+        opciones["max_workers"] = os.cpu_count() or 1
+    return opciones
+
+
+def porcion_datos(datos: dict, store_ids) -> dict:
+    """
+    Recorta el resultado de procesar_datos a los store_id dados, con sus propios índices.
+    Es lo que recibe cada proceso: solo las filas de sus agentes, no el mes completo.
+    """
+    store_ids = set(store_ids)
+    porcion = {
+        "agentes": datos["agentes"][datos["agentes"]["store_id"].isin(store_ids)].reset_index(drop=True),
+        "totales": {
+            nombre: {sid: valores for sid, valores in totales.items() if sid in store_ids}
+            for nombre, totales in datos["totales"].items()
+        },
+        "indices": {}
+    }
+
+    for clave, indice in datos["indices"].items():
+        # Las filas de cada agente son contiguas: se copian los rangos y se recalculan los offsets
+        rangos = [(sid, indice[sid]) for sid in sorted(store_ids) if sid in indice]
+        posiciones = [np.arange(inicio, fin) for _, (inicio, fin) in rangos]
+        filas = np.concatenate(posiciones) if posiciones else np.array([], dtype=int)
+        porcion[clave] = datos[clave].iloc[filas].reset_index(drop=True)
+
+        nuevo_indice, desplazamiento = {}, 0
+        for sid, (inicio, fin) in rangos:
+            nuevo_indice[sid] = (desplazamiento, desplazamiento + fin - inicio)
+            desplazamiento += fin - inicio
+        porcion["indices"][clave] = nuevo_indice
+
+    return porcion
+
+
+ESTADOS = ("generado", "sin_datos", "sin_cambios", "error")
+
+
+def generar_estados_agente(generadores: dict, tipos: list, store_id: str, row: dict, datos: dict, config: dict) -> dict:
+    """
+    Trabajo unificado por agente: una sola búsqueda del agente y una sola cabecera para
+    todos los tipos que le corresponden. Si un tipo falla, los demás se generan igual.
+
+    Returns:
+        dict: tipo -> estado ("generado", "sin_datos", "sin_cambios" o "error")
+    """
+    try:
+        cabecera = cabecera_agente(store_id, row, config)
+    except Exception as e:
+        # Fila del agente mal formada: fallan solo los tipos de este agente, no el lote
+        logging.error(f"[ejecucion] - Error armando la cabecera de {store_id}: {e}", exc_info=True)
+        return dict.fromkeys(tipos, "error")
+
+    estados = {}
+    for tipo in tipos:
+        try:
+            estados[tipo] = generadores[tipo].generar_agente(store_id, row, datos, config, cabecera)
+        except Exception as e:
+            logging.error(f"[ejecucion] - Error generando PDF de {tipo} para {store_id}: {e}", exc_info=True)
+            estados[tipo] = "error"
+    return estados
+
+
+def trabajos_por_agente(datos: dict, pendientes: dict) -> list:
+    """
+    Invierte pendientes (tipo -> store_ids) a una lista de (store_id, fila del agente, tipos),
+    ubicando cada agente en df_agentes una sola vez.
+    """
+    filas = {}
+    for row in datos["agentes"].to_dict(orient="records"):
+        filas.setdefault(str(row["store_id"]), row)
+
+    tipos_por_agente = {}
+    for tipo, store_ids in pendientes.items():
+        for store_id in store_ids:
+            tipos_por_agente.setdefault(store_id, []).append(tipo)
+
+    trabajos = []
+    for store_id in sorted(tipos_por_agente):
+        row = filas.get(store_id)
+        if row is None:
+            logging.warning(f"[ejecucion] - Agente {store_id} no encontrado en df_agentes.")
+            continue
+        trabajos.append((store_id, row, tipos_por_agente[store_id]))
+    return trabajos
+
+
+def _ejecutar_trabajos(generadores: dict, trabajos: list, datos: dict, config: dict, hilos: int,
+                       controlador=None) -> dict:
+    """
+    Ejecuta los trabajos por agente en un pool de hilos; los tres tipos de un agente van
+    en la misma tarea, así el pool no se vacía entre un tipo y el siguiente.
+    Con controlador, el pool tiene su máximo de hilos y el controlador decide cuántos trabajan.
+
+    Returns:
+        dict: tipo -> {estado: cantidad}
+    """
+    def tarea(trabajo):
+        return generar_estados_agente(generadores, trabajo[2], trabajo[0], trabajo[1], datos, config)
+
+    if controlador is not None:
+        tarea = controlador.envolver(tarea)
+        hilos = controlador.maximo
+
+    conteo = {}
+    with ThreadPoolExecutor(max_workers=hilos) as executor:
+        resultados = executor.map(tarea, trabajos)
+        for estados in resultados:
+            for tipo, estado in estados.items():
+                conteo.setdefault(tipo, dict.fromkeys(ESTADOS, 0))[estado] += 1
+    return conteo
+
+
+def subidas_fallidas(generadores: dict) -> dict:
+    """
+    tipo -> store_id cuya subida asíncrona falló (espera a que terminen las subidas en curso).
+    """
+    fallidas = {tipo: generador.extraer_subidas_fallidas() for tipo, generador in generadores.items()}
+    return {tipo: store_ids for tipo, store_ids in fallidas.items() if store_ids}
+
+
+def reclasificar_fallidas(conteo: dict, fallidas: dict):
+    """
+    Pasa de "generado" a "error" los agentes cuyo PDF se encoló pero no llegó a S3.
+    """
+    for tipo, store_ids in fallidas.items():
+        c = conteo.setdefault(tipo, dict.fromkeys(ESTADOS, 0))
+        c["generado"] -= len(store_ids)
+        c["error"] += len(store_ids)
+        logging.error(f"[ejecucion] - {tipo}: {len(store_ids)} PDF(s) no se pudieron subir: {', '.join(sorted(store_ids))}")
+
+
+def registrar_conteo(conteo: dict, pendientes: dict):
+    for tipo, store_ids in pendientes.items():
+        c = conteo.get(tipo, dict.fromkeys(ESTADOS, 0))
+        logging.info(
+            f"[ejecucion] - {tipo}: {c['generado']} generados, {c['sin_datos']} sin datos, "
+            f"{c['sin_cambios']} sin cambios, {c['error']} con error (de {len(store_ids)} pendientes)."
+        )
+
+
+# === Estado de cada proceso worker (modo procesos) ===
+_config_worker = None
+_generadores_worker = None
+
+
+def _inicializar_worker(config: dict):
+    """
+    Se ejecuta una vez por proceso: configura logging y crea sus propios generadores
+    (cliente S3 y templates compilados no se comparten entre procesos).
+    """
+    global _config_worker, _generadores_worker
+    LoggerConfig.setup_logger("logs_ejecucion_general")
+    _config_worker = config
+    _generadores_worker = crear_generadores(config, GENERADORES)
+    # Cierra los workers wkhtmltopdf de este proceso al terminar
+    Finalize(None, cerrar_pool, exitpriority=10)
+    Finalize(None, cerrar_transferencias, exitpriority=10)
+    logging.info(f"[ejecucion] - Proceso worker {os.getpid()} inicializado.")
+
+
+def _generar_lote(trabajos: list, datos: dict, hilos: int) -> tuple:
+    """
+    Genera en un proceso worker los PDFs de su porción de agentes.
+
+    Returns:
+        tuple: (tipo -> {estado: cantidad}, tipo -> hashes de contexto nuevos store_id -> hash)
+    """
+    conteo = _ejecutar_trabajos(_generadores_worker, trabajos, datos, _config_worker, hilos)
+    reclasificar_fallidas(conteo, subidas_fallidas(_generadores_worker))
+    # El manifiesto lo guarda el proceso principal: aquí solo se devuelven los hashes nuevos
+    nuevos = {
+        tipo: manifiesto.extraer_nuevos()
+        for generador in _generadores_worker.values() for tipo, manifiesto in generador.manifiestos.items()
+    }
+    return conteo, nuevos
+
+
+def crear_generadores(config: dict, tipos) -> dict:
+    """
+    Un generador por tipo, compartiendo el cliente de salida del proceso (S3 o disco local).
+    """
+    s3_client = cliente_salida(config)
+    return {tipo: GENERADORES[tipo][0](config, s3_client=s3_client) for tipo in tipos}
+
+
+def _lotes(trabajos: list, cantidad: int) -> list:
+    cantidad = max(1, min(cantidad, len(trabajos)))
+    tamano, resto = divmod(len(trabajos), cantidad)
+    lotes, inicio = [], 0
+    for i in range(cantidad):
+        fin = inicio + tamano + (1 if i < resto else 0)
+        lotes.append(trabajos[inicio:fin])
+        inicio = fin
+    return lotes
+
+
+def generar_pdfs(config: dict, datos: dict, pendientes: dict, generadores: dict = None):
+    """
+    Genera los PDFs pendientes con el backend de config["ejecucion"]["backend"],
+    con un trabajo por agente que produce todos los tipos que le corresponden.
+
+    Args:
+        datos (dict): resultado de procesar_datos.
+        pendientes (dict): tipo -> lista de store_id a generar (solo tipos habilitados).
+        generadores (dict): tipo -> generador ya creado (se crean si no se indican).
+    """
+    opciones = opciones_ejecucion(config)
+    max_workers = opciones["max_workers"]
+    pendientes = {tipo: list(sids) for tipo, sids in pendientes.items() if len(sids)}
+    if not pendientes:
+        logging.info("[ejecucion] - No hay PDFs pendientes.")
+        return
+
+    generadores = generadores or crear_generadores(config, pendientes)
+    trabajos = trabajos_por_agente(datos, pendientes)
+
+    if opciones["backend"] == "hilos":
+        logging.info(
+            f"[ejecucion] - Generando PDFs de {', '.join(pendientes)} para {len(trabajos)} agentes con {max_workers} hilos..."
+        )
+        controlador = crear_controlador(config, "generacion", max_workers)
+        conteo = _ejecutar_trabajos(generadores, trabajos, datos, config, max_workers, controlador)
+        if controlador is not None:
+            controlador.resumen()
+    else:
+        # === Modo procesos: cada proceso recibe una sola vez la porción de datos de sus agentes ===
+        if opciones["concurrencia_adaptativa"]:
+            logging.warning("[ejecucion] - concurrencia_adaptativa solo aplica al backend hilos; se ignora en modo procesos.")
+        lotes = _lotes(trabajos, max_workers * opciones["lotes_por_worker"])
+        logging.info(
+            f"[ejecucion] - Generando PDFs de {', '.join(pendientes)} para {len(trabajos)} agentes "
+            f"con {max_workers} procesos ({len(lotes)} porciones, {opciones['hilos_por_proceso']} hilos por proceso)..."
+        )
+
+        # Templates precompilados una sola vez aquí: los workers solo los cargan
+        precompilar_templates(config)
+        conteo = {}
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_inicializar_worker, initargs=(config,)) as executor:
+            futuros = [
+                executor.submit(
+                    _generar_lote, lote, porcion_datos(datos, [store_id for store_id, _, _ in lote]),
+                    opciones["hilos_por_proceso"]
+                )
+                for lote in lotes
+            ]
+
+            for futuro in futuros:
+                try:
+                    conteo_lote, nuevos = futuro.result()
+                except Exception as e:
+                    logging.error(f"[ejecucion] - Error en proceso worker: {e}", exc_info=True)
+                    continue
+                for tipo, estados in conteo_lote.items():
+                    for estado, cantidad in estados.items():
+                        conteo.setdefault(tipo, dict.fromkeys(ESTADOS, 0))[estado] += cantidad
+                for tipo, hashes in nuevos.items():
+                    if tipo in generadores:
+                        manifiesto = generadores[tipo].manifiesto(tipo)
+                        for store_id, hash_contexto in hashes.items():
+                            manifiesto.registrar(store_id, hash_contexto)
+
+    # Backend hilos: las subidas asíncronas fallidas se descuentan antes del resumen
+    # (en modo procesos cada worker ya las descontó de su conteo)
+    reclasificar_fallidas(conteo, subidas_fallidas(generadores))
+    registrar_conteo(conteo, pendientes)
+    for generador in generadores.values():
+        generador.guardar_manifiestos()
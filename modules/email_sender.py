@@ -2,30 +2,24 @@ import smtplib
 import ssl
 import os
 import logging
-import tempfile
-import boto3
-from urllib.parse import urlparse
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.mime.base import MIMEBase
 from email import encoders
-from modules.aws_credentials import aws_output
+from modules.clientes_s3 import obtener_cliente_s3
+from modules.utils_s3 import obtener_pdf_s3, separar_uri_s3
+from modules.almacenamiento import obtener_cliente
 
 
 class EmailSender:
-    def __init__(self, smtp_user: str, smtp_password: str, remitente, destinatario_pruebas: str, pruebas: bool = True):
+    def __init__(self, smtp_user: str, smtp_password: str, remitente, destinatario_pruebas: str, pruebas: bool = True, s3_client=None):
         self.smtp_user = smtp_user
         self.smtp_password = smtp_password
         self.remitente = remitente
         self.destinatario_pruebas = destinatario_pruebas
         self.pruebas = pruebas
-        #self.s3_client = boto3.client("s3")  # Modificado por aws_output
-        self.s3_client = boto3.client(
-        "s3",
-        aws_access_key_id=aws_output["aws_access_key_id"],
-        aws_secret_access_key=aws_output["aws_secret_access_key"],
-        aws_session_token=aws_output["aws_session_token"]
-        )
+        # Cliente de salida compartido (credenciales aws_output, o ClienteLocal con rutas file://)
+        self.s3_client = s3_client or obtener_cliente_s3("output")
         
         logging.info(f"[EmailSender] Inicializado en modo {'PRUEBA' if pruebas else 'PRODUCCIÓN'}.")
 
@@ -39,8 +33,14 @@ class EmailSender:
         mensaje: str,
         ruta_pdf_contra: str = None,
         ruta_pdf_reembolso: str = None,
-        ruta_pdf_adquirencia: str = None
+        ruta_pdf_adquirencia: str = None,
+        adjuntos: list = None
     ):
+        """
+        Envía el correo con los PDF adjuntos. Las rutas pueden ser locales, s3:// o file:// (se leen
+        a memoria); adjuntos es una lista de (nombre de archivo, bytes) ya leídos, p.ej. con
+        obtener_pdfs_s3, y no pasa por disco.
+        """
         # Construimos solo las rutas válidas
         archivos = []
 
@@ -51,7 +51,7 @@ class EmailSender:
         if ruta_pdf_adquirencia:
             archivos.append(ruta_pdf_adquirencia)
 
-        archivos_locales = []
+        contenidos = list(adjuntos or [])
 
         try:
             if self.pruebas:
@@ -68,56 +68,40 @@ class EmailSender:
             msg.attach(MIMEText(mensaje, "plain"))
 
             for ruta in archivos:
-                local_path = None
-                if not ruta:
-                    continue
-                if ruta.startswith("s3://"):
+                if ruta.startswith(("s3://", "file://")):
+                    cliente = self.s3_client if ruta.startswith("s3://") else obtener_cliente(ruta)
                     try:
-                        local_path = self._descargar_s3_temp(ruta)
-                        archivos_locales.append(local_path)
-                        logging.info(f"Archivo descargado de S3: {ruta}")
+                        contenido = obtener_pdf_s3(cliente, *separar_uri_s3(ruta))
                     except Exception as e:
                         logging.error(f"Error al descargar archivo S3 {ruta}: {e}")
                         continue
+                    if contenido is None:
+                        continue
+                    logging.info(f"Archivo descargado de S3: {ruta}")
                 elif os.path.exists(ruta):
-                    local_path = ruta
-                    archivos_locales.append(local_path)
+                    with open(ruta, "rb") as file:
+                        contenido = file.read()
                 else:
                     logging.warning(f"Ruta no válida u omitida: {ruta}")
                     continue
+                contenidos.append((os.path.basename(ruta), contenido))
 
-                if local_path:
-                    try:
-                        with open(local_path, "rb") as file:
-                            part = MIMEBase("application", "octet-stream")
-                            part.set_payload(file.read())
-                            encoders.encode_base64(part)
-                            part.add_header("Content-Disposition", f'attachment; filename="{os.path.basename(local_path)}"')
-                            msg.attach(part)
-                            logging.info(f"PDF adjuntado: {local_path}")
-                    except Exception as e:
-                        logging.error(f"No se pudo adjuntar {local_path}: {e}")
-
+            for nombre, contenido in contenidos:
+                part = MIMEBase("application", "octet-stream")
+                part.set_payload(contenido)
+                encoders.encode_base64(part)
+                part.add_header("Content-Disposition", f'attachment; filename="{nombre}"')
+                msg.attach(part)
+                logging.info(f"PDF adjuntado: {nombre}")
 
+            logging.info(f"[EmailSender] Enviando {len(contenidos)} PDF(s) adjunto(s) a {destinatario}")
             contexto = ssl.create_default_context()
             with smtplib.SMTP_SSL(servidor_smtp, puerto_smtp, context=contexto) as server:
                 server.login(self.smtp_user, self.smtp_password)
                 server.sendmail(remitente, destinatario, msg.as_string())
 
-            
-            logging.info(f"[EmailSender] Enviando {len(archivos)} PDF(s) adjunto(s) a {destinatario}")
             logging.info(f"Correo enviado correctamente a {destinatario}")
 
         except Exception as e:
             logging.exception(f"Error al enviar correo a {destinatario}")
             raise
-
-        finally:
-            # Borrar archivos temporales
-            for tmp_file in archivos_locales:
-                if tmp_file and tmp_file.startswith(tempfile.gettempdir()):
-                    try:
-                        os.remove(tmp_file)
-                        logging.info(f"Archivo temporal eliminado: {tmp_file}")
-                    except Exception as e:
-                        logging.warning(f"No se pudo eliminar archivo temporal {tmp_file}: {e}")
@@ -0,0 +1,155 @@
+import os
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from modules.utils_s3 import separar_uri_s3
+
+# Valores por defecto de config["s3"]["inventario"]
+OPCIONES_INVENTARIO = {
+    "habilitado": True,
+    # Primer carácter de los nombres de archivo: cada uno se lista en paralelo como un prefijo aparte
+    # (las keys con otro primer carácter se listan aparte, por rango). [] o "" lista el prefijo del
+    # periodo completo en una sola secuencia.
+    "particiones": "0123456789",
+    "max_workers": 16
+}
+
+# Mayor carácter Unicode: prefijo + MAXIMO queda después de toda key que empiece con prefijo
+MAXIMO = chr(0x10FFFF)
+
+
+def opciones_inventario(config: dict) -> dict:
+    opciones = dict(OPCIONES_INVENTARIO)
+    opciones.update(config.get("s3", {}).get("inventario", {}))
+    return opciones
+
+
+class InventarioS3:
+    """
+    PDFs existentes por tipo en el periodo: tipo -> {store_id: (tamaño, etag, última modificación)}.
+    Se arma con list_objects_v2 (1000 objetos por petición) en lugar de consultar objeto por objeto.
+    """
+
+    def __init__(self, objetos: dict = None):
+        self.objetos = objetos or {}
+
+    def store_ids(self, tipo: str) -> set:
+        return set(self.objetos.get(tipo, {}))
+
+    def contiene(self, tipo: str, store_id: str) -> bool:
+        return str(store_id) in self.objetos.get(tipo, {})
+
+    def info(self, tipo: str, store_id: str):
+        """
+        (tamaño, etag, última modificación) del PDF del agente, o None si no existe.
+        """
+        return self.objetos.get(tipo, {}).get(str(store_id))
+
+    def total(self, tipo: str) -> int:
+        return len(self.objetos.get(tipo, {}))
+
+
+def _listar_particion(s3_client, bucket: str, prefijo: str, despues_de: str = None, antes_de: str = None,
+                      excluir: tuple = ()) -> tuple:
+    """
+    Lista todas las páginas de un prefijo, opcionalmente solo las keys en el rango (despues_de, antes_de)
+    y sin las que empiezan con excluir (ya listadas por su partición).
+    Devuelve ({store_id: (tamaño, etag, última modificación)}, páginas).
+    """
+    objetos = {}
+    paginas = 0
+    paginador = s3_client.get_paginator("list_objects_v2")
+    argumentos = {"Bucket": bucket, "Prefix": prefijo}
+    if despues_de:
+        argumentos["StartAfter"] = despues_de
+    for pagina in paginador.paginate(**argumentos):
+        paginas += 1
+        for obj in pagina.get("Contents", []):
+            if antes_de is not None and obj["Key"] >= antes_de:
+                # S3 devuelve las keys ordenadas: el resto del rango ya lo cubre una partición
+                return objetos, paginas
+            if excluir and obj["Key"].startswith(excluir):
+                # p.ej. "9" + MAXIMO + "x" queda después del centinela pero es de la partición "9"
+                continue
+            nombre = os.path.basename(obj["Key"])
+            if nombre.endswith(".pdf"):
+                objetos[nombre[:-len(".pdf")]] = (obj["Size"], obj["ETag"].strip('"'), obj["LastModified"])
+    return objetos, paginas
+
+
+def rangos_sin_particion(base: str, particiones: list) -> list:
+    """
+    Rangos (despues_de, antes_de) de keys bajo base que no empiezan con ninguna partición:
+    antes de la primera, entre particiones no consecutivas y después de la última.
+    Con particiones "0123456789" son dos listados (normalmente de una página cada uno).
+    """
+    particiones = sorted(p for p in particiones if p)
+    if not particiones:
+        return []
+    rangos = [(None, base + particiones[0])]
+    for actual, siguiente in zip(particiones, particiones[1:]):
+        consecutivas = len(actual) == len(siguiente) == 1 and ord(siguiente) == ord(actual) + 1
+        if not consecutivas:
+            rangos.append((base + actual + MAXIMO, base + siguiente))
+    rangos.append((base + particiones[-1] + MAXIMO, None))
+    return rangos
+
+
+def escanear_inventario(s3_client, config: dict, tipos: list = None) -> InventarioS3:
+    """
+    Lista en paralelo el prefijo del periodo de cada ruta de config["rutas"]["salida_s3"],
+    partido por el primer carácter del store_id (s3.inventario.particiones). Las keys que no
+    empiezan con ninguna partición se cubren con listados por rango (rangos_sin_particion).
+
+    Args:
+        tipos (list): tipos a inventariar; por defecto todos los de salida_s3.
+    """
+    opciones = opciones_inventario(config)
+    rutas = config["rutas"]["salida_s3"]
+    periodo_folder = f"{config['periodo']['anio']}{config['periodo']['mes']:02}"
+    particiones = list(opciones["particiones"]) or [""]
+
+    trabajos = []
+    for tipo in tipos or list(rutas):
+        bucket, base_key = separar_uri_s3(rutas[tipo])
+        base = f"{base_key}{periodo_folder}/"
+        for particion in particiones:
+            trabajos.append((tipo, bucket, base + particion, None, None, ()))
+        excluir = tuple(base + p for p in particiones if p)
+        for despues_de, antes_de in rangos_sin_particion(base, particiones):
+            trabajos.append((tipo, bucket, base, despues_de, antes_de, excluir))
+
+    inicio = time.time()
+    objetos = {tipo: {} for tipo, *_ in trabajos}
+    paginas = 0
+    with ThreadPoolExecutor(max_workers=max(1, min(opciones["max_workers"], len(trabajos)))) as executor:
+        futuros = [
+            (tipo, bool(excluir), executor.submit(_listar_particion, s3_client, bucket, prefijo, despues_de, antes_de, excluir))
+            for tipo, bucket, prefijo, despues_de, antes_de, excluir in trabajos
+        ]
+        for tipo, resto, futuro in futuros:
+            encontrados, paginas_particion = futuro.result()
+            if resto and encontrados:
+                logging.warning(
+                    f"[inventario_s3] - {tipo}: {len(encontrados)} PDF(s) fuera de las particiones "
+                    f"(p.ej. {next(iter(encontrados))}); revisar s3.inventario.particiones."
+                )
+            objetos[tipo].update(encontrados)
+            paginas += paginas_particion
+
+    inventario = InventarioS3(objetos)
+    logging.info(
+        f"[inventario_s3] - {paginas} páginas listadas en {time.time() - inicio:.1f}s: "
+        + ", ".join(f"{tipo} {inventario.total(tipo)} PDFs" for tipo in objetos)
+    )
+    return inventario
+
+
+def crear_inventario(s3_client, config: dict, tipos: list = None):
+    """
+    Inventario del periodo si s3.inventario.habilitado; si no, None (se usa log_pdfs_existentes.csv
+    para omitir agentes y el correo consulta los tres PDFs de cada agente).
+    """
+    if not opciones_inventario(config)["habilitado"]:
+        return None
+    return escanear_inventario(s3_client, config, tipos)
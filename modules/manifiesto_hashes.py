@@ -0,0 +1,70 @@
+import json
+import logging
+import threading
+
+NOMBRE_MANIFIESTO = "manifiesto_hashes.json"
+
+
+class ManifiestoHashes:
+    """
+    Manifiesto store_id -> hash del contexto renderizado, guardado en S3 junto a los PDF
+    de cada tipo y periodo (s3://bucket/prefix/AAAAMM/manifiesto_hashes.json).
+    Permite que un reproceso solo regenere los agentes cuyos datos cambiaron.
+    """
+
+    def __init__(self, s3_client, bucket: str, key: str):
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.key = key
+        self._lock = threading.Lock()
+        self._hashes = None
+        self.nuevos = {}
+
+    def _cargar(self) -> dict:
+        try:
+            respuesta = self.s3_client.get_object(Bucket=self.bucket, Key=self.key)
+            hashes = json.loads(respuesta["Body"].read())
+            logging.info(f"[ManifiestoHashes] - {len(hashes)} hashes cargados de s3://{self.bucket}/{self.key}")
+            return hashes
+        except self.s3_client.exceptions.NoSuchKey:
+            logging.info(f"[ManifiestoHashes] - Sin manifiesto previo en s3://{self.bucket}/{self.key}")
+            return {}
+
+    def hash_anterior(self, store_id: str):
+        """
+        Hash con el que se generó el PDF vigente del agente, o None si no hay registro.
+        El manifiesto se lee de S3 una sola vez.
+        """
+        with self._lock:
+            if self._hashes is None:
+                self._hashes = self._cargar()
+            return self._hashes.get(store_id)
+
+    def registrar(self, store_id: str, hash_contexto: str):
+        with self._lock:
+            self.nuevos[store_id] = hash_contexto
+
+    def extraer_nuevos(self) -> dict:
+        """
+        Devuelve y vacía los hashes nuevos (los procesos worker se los pasan al principal).
+        """
+        with self._lock:
+            nuevos, self.nuevos = self.nuevos, {}
+            return nuevos
+
+    def guardar(self):
+        """
+        Fusiona los hashes nuevos con el manifiesto vigente y lo sube a S3.
+        """
+        with self._lock:
+            if not self.nuevos:
+                return
+            hashes = self._cargar() if self._hashes is None else self._hashes
+            hashes.update(self.nuevos)
+            self.s3_client.put_object(
+                Bucket=self.bucket, Key=self.key, Body=json.dumps(hashes, sort_keys=True).encode("utf-8"),
+                ContentType="application/json"
+            )
+            logging.info(f"[ManifiestoHashes] - {len(self.nuevos)} hashes actualizados en s3://{self.bucket}/{self.key}")
+            self._hashes = hashes
+            self.nuevos = {}
@@ -0,0 +1,216 @@
+import time
+import logging
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from concurrent.futures import ThreadPoolExecutor
+from modules.cache_parquet import CacheParquetS3
+
+MB = 1024 * 1024
+
+# Columnas que usan los generadores, por dataset (nombres tal como vienen en el Parquet).
+# Las que no existan en el archivo se ignoran (p.ej. "igv" o las variantes de nombre de reembolso).
+COLUMNAS_DATASET = {
+    "agentes": ["store_id", "merchant", "store_owner", "address", "province", "region", "email"],
+    "contraprestacion": [
+        "store_id", "entity_description", "transaction_date", "transaction_id", "operation_description",
+        "pos", "transaction_amount", "comission_amount", "comission_amount_igv", "igv"
+    ],
+    "bonos": ["store_id", "description", "amount", "amount_igv", "igv"],
+    "descuentos": ["store_id", "discount_item", "total_discount_amount", "total_discount_amount_igv", "igv"],
+    "reembolso": [
+        "store_id", "company_description", "entity_descripcion", "entity_description", "transaction_date",
+        "transaction_id", "operation_description", "pos", "transaction_amount", "comission",
+        "comission_amount", "comission_amount_igv", "igv"
+    ],
+    "adquirencia": [
+        "store_id", "transaction_date", "transaction_hour", "pos", "entity_transaction_id", "transaction_id",
+        "transaction_amount", "comission_amount_igv", "credited_amount"
+    ]
+}
+
+# Valores por defecto de config["s3"]["input"]["lectura"]
+OPCIONES_LECTURA = {
+    "max_workers": 6,            # archivos descargados en paralelo
+    "umbral_rangos_mb": 32,      # a partir de este tamaño se descarga por rangos
+    "tamano_rango_mb": 8,        # tamaño de cada petición por rango
+    "workers_por_archivo": 8     # peticiones por rango simultáneas por archivo
+}
+
+
+def opciones_lectura(config: dict) -> dict:
+    """
+    Combina las opciones de lectura del config con los valores por defecto.
+    """
+    opciones = dict(OPCIONES_LECTURA)
+    opciones.update(config.get("s3", {}).get("input", {}).get("lectura", {}))
+    return opciones
+
+
+def crear_cache(config: dict):
+    """
+    Crea la caché local según config["s3"]["input"]["cache"]; None si está deshabilitada.
+    """
+    opciones = config.get("s3", {}).get("input", {}).get("cache", {})
+    if not opciones.get("habilitado", False):
+        return None
+    return CacheParquetS3(opciones.get("directorio", "cache_parquet"), opciones.get("max_mb", 2048))
+
+
+def _descargar_por_rangos(fs, path: str, tamano: int, opciones: dict) -> tuple:
+    """
+    Descarga un archivo en paralelo mediante peticiones por rango (byte ranges).
+    """
+    tamano_rango = int(opciones["tamano_rango_mb"] * MB)
+    rangos = [(inicio, min(inicio + tamano_rango, tamano)) for inicio in range(0, tamano, tamano_rango)]
+
+    with ThreadPoolExecutor(max_workers=opciones["workers_por_archivo"]) as executor:
+        partes = list(executor.map(lambda r: fs.cat_file(path, start=r[0], end=r[1]), rangos))
+
+    return b"".join(partes), len(rangos)
+
+
+def descargar_archivo(fs, path: str, opciones: dict, cache: CacheParquetS3 = None) -> tuple:
+    """
+    Obtiene el archivo completo en memoria. Si hay caché y el archivo está vigente
+    (mismo ETag) se lee del disco local; si no, se descarga (los grandes por rangos
+    en paralelo) y se deja en caché.
+
+    Returns:
+        tuple: (bytes, tamaño en bytes, peticiones realizadas, si vino de caché)
+    """
+    info = fs.info(path)
+    tamano = info["size"]
+
+    if cache is not None:
+        contenido = cache.buscar(path, info)
+        if contenido is not None:
+            return contenido, tamano, 0, True
+
+    if tamano >= opciones["umbral_rangos_mb"] * MB:
+        contenido, peticiones = _descargar_por_rangos(fs, path, tamano, opciones)
+    else:
+        contenido, peticiones = fs.cat_file(path), 1
+
+    if cache is not None:
+        cache.guardar(path, info, contenido)
+
+    return contenido, tamano, peticiones, False
+
+
+def _filtro_store_id(nombre: str, esquema: pa.Schema, store_ids):
+    """
+    Construye el filtro store_id IN (...) con el tipo de la columna en el archivo.
+    Devuelve None si el archivo no tiene store_id o los valores no se pueden convertir.
+    """
+    if store_ids is None or "store_id" not in esquema.names:
+        return None
+
+    tipo = esquema.field("store_id").type
+    try:
+        valores = pa.array(store_ids).cast(tipo)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        logging.warning(f"[parquet_loader] - {nombre}: store_id no convertible a {tipo}, se filtrará después de leer.")
+        return None
+
+    return pc.field("store_id").isin(valores)
+
+
+def decodificar_parquet(nombre: str, contenido: bytes, columnas: list = None, store_ids=None) -> pd.DataFrame:
+    """
+    Decodifica un Parquet leyendo solo las columnas declaradas y, si se indica,
+    solo las filas de los store_id dados (filtro empujado a pyarrow).
+    Los row groups y columnas descartados nunca se decodifican.
+    """
+    esquema = pq.read_schema(pa.BufferReader(contenido))
+    if columnas is not None:
+        columnas = [c for c in columnas if c in esquema.names]
+
+    filtro = _filtro_store_id(nombre, esquema, store_ids)
+    df = pq.read_table(pa.BufferReader(contenido), columns=columnas, filters=filtro).to_pandas()
+    if filtro is None and store_ids is not None and "store_id" in df.columns:
+        # Sin filtro empujado (tipos no convertibles): se compara como str, igual que normalizar_tablas
+        df = df[df["store_id"].astype(str).isin(pd.Index(store_ids).astype(str))].reset_index(drop=True)
+    return df
+
+
+def _descargar_medido(fs, path: str, opciones: dict, cache: CacheParquetS3 = None) -> tuple:
+    inicio = time.perf_counter()
+    resultado = descargar_archivo(fs, path, opciones, cache)
+    return resultado + (time.perf_counter() - inicio,)
+
+
+def leer_parquet(nombre: str, path: str, descarga, store_ids=None) -> tuple:
+    """
+    Decodifica un Parquet ya descargado (futuro de _descargar_medido), midiendo el tiempo de cada etapa.
+
+    Returns:
+        tuple: (DataFrame, dict con el desglose de tiempos)
+    """
+    contenido, tamano, peticiones, desde_cache, duracion_descarga = descarga.result()
+
+    inicio = time.perf_counter()
+    df = decodificar_parquet(nombre, contenido, COLUMNAS_DATASET.get(nombre), store_ids)
+    duracion_decodificacion = time.perf_counter() - inicio
+
+    tiempos = {
+        "archivo": path,
+        "bytes": tamano,
+        "peticiones": peticiones,
+        "cache": desde_cache,
+        "filas": len(df),
+        "descarga_s": round(duracion_descarga, 3),
+        "decodificacion_s": round(duracion_decodificacion, 3),
+        "total_s": round(duracion_descarga + duracion_decodificacion, 3)
+    }
+    logging.info(
+        f"[parquet_loader] - {nombre}: {tiempos['bytes'] / MB:.1f} MB "
+        f"{'desde caché local' if desde_cache else f'en {peticiones} petición(es)'}, "
+        f"descarga {tiempos['descarga_s']}s, decodificación {tiempos['decodificacion_s']}s, "
+        f"{tiempos['filas']} filas"
+    )
+    return df, tiempos
+
+
+def cargar_parquets(fs, rutas: dict, config: dict, filtrar_por: str = None) -> tuple:
+    """
+    Carga en paralelo los Parquet indicados en rutas (nombre -> path).
+    El tiempo total queda acotado por el archivo más lento y no por la suma de todos.
+
+    Si filtrar_por indica un dataset (p.ej. "agentes"), se decodifica primero y sus
+    store_id se usan como filtro al decodificar el resto. Las descargas no esperan a ese filtro.
+
+    Returns:
+        tuple: (dict nombre -> DataFrame, dict nombre -> desglose de tiempos)
+    """
+    opciones = opciones_lectura(config)
+    cache = crear_cache(config)
+    inicio = time.perf_counter()
+    resultados = {}
+
+    with ThreadPoolExecutor(max_workers=opciones["max_workers"]) as executor:
+        descargas = {
+            nombre: executor.submit(_descargar_medido, fs, path, opciones, cache)
+            for nombre, path in rutas.items()
+        }
+
+        store_ids = None
+        if filtrar_por:
+            resultados[filtrar_por] = leer_parquet(filtrar_por, rutas[filtrar_por], descargas[filtrar_por])
+            store_ids = resultados[filtrar_por][0]["store_id"].unique()
+
+        futuros = {
+            nombre: executor.submit(leer_parquet, nombre, path, descargas[nombre], store_ids)
+            for nombre, path in rutas.items() if nombre != filtrar_por
+        }
+        resultados.update({nombre: futuro.result() for nombre, futuro in futuros.items()})
+
+    dataframes = {nombre: df for nombre, (df, _) in resultados.items()}
+    tiempos = {nombre: t for nombre, (_, t) in resultados.items()}
+
+    total = time.perf_counter() - inicio
+    suma = sum(t["total_s"] for t in tiempos.values())
+    logging.info(f"[parquet_loader] - {len(rutas)} Parquet cargados en {total:.2f}s (suma secuencial: {suma:.2f}s)")
+
+    return dataframes, tiempos
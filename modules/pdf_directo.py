@@ -0,0 +1,521 @@
+import zlib
+import struct
+import base64
+import threading
+import unicodedata
+
+# A4 en puntos y márgenes equivalentes a OPCIONES_PDF (5mm, inferior 25mm)
+ANCHO_PAGINA, ALTO_PAGINA = 595.28, 841.89
+MM = 72 / 25.4
+MARGEN_X, MARGEN_SUPERIOR, MARGEN_INFERIOR = 5 * MM, 5 * MM, 25 * MM
+ANCHO_UTIL = ANCHO_PAGINA - 2 * MARGEN_X
+
+AZUL = (0.0, 0.286, 0.565)          # #004990
+AMARILLO = (1.0, 0.824, 0.0)        # #FFD200
+NEGRO = (0.0, 0.0, 0.0)
+BLANCO = (1.0, 1.0, 1.0)
+GRIS_BORDE = (0.8, 0.8, 0.8)
+
+# Anchos (1/1000 em) de Helvetica y Helvetica-Bold para los caracteres 32..126 (AFM estándar)
+_ANCHOS = {
+    False: [
+        278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+        556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+        1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+        667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+        333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+        556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584
+    ],
+    True: [
+        278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+        556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+        975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+        667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+        333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+        611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584
+    ]
+}
+
+
+def _ancho_caracter(caracter: str, negrita: bool) -> int:
+    codigo = ord(caracter)
+    if not 32 <= codigo <= 126:
+        # Letras acentuadas y ñ: mismo ancho que la letra base
+        base = unicodedata.normalize("NFD", caracter)[0]
+        codigo = ord(base) if 32 <= ord(base) <= 126 else ord("n")
+    return _ANCHOS[negrita][codigo - 32]
+
+
+def ancho_texto(texto: str, tamano: float, negrita: bool = False) -> float:
+    return sum(_ancho_caracter(c, negrita) for c in texto) * tamano / 1000
+
+
+def _escapar(texto: str) -> bytes:
+    crudo = texto.encode("cp1252", errors="replace")
+    return crudo.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+def formato_monto(valor) -> str:
+    """
+    Igual que el filtro Jinja2 "round(2)" de los templates (p.ej. 101.7, 115.88).
+    """
+    return str(round(float(valor or 0), 2))
+
+
+# === Logo PNG -> imagen PDF (se decodifica una sola vez por proceso) ===
+_cache_imagenes = {}
+_lock_imagenes = threading.Lock()
+
+
+def _desfiltrar_png(datos: bytes, ancho: int, alto: int, bpp: int) -> bytearray:
+    stride = ancho * bpp
+    salida = bytearray(stride * alto)
+    anterior = bytearray(stride)
+    pos = 0
+    for fila in range(alto):
+        filtro = datos[pos]
+        linea = bytearray(datos[pos + 1:pos + 1 + stride])
+        pos += 1 + stride
+        for i in range(stride):
+            izquierda = linea[i - bpp] if i >= bpp else 0
+            arriba = anterior[i]
+            if filtro == 1:
+                linea[i] = (linea[i] + izquierda) & 255
+            elif filtro == 2:
+                linea[i] = (linea[i] + arriba) & 255
+            elif filtro == 3:
+                linea[i] = (linea[i] + ((izquierda + arriba) >> 1)) & 255
+            elif filtro == 4:
+                diagonal = anterior[i - bpp] if i >= bpp else 0
+                p = izquierda + arriba - diagonal
+                pa, pb, pc = abs(p - izquierda), abs(p - arriba), abs(p - diagonal)
+                predictor = izquierda if pa <= pb and pa <= pc else (arriba if pb <= pc else diagonal)
+                linea[i] = (linea[i] + predictor) & 255
+        salida[fila * stride:(fila + 1) * stride] = linea
+        anterior = linea
+    return salida
+
+
+class ErrorPNG(ValueError):
+    pass
+
+
+def cargar_png(contenido: bytes):
+    """
+    Decodifica un PNG de 8 bits (gris/RGB, con o sin alfa, sin entrelazado).
+    Devuelve dict con ancho, alto, colores, pixeles (zlib) y alfa (zlib o None).
+    Cualquier otro formato (paleta, entrelazado, 16 bits) lanza ErrorPNG con el motivo:
+    el logo se convierte una vez a RGB/RGBA de 8 bits en lugar de omitirlo en silencio.
+    """
+    clave = hash(contenido)
+    with _lock_imagenes:
+        if clave in _cache_imagenes:
+            return _cache_imagenes[clave]
+
+    if contenido[:8] != b"\x89PNG\r\n\x1a\n":
+        raise ErrorPNG("[pdf_directo] - El logo no es un PNG.")
+    ancho, alto, profundidad, tipo_color, _, _, entrelazado = struct.unpack(">IIBBBBB", contenido[16:29])
+    canales = {0: 1, 2: 3, 4: 2, 6: 4}.get(tipo_color)
+    if canales is None:
+        raise ErrorPNG(f"[pdf_directo] - Logo PNG con tipo de color {tipo_color} (3 = paleta) no soportado; usar RGB/RGBA.")
+    if profundidad != 8:
+        raise ErrorPNG(f"[pdf_directo] - Logo PNG de {profundidad} bits por canal no soportado; usar 8 bits.")
+    if entrelazado:
+        raise ErrorPNG("[pdf_directo] - Logo PNG entrelazado (Adam7) no soportado; guardarlo sin entrelazado.")
+
+    idat, pos = bytearray(), 8
+    while pos < len(contenido):
+        longitud, tipo = struct.unpack(">I4s", contenido[pos:pos + 8])
+        if tipo == b"IDAT":
+            idat += contenido[pos + 8:pos + 8 + longitud]
+        pos += 12 + longitud
+    pixeles = _desfiltrar_png(zlib.decompress(bytes(idat)), ancho, alto, canales)
+    color = 1 if tipo_color in (0, 4) else 3
+    alfa = None
+    if tipo_color in (4, 6):
+        sin_alfa = bytearray(ancho * alto * color)
+        for c in range(color):
+            sin_alfa[c::color] = pixeles[c::canales]
+        alfa = zlib.compress(bytes(pixeles[canales - 1::canales]))
+        pixeles = sin_alfa
+    imagen = {"ancho": ancho, "alto": alto, "colores": color, "pixeles": zlib.compress(bytes(pixeles)), "alfa": alfa}
+
+    with _lock_imagenes:
+        _cache_imagenes[clave] = imagen
+    return imagen
+
+
+class DocumentoPDF:
+    """
+    Escritor PDF mínimo: texto con Helvetica estándar (WinAnsi), rectángulos e imagen.
+    Las coordenadas y se miden desde el borde superior de la página.
+    """
+
+    def __init__(self):
+        self.paginas = []
+        self.imagen = None
+        self.y = MARGEN_SUPERIOR
+        self.nueva_pagina()
+
+    def nueva_pagina(self):
+        self.paginas.append([])
+        self.y = MARGEN_SUPERIOR
+
+    def _op(self, operacion: bytes):
+        self.paginas[-1].append(operacion)
+
+    def cabe(self, alto: float) -> bool:
+        return self.y + alto <= ALTO_PAGINA - MARGEN_INFERIOR
+
+    def reservar(self, alto: float) -> bool:
+        """
+        Salta de página si no entran alto puntos. Devuelve True si saltó.
+        """
+        if self.cabe(alto):
+            return False
+        self.nueva_pagina()
+        return True
+
+    def texto(self, x: float, y: float, texto: str, tamano: float = 8, negrita: bool = False,
+              color=NEGRO, alinear: str = "izq", ancho: float = None):
+        texto = str(texto)
+        if ancho is not None:
+            texto = self.recortar(texto, ancho, tamano, negrita)
+            if alinear == "der":
+                x += ancho - ancho_texto(texto, tamano, negrita)
+            elif alinear == "centro":
+                x += (ancho - ancho_texto(texto, tamano, negrita)) / 2
+        fuente = b"/F2" if negrita else b"/F1"
+        self._op(
+            b"BT %s %.2f Tf %.3f %.3f %.3f rg %.2f %.2f Td (%s) Tj ET"
+            % (fuente, tamano, *color, x, ALTO_PAGINA - y, _escapar(texto))
+        )
+
+    @staticmethod
+    def recortar(texto: str, ancho: float, tamano: float, negrita: bool) -> str:
+        if ancho_texto(texto, tamano, negrita) <= ancho:
+            return texto
+        while texto and ancho_texto(texto + "...", tamano, negrita) > ancho:
+            texto = texto[:-1]
+        return texto + "..."
+
+    def rectangulo(self, x: float, y: float, ancho: float, alto: float, relleno=None, borde=None):
+        coordenadas = b"%.2f %.2f %.2f %.2f re" % (x, ALTO_PAGINA - y - alto, ancho, alto)
+        if relleno is not None:
+            self._op(b"%.3f %.3f %.3f rg %s f" % (*relleno, coordenadas))
+        if borde is not None:
+            self._op(b"%.3f %.3f %.3f RG 0.5 w %s S" % (*borde, coordenadas))
+
+    def logo(self, contenido_png: bytes, x: float, y: float, ancho: float) -> float:
+        """
+        Dibuja el logo con el ancho dado (alto proporcional). Devuelve el alto usado.
+        """
+        imagen = cargar_png(contenido_png) if contenido_png else None
+        if imagen is None:
+            return 0
+        self.imagen = imagen
+        alto = ancho * imagen["alto"] / imagen["ancho"]
+        self._op(b"q %.2f 0 0 %.2f %.2f %.2f cm /Im1 Do Q" % (ancho, alto, x, ALTO_PAGINA - y - alto))
+        return alto
+
+    def parrafo(self, x: float, ancho: float, texto: str, tamano: float = 8, color=NEGRO, interlineado: float = 1.35):
+        """
+        Texto con ajuste de línea por palabras desde self.y.
+        """
+        lineas, actual = [], ""
+        for palabra in str(texto).split():
+            candidata = f"{actual} {palabra}".strip()
+            if actual and ancho_texto(candidata, tamano) > ancho:
+                lineas.append(actual)
+                actual = palabra
+            else:
+                actual = candidata
+        if actual:
+            lineas.append(actual)
+        for linea in lineas:
+            self.y += tamano * interlineado
+            self.texto(x, self.y, linea, tamano, color=color)
+
+    def tabla(self, x: float, ancho: float, columnas: list, filas: list, totales: list = None,
+              titulo: str = None, tamano: float = 7, alto_fila: float = 12):
+        """
+        Tabla con encabezado azul (repetido en cada página) y filas de total en amarillo.
+        columnas: lista de (título, fracción del ancho, alineación "izq" | "der" | "centro").
+        filas / totales: listas de celdas (str). Una fila de total de 2 celdas en una tabla
+        más ancha ocupa la primera celda con todas las columnas menos la última.
+        """
+        anchos = [ancho * fraccion for _, fraccion, _ in columnas]
+
+        def encabezado():
+            if titulo:
+                self.rectangulo(x, self.y, ancho, alto_fila, relleno=AMARILLO)
+                self.texto(x, self.y + alto_fila - 3.5, titulo, tamano, True, AZUL, "centro", ancho)
+                self.y += alto_fila
+            self.rectangulo(x, self.y, ancho, alto_fila * 1.4, relleno=AZUL)
+            cx = x
+            for (nombre, _, alineacion), ancho_col in zip(columnas, anchos):
+                self.texto(cx + 2, self.y + alto_fila * 1.4 - 5, nombre, tamano * 0.9, True, BLANCO, alineacion, ancho_col - 4)
+                cx += ancho_col
+            self.y += alto_fila * 1.4
+
+        def fila(celdas, relleno=None, negrita=False):
+            if self.reservar(alto_fila):
+                encabezado()
+            anchos_fila = anchos
+            if len(celdas) < len(columnas):
+                anchos_fila = [sum(anchos[:len(columnas) - len(celdas) + 1])] + anchos[len(columnas) - len(celdas) + 1:]
+            cx = x
+            for i, (celda, ancho_col) in enumerate(zip(celdas, anchos_fila)):
+                alineacion = columnas[len(columnas) - len(anchos_fila) + i][2] if i else columnas[0][2]
+                self.rectangulo(cx, self.y, ancho_col, alto_fila, relleno=relleno, borde=GRIS_BORDE)
+                self.texto(cx + 2, self.y + alto_fila - 3.5, celda, tamano, negrita, AZUL if relleno else NEGRO,
+                           alineacion, ancho_col - 4)
+                cx += ancho_col
+            self.y += alto_fila
+
+        self.reservar(alto_fila * (3.4 if titulo else 2.4))
+        encabezado()
+        for celdas in filas:
+            fila(celdas)
+        for celdas in totales or []:
+            fila(celdas, relleno=AMARILLO, negrita=True)
+        self.y += 6
+
+    def bytes(self) -> bytes:
+        objetos = [
+            b"<< /Type /Catalog /Pages 2 0 R >>",
+            None,  # páginas: se completa al final
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>"
+        ]
+        recursos = b"/Font << /F1 3 0 R /F2 4 0 R >>"
+
+        if self.imagen is not None:
+            imagen = self.imagen
+            espacio = b"/DeviceRGB" if imagen["colores"] == 3 else b"/DeviceGray"
+            mascara = b""
+            if imagen["alfa"] is not None:
+                objetos.append(
+                    b"<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceGray "
+                    b"/BitsPerComponent 8 /Filter /FlateDecode /Length %d >>\nstream\n%s\nendstream"
+                    % (imagen["ancho"], imagen["alto"], len(imagen["alfa"]), imagen["alfa"])
+                )
+                mascara = b" /SMask %d 0 R" % len(objetos)
+            objetos.append(
+                b"<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace %s /BitsPerComponent 8"
+                b"%s /Filter /FlateDecode /Length %d >>\nstream\n%s\nendstream"
+                % (imagen["ancho"], imagen["alto"], espacio, mascara, len(imagen["pixeles"]), imagen["pixeles"])
+            )
+            recursos += b" /XObject << /Im1 %d 0 R >>" % len(objetos)
+
+        hijos = []
+        for operaciones in self.paginas:
+            contenido = zlib.compress(b"\n".join(operaciones))
+            objetos.append(b"<< /Filter /FlateDecode /Length %d >>\nstream\n%s\nendstream" % (len(contenido), contenido))
+            objetos.append(
+                b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %.2f %.2f] /Resources << %s >> /Contents %d 0 R >>"
+                % (ANCHO_PAGINA, ALTO_PAGINA, recursos, len(objetos))
+            )
+            hijos.append(b"%d 0 R" % len(objetos))
+        objetos[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(hijos), len(hijos))
+
+        salida = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        posiciones = []
+        for numero, objeto in enumerate(objetos, start=1):
+            posiciones.append(len(salida))
+            salida += b"%d 0 obj\n%s\nendobj\n" % (numero, objeto)
+        inicio_xref = len(salida)
+        salida += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objetos) + 1)
+        salida += b"".join(b"%010d 00000 n \n" % posicion for posicion in posiciones)
+        salida += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objetos) + 1, inicio_xref)
+        return bytes(salida)
+
+
+# === Diseños de los tres estados de cuenta (mismos bloques que los templates HTML) ===
+
+def _primera_pagina(doc: DocumentoPDF, context: dict, titulo: str) -> float:
+    """
+    Logo, título, datos del agente y bloques de textos fijos a la derecha.
+    Devuelve el y donde empieza la columna izquierda; la derecha se dibuja aquí.
+    """
+    logo = base64.b64decode(context["logo_base64"]) if context.get("logo_base64") else None
+    doc.y += doc.logo(logo, MARGEN_X, doc.y, ANCHO_UTIL) + 8
+
+    doc.y += 14
+    doc.texto(MARGEN_X, doc.y, titulo, 13, True, AZUL)
+    doc.y += 6
+
+    for etiqueta, valor in [
+        ("ID.Agente:", f"{context['cod_agente']} - {context['nombre_agente']}"),
+        ("Periodo:", f"{context['nombre_mes']} {context['anio']}"),
+        ("Titular:", context["titular"]),
+        ("Dirección:", context["direccion"]),
+        ("Provincia:", f"{context['provincia']} - Departamento: {context['departamento']}")
+    ]:
+        doc.y += 12
+        doc.texto(MARGEN_X, doc.y, etiqueta, 8, True)
+        doc.texto(MARGEN_X + ancho_texto(etiqueta + " ", 8, True), doc.y, valor, 8)
+    doc.y += 10
+    inicio = doc.y
+
+    # Columna derecha (32%): información adicional, nota importante y campañas
+    x = MARGEN_X + ANCHO_UTIL * 0.68
+    ancho = ANCHO_UTIL * 0.32
+    for titulo_bloque, clave in [
+        ("Información Adicional", "informacion_adicional"),
+        ("Nota Importante", "nota_importante"),
+        ("Campañas Activas", "campanas_activas")
+    ]:
+        doc.y += 11
+        doc.texto(x, doc.y, titulo_bloque, 9, True, AZUL)
+        doc.parrafo(x, ancho, context.get(clave, ""), 7.5)
+        doc.y += 8
+    fin_derecha = doc.y
+
+    doc.y = inicio
+    return fin_derecha
+
+
+def _pie(doc: DocumentoPDF, context: dict):
+    doc.reservar(30)
+    doc.y += 24
+    doc.texto(MARGEN_X, doc.y, f"Documento generado automáticamente – KasNet {context['nombre_mes']} {context['anio']}",
+              7, False, AZUL, "centro", ANCHO_UTIL)
+
+
+def _tabla_totales(doc: DocumentoPDF, ancho: float, filas: list):
+    doc.tabla(MARGEN_X, ancho, [("", 0.6, "izq"), ("", 0.4, "der")], [], totales=filas)
+
+
+def _detalle_entidades(doc: DocumentoPDF, context: dict, titulo: str, columnas: list, celdas):
+    for entidad in context["detalle_entidades"]:
+        doc.reservar(60)
+        doc.y += 16
+        sufijo = " (continuación)" if entidad.get("continuacion") else ""
+        doc.texto(MARGEN_X, doc.y, f"{titulo}: {entidad['nombre']}{sufijo}", 11, True, AZUL)
+        doc.y += 6
+        offset = entidad.get("offset", 0)
+        filas = [celdas(offset + i, op) for i, op in enumerate(entidad["operaciones"], start=1)]
+        totales = []
+        if not entidad.get("continua"):
+            subtotal = entidad.get("subtotal")
+            if subtotal is None:
+                subtotal = sum(op["comision"] for op in entidad["operaciones"])
+            totales.append(["Sub Total", formato_monto(subtotal)])
+        doc.tabla(MARGEN_X, ANCHO_UTIL, columnas, filas, totales)
+
+
+def estado_contraprestaciones(context: dict) -> bytes:
+    doc = DocumentoPDF()
+    ancho = ANCHO_UTIL * 0.65
+    fin_derecha = _primera_pagina(doc, context, "Listado de Operaciones del Mes - Agente KasNet")
+
+    doc.tabla(
+        MARGEN_X, ancho,
+        [("ENTIDADES", 0.45, "izq"), ("CANTIDAD DE OPERACIONES", 0.27, "izq"), ("CONTRAPRESTACIÓN (S/)", 0.28, "der")],
+        [[e["descripcion_entidad"], str(e["cantidad"]), formato_monto(e["total_comision"])] for e in context["resumen_entidades"]],
+        [["Sub. Total (A)", str(context["subtotal_operaciones_cantidad"]), formato_monto(context["subtotal_operaciones"])]]
+    )
+    for titulo, clave, letra, subtotal in [
+        ("BONOS", "bonos", "B", "subtotal_bonos"),
+        ("DEVOLUCIONES Y DESCUENTOS", "descuentos", "C", "subtotal_descuentos")
+    ]:
+        if context.get(clave):
+            doc.tabla(
+                MARGEN_X, ancho, [("Concepto", 0.7, "izq"), ("Importe (S/)", 0.3, "der")],
+                [[item["descripcion"], formato_monto(item["monto"])] for item in context[clave]],
+                [[f"Sub. Total ({letra})", formato_monto(context[subtotal])]], titulo=titulo
+            )
+    _tabla_totales(doc, ancho, [
+        ["A + B + C", formato_monto(context["total_sin_igv"])],
+        ["IGV (S/)", formato_monto(context["igv_total"])],
+        ["Depósito Total (S/):", formato_monto(context["total_deposito"])]
+    ])
+
+    doc.y = max(doc.y, fin_derecha)
+    doc.nueva_pagina()
+    _detalle_entidades(
+        doc, context, "Entidad Financiera",
+        [("#", 0.04, "centro"), ("Entidad Financiera", 0.19, "izq"), ("Fecha", 0.09, "izq"), ("Descripción", 0.25, "izq"),
+         ("POS", 0.05, "centro"), ("Nro. Operación", 0.12, "izq"), ("Importe (S/)", 0.12, "der"),
+         ("Contraprestación (S/)", 0.14, "der")],
+        lambda n, op: [str(n), op["entidad_financiera"], op["fecha"], op["descripcion"], op["pos"],
+                       op["numero_operacion"], formato_monto(op["importe"]), formato_monto(op["comision"])]
+    )
+    _pie(doc, context)
+    return doc.bytes()
+
+
+def estado_reembolso(context: dict) -> bytes:
+    doc = DocumentoPDF()
+    ancho = ANCHO_UTIL * 0.65
+    fin_derecha = _primera_pagina(doc, context, "Estado de Cuenta Reembolsos y Recargas - Agente KasNet")
+
+    doc.tabla(
+        MARGEN_X, ancho,
+        [("ENTIDADES", 0.45, "izq"), ("CANTIDAD DE OPERACIONES", 0.27, "izq"), ("REEMBOLSO (S/)", 0.28, "der")],
+        [[e["descripcion_entidad"], str(e["cantidad"]), formato_monto(e["total_comision"])] for e in context["resumen_entidades"]],
+        [["Sub. Total (A)", str(context["subtotal_operaciones_cantidad"]), formato_monto(context["subtotal_operaciones"])]]
+    )
+    _tabla_totales(doc, ancho, [
+        ["A", formato_monto(context["total_sin_igv"])],
+        ["IGV (S/)", formato_monto(context["igv_total"])],
+        ["Depósito Total (S/):", formato_monto(context["total_deposito"])]
+    ])
+
+    doc.y = max(doc.y, fin_derecha)
+    doc.nueva_pagina()
+    _detalle_entidades(
+        doc, context, "Entidad",
+        [("#", 0.05, "centro"), ("Fecha", 0.12, "izq"), ("Descripción", 0.25, "izq"), ("POS", 0.08, "centro"),
+         ("Nro. Operación", 0.2, "izq"), ("Importe (S/)", 0.15, "der"), ("Reembolso (S/)", 0.15, "der")],
+        lambda n, op: [str(n), op["fecha"], op["entidad"], op["pos"], op["numero_operacion"],
+                       formato_monto(op["importe"]), formato_monto(op["comision"])]
+    )
+    _pie(doc, context)
+    return doc.bytes()
+
+
+def estado_adquirencia(context: dict) -> bytes:
+    doc = DocumentoPDF()
+    ancho = ANCHO_UTIL * 0.65
+    fin_derecha = _primera_pagina(doc, context, "Listado de Operaciones de Adquirencia del Mes - Agente KasNet")
+
+    doc.tabla(
+        MARGEN_X, ancho,
+        [("FECHA", 0.18, "izq"), ("CANTIDAD DE OPERACIONES", 0.2, "izq"), ("IMPORTE DE VENTA (S/)", 0.2, "der"),
+         ("COMISIÓN VENTA Inc. IGV (S/)", 0.22, "der"), ("IMPORTE ABONADO (S/)", 0.2, "der")],
+        [[item["fecha"], str(item["cantidad"]), formato_monto(item["importe_venta"]), formato_monto(item["comision_venta"]),
+          formato_monto(item["importe_abonado"])] for item in context["resumen_adquirencia"]],
+        [["Total", str(context["total_cantidad"]), formato_monto(context["total_importe_venta"]),
+          formato_monto(context["total_comision_venta"]), formato_monto(context["total_importe_abonado"])]],
+        tamano=6.5
+    )
+
+    doc.y = max(doc.y, fin_derecha)
+    doc.nueva_pagina()
+    doc.y += 16
+    doc.texto(MARGEN_X, doc.y, "Detalle de Operaciones de Venta VISANET:", 11, True, AZUL)
+    doc.y += 6
+    detalle = context["detalle_adquirencia"]
+    doc.tabla(
+        MARGEN_X, ANCHO_UTIL,
+        [("#", 0.05, "centro"), ("Fecha", 0.16, "izq"), ("Hora", 0.1, "izq"), ("POS", 0.06, "centro"),
+         ("Nro. Operación", 0.18, "izq"), ("Importe de Venta (S/)", 0.15, "der"), ("Imp. Com. Inc. IGV (S/)", 0.15, "der"),
+         ("Importe Abonado (S/)", 0.15, "der")],
+        [[str(n), op["fecha"], op["hora"], op["pos"], op["numero_operacion"], formato_monto(op["importe_venta"]),
+          formato_monto(op["comision_venta"]), formato_monto(op["importe_abonado"])] for n, op in enumerate(detalle, start=1)],
+        [["Total", formato_monto(sum(op["importe_venta"] for op in detalle)),
+          formato_monto(sum(op["comision_venta"] for op in detalle)),
+          formato_monto(sum(op["importe_abonado"] for op in detalle))]]
+    )
+    _pie(doc, context)
+    return doc.bytes()
+
+
+# tipo -> función que escribe el PDF a partir del contexto del template
+DISENOS = {
+    "contraprestacion": estado_contraprestaciones,
+    "reembolso": estado_reembolso,
+    "adquirencia": estado_adquirencia
+}
@@ -1,65 +1,532 @@
 import os
+import json
+import hashlib
 import logging
 import pdfkit
-import boto3
+import shutil
 import tempfile
-from jinja2 import Environment, FileSystemLoader
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from jinja2 import Environment, FileSystemLoader, ModuleLoader
+from modules.data_processor import obtener_filas_store
+from modules.render_pool import OPCIONES_PDF, PdfWriter, opciones_render, obtener_pool, unir_pdfs
+from modules.manifiesto_hashes import ManifiestoHashes, NOMBRE_MANIFIESTO
+from modules.almacenamiento import cliente_salida, esquema
+from modules.utils_s3 import separar_uri_s3
+from modules.transferencias_s3 import obtener_transferencias
+from modules.pdf_directo import DISENOS
+
+# Traducción manual del mes
+MESES_ES = [
+    "", "ENERO", "FEBRERO", "MARZO", "ABRIL", "MAYO", "JUNIO",
+    "JULIO", "AGOSTO", "SEPTIEMBRE", "OCTUBRE", "NOVIEMBRE", "DICIEMBRE"
+]
+
+
+def registros(df, columnas: dict) -> list:
+    """
+    Convierte un DataFrame en lista de dicts en una sola pasada columnar
+    (sin iterrows). columnas: clave en el contexto -> columna del DataFrame.
+    Los valores salen como tipos nativos de Python.
+    """
+    if df.empty:
+        return []
+    valores = {clave: df[columna].tolist() for clave, columna in columnas.items()}
+    return [dict(zip(valores, fila)) for fila in zip(*valores.values())]
+
+
+def montos(df, columna: str):
+    """
+    Columna de montos como float con la misma semántica que float(x or 0.0) por fila:
+    None (columna object) pasa a 0.0, pero NaN es verdadero en Python y se mantiene NaN.
+    """
+    serie = df[columna]
+    if serie.dtype == object:
+        return serie.map(lambda x: float(x or 0.0))
+    return serie.astype(float)
+
+
+def fragmentar_entidades(entidades: list, filas_por_fragmento: int) -> list:
+    """
+    Reparte detalle_entidades en fragmentos de a lo sumo filas_por_fragmento operaciones.
+    Una entidad puede quedar partida: cada parte lleva el offset de su numeración, si es
+    continuación / continúa en el siguiente fragmento y el subtotal de la entidad completa.
+    """
+    fragmentos, actual, libres = [], [], filas_por_fragmento
+    for entidad in entidades:
+        operaciones = entidad["operaciones"]
+        subtotal = sum(op["comision"] for op in operaciones)
+        inicio = 0
+        while True:
+            fin = min(inicio + libres, len(operaciones))
+            actual.append({
+                "nombre": entidad["nombre"],
+                "operaciones": operaciones[inicio:fin],
+                "offset": inicio,
+                "continuacion": inicio > 0,
+                "continua": fin < len(operaciones),
+                "subtotal": subtotal
+            })
+            libres -= fin - inicio
+            inicio = fin
+            if libres == 0:
+                fragmentos.append(actual)
+                actual, libres = [], filas_por_fragmento
+            if inicio >= len(operaciones):
+                break
+    if actual:
+        fragmentos.append(actual)
+    return fragmentos
+
+
+# Bloques de templates/parciales que no dependen del agente y campos del contexto que usan
+PARCIALES = ("estilos", "encabezado", "textos_fijos", "pie")
+CAMPOS_FIJOS = (
+    "ruta_css", "ruta_logo", "logo_base64", "informacion_adicional", "nota_importante", "campanas_activas",
+    "nombre_mes", "anio"
+)
+
+
+def cabecera_agente(store_id: str, row: dict, config: dict) -> dict:
+    """
+    Campos de cabecera comunes a los tres estados de cuenta.
+    """
+    assets = config.get("assets") or {}
+    return {
+        "nombre_mes": MESES_ES[config["periodo"]["mes"]],
+        "anio": config["periodo"]["anio"],
+        "cod_agente": store_id,
+        "nombre_agente": row["merchant"],
+        "titular": row["store_owner"],
+        "direccion": row["address"],
+        "provincia": row["province"],
+        "departamento": row["region"],
+        "periodo": f"{config['periodo']['mes']}/{config['periodo']['anio']}",
+        "logo_base64": config["logo_base64"],
+        "informacion_adicional": config["textos_fijos"]["informacion_adicional"],
+        "nota_importante": config["textos_fijos"]["nota_importante"],
+        "campanas_activas": config["textos_fijos"]["campanas_activas"],
+        # Modo assets estáticos: logo por ruta local en vez de incrustado
+        "ruta_logo": assets.get("ruta_logo")
+    }
+
+
+# === Motores de render (render.motor, global o por tipo) ===
+class MotorRender:
+    """
+    Convierte el contexto de un estado de cuenta en los bytes del PDF.
+    """
+
+    nombre = None
+
+    def renderizar(self, generador, template_path: str, context: dict, store_id: str) -> bytes:
+        raise NotImplementedError
+
+
+class MotorWkhtmltopdf(MotorRender):
+    """
+    Template Jinja2 -> HTML -> wkhtmltopdf (pdfkit o pool persistente).
+    """
+
+    nombre = "wkhtmltopdf"
+
+    def renderizar(self, generador, template_path: str, context: dict, store_id: str) -> bytes:
+        opciones = opciones_render(generador.config)
+        template = generador._obtener_template(template_path)
+        context = dict(context, fijos=generador.fragmentos_fijos(template_path, context))
+        fragmentos = generador._fragmentos(context, opciones)
+
+        if len(fragmentos) == 1:
+            return generador._html_a_pdf(template.render(context), opciones)
+
+        # Agente muy grande: fragmentos en paralelo (HTML chicos) y un solo PDF al final
+        logging.info(f"[{generador.__class__.__name__}] - {store_id}: detalle dividido en {len(fragmentos)} fragmentos.")
+        with ThreadPoolExecutor(max_workers=opciones["workers_fragmentos"]) as executor:
+            partes = list(executor.map(lambda c: generador._html_a_pdf(template.render(c), opciones), fragmentos))
+        return unir_pdfs(partes)
+
+
+class MotorPDFDirecto(MotorRender):
+    """
+    Escribe el PDF directamente desde el contexto (modules.pdf_directo), sin HTML ni
+    proceso externo. Mismos bloques y textos que los templates, con fuentes estándar.
+    """
+
+    nombre = "pdf_directo"
+
+    def renderizar(self, generador, template_path: str, context: dict, store_id: str) -> bytes:
+        return DISENOS[generador.tipo](context)
+
+
+MOTORES = {motor.nombre: motor() for motor in (MotorWkhtmltopdf, MotorPDFDirecto)}
+
+
+def obtener_motor(config: dict, tipo: str) -> MotorRender:
+    """
+    Motor de render.motor: un nombre para todos los tipos o un dict tipo -> nombre
+    (los tipos no listados usan wkhtmltopdf).
+    """
+    motor = opciones_render(config)["motor"]
+    if isinstance(motor, dict):
+        motor = motor.get(tipo, MotorWkhtmltopdf.nombre)
+    if motor not in MOTORES:
+        raise ValueError(f"[pdf_generator] - Motor de render desconocido para {tipo}: {motor}")
+    return MOTORES[motor]
+
+
+def ruta_hoja_estilos(template_path: str) -> str:
+    """
+    Hoja de estilos del template: estilos/<nombre del template>.css en su directorio.
+    """
+    nombre = os.path.splitext(os.path.basename(template_path))[0]
+    return os.path.join(os.path.dirname(template_path), "estilos", f"{nombre}.css")
+
+
+def compilar_templates(directorio: str, destino_base: str) -> str:
+    """
+    Compila los templates de directorio a módulos Python en destino_base/<huella de los templates>.
+    Se compila en un directorio temporal que se publica con os.replace: un proceso que carga
+    con ModuleLoader nunca ve archivos a medio escribir, y si la huella ya existe solo se reutiliza.
+
+    Returns:
+        str: directorio con los módulos compilados.
+    """
+    digest = hashlib.sha256()
+    for raiz, _, archivos in sorted(os.walk(directorio)):
+        for archivo in sorted(archivos):
+            ruta = os.path.join(raiz, archivo)
+            digest.update(os.path.relpath(ruta, directorio).encode("utf-8"))
+            with open(ruta, "rb") as f:
+                digest.update(f.read())
+    final = os.path.join(destino_base, digest.hexdigest()[:16])
+    if os.path.isdir(final):
+        return final
+
+    os.makedirs(destino_base, exist_ok=True)
+    temporal = tempfile.mkdtemp(prefix=".compilando-", dir=destino_base)
+    try:
+        # Solo los .html son templates: las hojas de estilos se incrustan como texto (fragmentos_fijos)
+        Environment(loader=FileSystemLoader(directorio)).compile_templates(
+            temporal, extensions=["html"], zip=None, ignore_errors=False
+        )
+        try:
+            os.replace(temporal, final)
+        except OSError:
+            # Otro proceso publicó la misma huella primero
+            if not os.path.isdir(final):
+                raise
+        logging.info(f"[pdf_generator] - Templates precompilados en {final}")
+    finally:
+        shutil.rmtree(temporal, ignore_errors=True)
+    return final
+
+
+def precompilar_templates(config: dict):
+    """
+    Con opciones.precompilar_templates, compila en el proceso principal los directorios de todos
+    los templates antes de crear los workers: los procesos solo cargan los módulos ya publicados.
+    """
+    opciones = config.get("opciones", {})
+    if not opciones.get("precompilar_templates", False):
+        return
+    destino_base = opciones.get("directorio_templates_compilados", "output/templates_compilados")
+    directorios = {os.path.dirname(ruta) for clave, ruta in config["rutas"].items() if clave.startswith("template_")}
+    for directorio in sorted(directorios):
+        compilar_templates(directorio, destino_base)
+
 
 class PDFGeneratorBase:
-    def __init__(self, config):
+    # Clave en config["rutas"] del template de cada generador
+    template_key = None
+    # Tipo de estado de cuenta (clave en config["rutas"]["salida_s3"])
+    tipo = None
+    # Lista del contexto con el detalle que se reparte entre fragmentos en agentes muy grandes
+    clave_detalle = "detalle_entidades"
+
+    def __init__(self, config, s3_client=None):
         self.config = config
-        self.s3_client = boto3.client("s3")
+        # Cliente de salida compartido por todo el proceso (boto3 es thread-safe); ClienteLocal con rutas file://
+        self.s3_client = s3_client or cliente_salida(config)
+        # Subidas asíncronas (s3.transferencias.habilitado); None = put_object en el hilo que renderiza
+        self.transferencias = obtener_transferencias(config, "output")
         self.anio = config["periodo"]["anio"]
         self.mes = config["periodo"]["mes"]
         self.periodo_str = f"{self.anio}{self.mes:02d}"
+        self._templates = {}
+        self._lock_templates = threading.Lock()
+        # Reproceso: solo se regeneran los agentes cuyo hash de contexto cambió
+        self.reproceso = config["periodo"].get("reproceso", False)
+        self.manifiestos = {}
+        self._hashes_templates = {}
+        self._fijos = {}
+        # Subidas asíncronas en curso y las que fallaron tras los reintentos (se descuentan de los "generado")
+        self._subidas = []
+        self._subidas_fallidas = set()
+        self._lock_subidas = threading.Lock()
+
+        # Compila el template al iniciar: si está roto, falla antes de procesar agentes
+        if self.template_key:
+            self._obtener_template(config["rutas"][self.template_key])
+
         logging.info(f"[{self.__class__.__name__}] - Inicializado para periodo {self.periodo_str}")
 
-    def _render_pdf(self, template_path: str, context: dict, tipo_actual: str, store_id: str):
+    def _crear_entorno(self, directorio: str) -> Environment:
         """
-        Renderiza PDF desde template Jinja2 y lo sube a S3 directamente.
+        Entorno Jinja2 del directorio de templates. Con opciones.precompilar_templates,
+        los templates se compilan una vez a módulos Python y se cargan con ModuleLoader.
         """
-        env = Environment(loader=FileSystemLoader(os.path.dirname(template_path)))
-        template = env.get_template(os.path.basename(template_path))
-        html_content = template.render(context)
+        opciones = self.config.get("opciones", {})
+        if not opciones.get("precompilar_templates", False):
+            return Environment(loader=FileSystemLoader(directorio))
 
-        config_wkhtml = pdfkit.configuration(
-            wkhtmltopdf=r"C:\Program Files\wkhtmltopdf\bin\wkhtmltopdf.exe"
-        )
+        destino = compilar_templates(directorio, opciones.get("directorio_templates_compilados", "output/templates_compilados"))
+        return Environment(loader=ModuleLoader(destino))
 
-        options = {
-            "page-size": "A4",
-            "margin-top": "5mm",
-            "margin-right": "5mm",
-            "margin-bottom": "25mm",
-            "margin-left": "5mm",
-            "encoding": "UTF-8",
-            "enable-local-file-access": None,
-            "print-media-type": ''
-        }
+    def _obtener_template(self, template_path: str):
+        """
+        Devuelve el template compilado, cacheado por ruta para todo el proceso.
+        """
+        template = self._templates.get(template_path)
+        if template is not None:
+            return template
+
+        with self._lock_templates:
+            if template_path not in self._templates:
+                entorno = self._crear_entorno(os.path.dirname(template_path))
+                self._templates[template_path] = entorno.get_template(os.path.basename(template_path))
+                logging.info(f"[{self.__class__.__name__}] - Template compilado: {template_path}")
+            return self._templates[template_path]
+
+    def fragmentos_fijos(self, template_path: str, context: dict) -> dict:
+        """
+        Bloques del periodo (hoja de estilos, encabezado con el logo, textos fijos y pie)
+        renderizados una sola vez y reutilizados como markup ya armado en cada agente.
+
+        Returns:
+            dict: nombre del parcial -> HTML
+        """
+        clave = (template_path,) + tuple(context.get(campo) for campo in CAMPOS_FIJOS)
+        fijos = self._fijos.get(clave)
+        if fijos is None:
+            entorno = self._obtener_template(template_path).environment
+            variables = {campo: context.get(campo) for campo in CAMPOS_FIJOS}
+            if not variables["ruta_css"]:
+                # CSS incrustado como texto, sin pasar por Jinja2 ("{#" en un selector no es un comentario)
+                with open(ruta_hoja_estilos(template_path), encoding="utf-8") as f:
+                    variables["css"] = f.read()
+            fijos = {nombre: entorno.get_template(f"parciales/{nombre}.html").render(variables) for nombre in PARCIALES}
+            self._fijos[clave] = fijos
+        return fijos
+
+    def _contexto_agente(self, store_id: str, row: dict, config: dict, cabecera: dict = None) -> dict:
+        """
+        Contexto base del template: cabecera del agente (compartida entre los tres tipos
+        si se recibe ya armada) más la hoja de estilos propia del template.
+        """
+        context = dict(cabecera or cabecera_agente(store_id, row, config))
+        # Modo assets estáticos: CSS por ruta local en vez de incrustado
+        context["ruta_css"] = (config.get("assets") or {}).get("css", {}).get(self.template_key)
+        return context
+
+    def _destino_s3(self, tipo_actual: str, nombre: str) -> tuple:
+        """
+        Bucket y key de un archivo del periodo en la ruta de salida del tipo.
+        """
+        ruta_s3 = self.config["rutas"]["salida_s3"][tipo_actual]
+        esquema(ruta_s3)  # s3:// o file://; cualquier otra ruta es inválida
+
+        bucket, prefix = separar_uri_s3(ruta_s3)
+        return bucket, f"{prefix}{self.periodo_str}/{nombre}"
 
-        # Crear PDF en archivo temporal
+    def manifiesto(self, tipo_actual: str) -> ManifiestoHashes:
+        with self._lock_templates:
+            if tipo_actual not in self.manifiestos:
+                bucket, key = self._destino_s3(tipo_actual, NOMBRE_MANIFIESTO)
+                self.manifiestos[tipo_actual] = ManifiestoHashes(self.s3_client, bucket, key)
+            return self.manifiestos[tipo_actual]
+
+    def _hash_template(self, template_path: str) -> str:
+        """
+        Hash del template, de su hoja de estilos y de los parciales: si cambian, cambia el PDF
+        aunque no cambien los datos.
+        """
+        if template_path not in self._hashes_templates:
+            digest = hashlib.sha256()
+            directorio = os.path.dirname(template_path)
+            parciales = [os.path.join(directorio, "parciales", f"{nombre}.html") for nombre in PARCIALES]
+            for ruta in (template_path, ruta_hoja_estilos(template_path), *parciales):
+                if os.path.exists(ruta):
+                    with open(ruta, "rb") as f:
+                        digest.update(f.read())
+            self._hashes_templates[template_path] = digest.hexdigest()
+        return self._hashes_templates[template_path]
+
+    def hash_contexto(self, template_path: str, context: dict, motor: str = "wkhtmltopdf") -> str:
+        """
+        Hash determinista del contexto (JSON con claves ordenadas), del template y del motor.
+        Las rutas locales de assets se excluyen: dependen de la máquina, no de los datos.
+        """
+        datos = {k: v for k, v in context.items() if k not in ("ruta_logo", "ruta_css")}
+        contenido = json.dumps(datos, sort_keys=True, ensure_ascii=False, default=str, separators=(",", ":"))
+        huella = self._hash_template(template_path)
+        if motor != MotorWkhtmltopdf.nombre:
+            # El motor por defecto no entra en el hash: los manifiestos ya guardados siguen valiendo
+            huella = f"{huella}|{motor}"
+        return hashlib.sha256(f"{huella}|{contenido}".encode("utf-8")).hexdigest()
+
+    def _render_pdf(self, template_path: str, context: dict, tipo_actual: str, store_id: str) -> bool:
+        """
+        Renderiza el PDF con el motor configurado para el tipo y lo sube a S3 directamente desde memoria.
+        Solo los PDF que superan render.umbral_archivo_temporal_mb pasan por un archivo temporal.
+
+        El hash del contexto se guarda como metadata del objeto y en el manifiesto del periodo;
+        en reproceso, si coincide con el del PDF vigente no se renderiza ni se sube (devuelve False).
+        """
+        motor = obtener_motor(self.config, tipo_actual)
+        manifiesto = self.manifiesto(tipo_actual)
+        hash_contexto = self.hash_contexto(template_path, context, motor.nombre)
+        if self.reproceso and manifiesto.hash_anterior(store_id) == hash_contexto:
+            logging.info(f"[{self.__class__.__name__}] - {store_id} sin cambios desde la última generación. Omitido.")
+            return False
+
+        opciones = opciones_render(self.config)
+        pdf_bytes = motor.renderizar(self, template_path, context, store_id)
+
+        bucket, key = self._destino_s3(tipo_actual, f"{store_id}.pdf")
+        metadata = {"hash-contexto": hash_contexto}
+
+        # Subir a S3
+        if self.transferencias is not None and len(pdf_bytes) <= opciones["umbral_archivo_temporal_mb"] * 1024 * 1024:
+            # El hilo sigue renderizando; el hash se registra en esperar_subidas, cuando la subida terminó
+            futuro = self.transferencias.subir(bucket, key, pdf_bytes, ContentType="application/pdf", Metadata=metadata)
+            with self._lock_subidas:
+                self._subidas.append((futuro, manifiesto, store_id, hash_contexto, f"s3://{bucket}/{key}", len(pdf_bytes)))
+            return True
+        if len(pdf_bytes) <= opciones["umbral_archivo_temporal_mb"] * 1024 * 1024:
+            self.s3_client.put_object(Bucket=bucket, Key=key, Body=pdf_bytes, ContentType="application/pdf", Metadata=metadata)
+        else:
+            self._subir_desde_temporal(pdf_bytes, bucket, key, metadata)
+        manifiesto.registrar(store_id, hash_contexto)
+        logging.info(f"[{self.__class__.__name__}] - PDF subido a S3: s3://{bucket}/{key} ({len(pdf_bytes) / 1024:.0f} KB)")
+        return True
+
+    def _subida_terminada(self, futuro, manifiesto: ManifiestoHashes, store_id: str, hash_contexto: str, destino: str, tamano: int):
+        if futuro.exception() is not None:
+            logging.error(f"[{self.__class__.__name__}] - Error subiendo {destino}: {futuro.exception()}")
+            with self._lock_subidas:
+                self._subidas_fallidas.add(store_id)
+            return
+        manifiesto.registrar(store_id, hash_contexto)
+        logging.info(f"[{self.__class__.__name__}] - PDF subido a S3: {destino} ({tamano / 1024:.0f} KB)")
+
+    def _subir_desde_temporal(self, pdf_bytes: bytes, bucket: str, key: str, metadata: dict):
+        """
+        PDF muy grande: se sube con upload_file (multipart) y el temporal se borra siempre.
+        """
         with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_pdf:
-            pdfkit.from_string(html_content, tmp_pdf.name, configuration=config_wkhtml, options=options)
+            tmp_pdf.write(pdf_bytes)
+        try:
+            self.s3_client.upload_file(tmp_pdf.name, bucket, key, ExtraArgs={"ContentType": "application/pdf", "Metadata": metadata})
+        finally:
+            os.remove(tmp_pdf.name)
+
+    def _html_a_pdf(self, html_content: str, opciones: dict) -> bytes:
+        if opciones["pool_persistente"]:
+            # Worker wkhtmltopdf ya iniciado: sin arranque de Qt/WebKit por PDF
+            return obtener_pool(self.config).renderizar(html_content)
+
+        config_wkhtml = pdfkit.configuration(wkhtmltopdf=opciones["wkhtmltopdf"])
+        # output_path=False: pdfkit devuelve el PDF en bytes (wkhtmltopdf escribe a stdout)
+        return pdfkit.from_string(html_content, False, configuration=config_wkhtml, options=OPCIONES_PDF)
+
+    def _fragmentos(self, context: dict, opciones: dict) -> list:
+        """
+        Contextos a renderizar por separado. Si el detalle supera render.umbral_filas_fragmento,
+        el primero lleva la primera página y el inicio del detalle, los siguientes solo detalle
+        (solo_detalle) y el pie va únicamente en el último. Numeración y totales se mantienen.
+        """
+        umbral = opciones["umbral_filas_fragmento"]
+        detalle = context.get(self.clave_detalle) or []
+        if self.clave_detalle == "detalle_entidades":
+            filas = sum(len(entidad["operaciones"]) for entidad in detalle)
+        else:
+            filas = len(detalle)
+
+        if not umbral or filas <= umbral:
+            return [context]
+        if PdfWriter is None:
+            logging.warning(f"[{self.__class__.__name__}] - {filas} filas de detalle pero pypdf no está instalado; se renderiza en un solo HTML.")
+            return [context]
+
+        por_fragmento = opciones["filas_por_fragmento"]
+        if self.clave_detalle == "detalle_entidades":
+            partes = [{self.clave_detalle: parte} for parte in fragmentar_entidades(detalle, por_fragmento)]
+        else:
+            # Detalle plano (adquirencia): numeración continua y total de la lista completa
+            totales = {c: sum(op[c] for op in detalle) for c in ("importe_venta", "comision_venta", "importe_abonado")}
+            partes = [
+                {
+                    self.clave_detalle: detalle[inicio:inicio + por_fragmento],
+                    "offset_filas": inicio,
+                    "detalle_continua": inicio + por_fragmento < filas,
+                    "totales_detalle": totales
+                }
+                for inicio in range(0, filas, por_fragmento)
+            ]
 
-            # Extraer info de S3
-            ruta_s3 = self.config["rutas"]["salida_s3"][tipo_actual]
-            if not ruta_s3.startswith("s3://"):
-                raise ValueError(f"Ruta inválida S3: {ruta_s3}")
+        return [
+            dict(context, **parte, solo_detalle=i > 0, sin_pie=i < len(partes) - 1)
+            for i, parte in enumerate(partes)
+        ]
 
-            bucket = ruta_s3.split("/")[2]
-            prefix = "/".join(ruta_s3.split("/")[3:])
-            key = f"{prefix}{self.periodo_str}/{store_id}.pdf"
+    def esperar_subidas(self):
+        """
+        Espera las subidas asíncronas en curso: sus hashes entran al manifiesto al terminar.
+        """
+        if self.transferencias is None:
+            return
+        with self._lock_subidas:
+            subidas, self._subidas = self._subidas, []
+        wait([subida[0] for subida in subidas])
+        for subida in subidas:
+            self._subida_terminada(*subida)
 
-            # Subir a S3
-            self.s3_client.upload_file(tmp_pdf.name, bucket, key)
-            logging.info(f"[{self.__class__.__name__}] - PDF subido a S3: s3://{bucket}/{key}")
+    def extraer_subidas_fallidas(self) -> set:
+        """
+        Espera las subidas en curso y devuelve (y vacía) los store_id cuya subida asíncrona falló:
+        generar_agente ya los contó como "generado" al encolarlos.
+        """
+        self.esperar_subidas()
+        with self._lock_subidas:
+            fallidas, self._subidas_fallidas = self._subidas_fallidas, set()
+        return fallidas
 
+    def guardar_manifiestos(self):
+        """
+        Sube los hashes de los PDF generados en esta ejecución (llamar al terminar).
+        """
+        self.esperar_subidas()
+        for manifiesto in self.manifiestos.values():
+            manifiesto.guardar()
 
+    def generar_agente(self, store_id: str, row: dict, datos: dict, config: dict, cabecera: dict = None) -> str:
+        """
+        Genera y sube el PDF de un agente ya ubicado en df_agentes (row).
 
-class PDFGeneratorContraprestaciones(PDFGeneratorBase):
-    """
-    Genera PDFs de Contraprestaciones por agente.
-    """
+        Returns:
+            str: "generado", "sin_datos" (sin operaciones) o "sin_cambios" (reproceso sin cambios)
+        """
+        nombre = self.__class__.__name__
+        context = self.construir_contexto(store_id, row, datos, config, cabecera)
+        if context is None:
+            logging.warning(f"[{nombre}] - Agente {store_id} sin datos para Procesar.")
+            return "sin_datos"
+
+        if not self._render_pdf(config["rutas"][self.template_key], context, tipo_actual=self.tipo, store_id=store_id):
+            return "sin_cambios"
+
+        logging.info(f"[{nombre}] - PDF generado: {store_id}.pdf")
+        return "generado"
 
     def generar_individual(self, store_id, df_agentes, datos: dict, config: dict):
         """
@@ -67,286 +534,181 @@ class PDFGeneratorContraprestaciones(PDFGeneratorBase):
         """
         agente_row = df_agentes[df_agentes["store_id"] == store_id]
         if agente_row.empty:
-            logging.warning(f"[PDFGeneratorContraprestaciones] - Agente {store_id} no encontrado en df_agentes.")
+            logging.warning(f"[{self.__class__.__name__}] - Agente {store_id} no encontrado en df_agentes.")
             return
-        
-        self.generar(agente_row, datos, config)
 
+        self.generar(agente_row, datos, config)
 
     def generar(self, df_agentes, datos: dict, config: dict):
-        logging.info("[PDFGeneratorContraprestaciones] - Iniciando generación de PDFs")
-        
+        nombre = self.__class__.__name__
+        logging.info(f"[{nombre}] - Iniciando generación de PDFs")
+
         df_agentes = df_agentes.copy()  # evita el warning
         df_agentes["store_id"] = df_agentes["store_id"].astype(str)
 
-        generados, fallidos = 0, 0
-
-        # Asegurar tipo consistente de store_id
-        datos["detalle_contra"]["store_id"] = datos["detalle_contra"]["store_id"].astype(str)
-
-        for _, row in df_agentes.iterrows():
-            store_id = row["store_id"]
-            agente_ops = datos["detalle_contra"][datos["detalle_contra"]["store_id"] == store_id]
-
-           
-            if agente_ops.empty:
-                logging.warning(f"[PDFGeneratorContraprestaciones] - Agente {store_id} sin datos para Procesar.")
-                fallidos += 1
-                continue
-
-            # === Resumen operaciones ===
-            resumen = (
-                agente_ops.groupby("entity_description")
-                .agg(cantidad=("transaction_amount", "count"),
-                     total_comision=("comission_amount", "sum"),
-                     total_igv=("comission_amount_igv", "sum"),
-                     igv=("igv", "sum")
-                     
-                     )
-                .reset_index()
-            )
-            subtotal_operaciones = resumen["total_comision"].sum()
-            subtotal_operaciones_cantidad = resumen["cantidad"].sum()      
-            igv_total_operaciones = resumen["igv"].sum() if "igv" in resumen.columns else 0   
-
-            # Ordenar operaciones por fecha y número de operación
-            agente_ops = agente_ops.sort_values(by=["transaction_date", "transaction_id"])
-
-            # === Bonos ===
-            bonos_agente = datos["detalle_bonos"][datos["detalle_bonos"]["store_id"] == store_id]
-            bonos_list = [
-                {
-                  "descripcion": row["bonus_type"],
-                  "monto": row["monto"],
-                  "igv": row["igv"]
-                }
-                for _, row in bonos_agente.iterrows()
-            ]
-            subtotal_bonos = bonos_agente["monto"].sum() if not bonos_agente.empty else 0
-            igv_total_bonos = bonos_agente["igv"].sum() if "igv" in bonos_agente.columns else 0  
+        estados = {"generado": 0, "sin_datos": 0, "sin_cambios": 0}
+        for row in df_agentes.to_dict(orient="records"):
+            estados[self.generar_agente(row["store_id"], row, datos, config)] += 1
 
-            # === Descuentos ===
-            desc_agente = datos["detalle_desc"][datos["detalle_desc"]["store_id"] == store_id]
-            descuentos_list = [
-                {
-                  "descripcion": row["discount_type"],
-                  "monto": row["monto"],
-                  "igv": row["igv"]
-                }
-                for _, row in desc_agente.iterrows()
-            ]
-            subtotal_descuentos = desc_agente["monto"].sum() if not desc_agente.empty else 0
-            igv_total_descuentos = desc_agente["igv"].sum() if "igv" in desc_agente.columns else 0 
-
-            # === Actualizar TOTAL depósito (Método simplificado) ===
-            total_sin_igv = subtotal_operaciones + subtotal_bonos + subtotal_descuentos
-            igv_total = round(igv_total_operaciones + igv_total_bonos + igv_total_descuentos, 2)
-            total_deposito = round(total_sin_igv + igv_total, 2)
-
-            # === Contexto para el template ===
-
-            anio = config["periodo"]["anio"]
-            mes_num = config["periodo"]["mes"]
-
-            # Traducción manual del mes
-            meses_es = [
-                    "", "ENERO", "FEBRERO", "MARZO", "ABRIL", "MAYO", "JUNIO",
-                    "JULIO", "AGOSTO", "SEPTIEMBRE", "OCTUBRE", "NOVIEMBRE", "DICIEMBRE"
-                ]
-            nombre_mes = meses_es[mes_num]            
-
-            context = {
-                "nombre_mes": nombre_mes,
-                "anio": anio,
-                "cod_agente": store_id,
-                "nombre_agente": row["merchant"],
-                "titular": row["store_owner"],
-                "direccion": row["address"],
-                "provincia": row["province"],
-                "departamento": row["region"],
-                "periodo": f"{config['periodo']['mes']}/{config['periodo']['anio']}",
-                "logo_base64": config["logo_base64"],
-                "informacion_adicional": config["textos_fijos"]["informacion_adicional"],
-                "nota_importante": config["textos_fijos"]["nota_importante"],
-                "campanas_activas": config["textos_fijos"]["campanas_activas"],
-                "resumen_entidades": [
-                    {
-                        "descripcion_entidad": r.entity_description,
-                        "cantidad": r.cantidad,
-                        "total_comision": r.total_comision
-                    }
-                    for _, r in resumen.iterrows()
-                ],
-                "detalle_entidades": [
-                    {
-                        "nombre": entidad,
-                        "operaciones": [
-                            {
-                                "entidad_financiera": op["entity_description"],  #NUEVO pedido Iris
-                                "fecha": op["transaction_date"],
-                                "descripcion": op["operation_description"],
-                                "pos": op["pos"],
-                                "numero_operacion": op["transaction_id"], ### validar para cambiar
-                                "importe": float(op["transaction_amount"] or 0.0),
-                                "comision": float(op["comission_amount"] or 0.0)
-                            }
-                            for _, op in agente_ops[agente_ops["entity_description"] == entidad].iterrows()
-                        ]
-                    }
-                    for entidad in resumen["entity_description"]
-                ],
-                "subtotal_operaciones": subtotal_operaciones,
-                "subtotal_operaciones_cantidad": subtotal_operaciones_cantidad,
-                "bonos": bonos_list,
-                "subtotal_bonos": subtotal_bonos,
-                "descuentos": descuentos_list,
-                "subtotal_descuentos": subtotal_descuentos,
-                "total_sin_igv": total_sin_igv,
-                "igv_total": igv_total,
-                "total_deposito": total_deposito
-            }
-
-            
-            output_file = f"{store_id}.pdf" 
-
-            self._render_pdf(config["rutas"]["template_contraprestaciones"], context, tipo_actual="contraprestacion", store_id=store_id)
-
-            logging.info(f"[PDFGeneratorContraprestaciones] - PDF generado: {output_file}")
-            generados += 1
-
-        logging.info(f"[PDFGeneratorContraprestaciones] - Completado: {generados} generados, {fallidos} fallidos.")
+        logging.info(
+            f"[{nombre}] - Completado: {estados['generado']} generados, {estados['sin_datos']} fallidos, "
+            f"{estados['sin_cambios']} sin cambios."
+        )
 
 
-class PDFGeneratorReembolso(PDFGeneratorBase):
+class PDFGeneratorContraprestaciones(PDFGeneratorBase):
     """
-    Genera PDFs de Reembolso por agente.
+    Genera PDFs de Contraprestaciones por agente.
     """
 
-    def generar_individual(self, store_id, df_agentes, datos: dict, config: dict):
+    template_key = "template_contraprestaciones"
+    tipo = "contraprestacion"
+
+    def construir_contexto(self, store_id: str, row: dict, datos: dict, config: dict, cabecera: dict = None):
         """
-        Genera el PDF para un solo agente, dado su store_id.
+        Arma el contexto del template para un agente. Devuelve None si no tiene operaciones.
         """
-        agente_row = df_agentes[df_agentes["store_id"] == store_id]
-        if agente_row.empty:
-            logging.warning(f"[PDFGeneratorReembolso] - Agente {store_id} no encontrado en df_agentes.")
-            return
-        
-        self.generar(agente_row, datos, config)
+        agente_ops = obtener_filas_store(datos, "detalle_contra", store_id)
+        if agente_ops.empty:
+            return None
+
+        # === Resumen operaciones (precalculado en procesar_datos) ===
+        resumen = obtener_filas_store(datos, "resumen_contra_entidad", store_id)
+        totales = datos["totales"]["contra"].get(store_id, {})
+        subtotal_operaciones = totales.get("total_comision", 0)
+        subtotal_operaciones_cantidad = totales.get("cantidad", 0)
+        igv_total_operaciones = totales.get("igv", 0)
+
+        # Ordenar operaciones por fecha y número de operación
+        agente_ops = agente_ops.sort_values(by=["transaction_date", "transaction_id"])
+        agente_ops = agente_ops.assign(
+            importe=montos(agente_ops, "transaction_amount"),
+            comision=montos(agente_ops, "comission_amount")
+        )
 
+        # === Detalle por entidad (un solo split del DataFrame) ===
+        columnas_detalle = {
+            "entidad_financiera": "entity_description",  #NUEVO pedido Iris
+            "fecha": "transaction_date",
+            "descripcion": "operation_description",
+            "pos": "pos",
+            "numero_operacion": "transaction_id",  ### validar para cambiar
+            "importe": "importe",
+            "comision": "comision"
+        }
+        detalle_entidades = [
+            {"nombre": entidad, "operaciones": registros(grupo, columnas_detalle)}
+            for entidad, grupo in agente_ops.groupby("entity_description", sort=True, observed=True)
+        ]
+
+        # === Bonos ===
+        bonos_agente = obtener_filas_store(datos, "detalle_bonos", store_id)
+        bonos_list = registros(bonos_agente, {"descripcion": "bonus_type", "monto": "monto", "igv": "igv"})
+        totales_bonos = datos["totales"]["bonos"].get(store_id, {})
+        subtotal_bonos = totales_bonos.get("monto", 0)
+        igv_total_bonos = totales_bonos.get("igv", 0)
+
+        # === Descuentos ===
+        desc_agente = obtener_filas_store(datos, "detalle_desc", store_id)
+        descuentos_list = registros(desc_agente, {"descripcion": "discount_type", "monto": "monto", "igv": "igv"})
+        totales_desc = datos["totales"]["desc"].get(store_id, {})
+        subtotal_descuentos = totales_desc.get("monto", 0)
+        igv_total_descuentos = totales_desc.get("igv", 0)
+
+        # === Actualizar TOTAL depósito (Método simplificado) ===
+        total_sin_igv = subtotal_operaciones + subtotal_bonos + subtotal_descuentos
+        igv_total = round(igv_total_operaciones + igv_total_bonos + igv_total_descuentos, 2)
+        total_deposito = round(total_sin_igv + igv_total, 2)
+
+        # === Contexto para el template ===
+        context = self._contexto_agente(store_id, row, config, cabecera)
+        context.update({
+            "resumen_entidades": registros(resumen, {
+                "descripcion_entidad": "entity_description",
+                "cantidad": "cantidad",
+                "total_comision": "total_comision"
+            }),
+            "detalle_entidades": detalle_entidades,
+            "subtotal_operaciones": subtotal_operaciones,
+            "subtotal_operaciones_cantidad": subtotal_operaciones_cantidad,
+            "bonos": bonos_list,
+            "subtotal_bonos": subtotal_bonos,
+            "descuentos": descuentos_list,
+            "subtotal_descuentos": subtotal_descuentos,
+            "total_sin_igv": total_sin_igv,
+            "igv_total": igv_total,
+            "total_deposito": total_deposito
+        })
+        return context
 
-    def generar(self, df_agentes, datos: dict, config: dict):
-        logging.info("[PDFGeneratorReembolso] - Iniciando generación de PDFs")
 
-        df_agentes = df_agentes.copy()  # evita el warning
-        df_agentes["store_id"] = df_agentes["store_id"].astype(str)
+class PDFGeneratorReembolso(PDFGeneratorBase):
+    """
+    Genera PDFs de Reembolso por agente.
+    """
 
-        generados, fallidos = 0, 0
-
-        datos["detalle_reembolso"]["store_id"] = datos["detalle_reembolso"]["store_id"].astype(str)
-        #df_agentes["store_id"] = df_agentes["store_id"].astype(str)
-
-        for _, row in df_agentes.iterrows():
-            store_id = row["store_id"]
-            agente_ops = datos["detalle_reembolso"][datos["detalle_reembolso"]["store_id"] == store_id]
-            
-            agente_ops = agente_ops.sort_values(by=["transaction_date", "transaction_id"])
-
-            if agente_ops.empty:
-                logging.warning(f"[PDFGeneratorReembolso] - Agente {store_id} sin datos para Procesar.")
-                fallidos += 1
-                continue
-
-            # === Resumen agrupado por tipo de reembolso (company_description) ===
-            resumen = (
-                agente_ops.groupby("company_description")
-                .agg(
-                    cantidad=("transaction_amount", "count"),
-                    total_comision=("comission_amount", "sum")
-                )
-                .reset_index()
-            )
-
-            subtotal_operaciones = resumen["total_comision"].sum()
-            subtotal_operaciones_cantidad = resumen["cantidad"].sum()
-
-            # === IGV (cuando esté en el parquet lo tomará directamente) ===
-            igv_total_operaciones = agente_ops["igv"].sum() if "igv" in agente_ops.columns else 0
-
-            # === Total Depósito ===
-            total_sin_igv = subtotal_operaciones
-            igv_total = round(igv_total_operaciones, 2)
-            total_deposito = round(total_sin_igv + igv_total, 2)
-
-            # === Contexto para el template ===
-
-            anio = config["periodo"]["anio"]
-            mes_num = config["periodo"]["mes"]
-
-            # Traducción manual del mes
-            meses_es = [
-                    "", "ENERO", "FEBRERO", "MARZO", "ABRIL", "MAYO", "JUNIO",
-                    "JULIO", "AGOSTO", "SEPTIEMBRE", "OCTUBRE", "NOVIEMBRE", "DICIEMBRE"
-                ]
-            nombre_mes = meses_es[mes_num] 
-
-
-            context = {
-                "nombre_mes": nombre_mes,
-                "anio": anio,
-                "cod_agente": store_id,
-                "nombre_agente": row["merchant"],
-                "titular": row["store_owner"],
-                "direccion": row["address"],
-                "provincia": row["province"],
-                "departamento": row["region"],
-                "periodo": f"{config['periodo']['mes']}/{config['periodo']['anio']}",
-                "logo_base64": config["logo_base64"],
-                "informacion_adicional": config["textos_fijos"]["informacion_adicional"],
-                "nota_importante": config["textos_fijos"]["nota_importante"],
-                "campanas_activas": config["textos_fijos"]["campanas_activas"],
-                "resumen_entidades": [
-                    {
-                        "descripcion_entidad": r.company_description,
-                        "cantidad": r.cantidad,
-                        "total_comision": r.total_comision
-                    }
-                    for _, r in resumen.iterrows()
-                ],
-
-                "detalle_entidades": [
-                    {
-                        "nombre": entidad,  # company_description
-                        "operaciones": [
-                            {
-                                "entidad": entidad, 
-                                "fecha": op["transaction_date"],
-                                "descripcion": op["operation_description"],
-                                "pos": op["pos"],
-                                "numero_operacion": op["transaction_id"],  # si es necesario renombrar luego
-                                "importe": float(op["transaction_amount"] or 0.0),
-                                "comision": float(op["comission_amount"] or 0.0)
-                            }
-                            for _, op in agente_ops[agente_ops["company_description"] == entidad].iterrows()
-                        ]
-                    }
-                    for entidad in resumen["company_description"]
-                ],
-
-                "subtotal_operaciones": subtotal_operaciones,
-                "subtotal_operaciones_cantidad": subtotal_operaciones_cantidad,
-                "total_sin_igv": total_sin_igv,  # NUEVO
-                "igv_total": igv_total,          # NUEVO
-                "total_deposito": total_deposito # NUEVO
-
-            }
-
-            output_file = f"{store_id}.pdf"
-            self._render_pdf(config["rutas"]["template_reembolso"], context, tipo_actual="reembolso", store_id=store_id)
-
-            logging.info(f"[PDFGeneratorReembolso] - PDF generado: {output_file}")
-            generados += 1
-
-        logging.info(f"[PDFGeneratorReembolso] - Completado: {generados} generados, {fallidos} fallidos.")
+    template_key = "template_reembolso"
+    tipo = "reembolso"
+
+    def construir_contexto(self, store_id: str, row: dict, datos: dict, config: dict, cabecera: dict = None):
+        """
+        Arma el contexto del template para un agente. Devuelve None si no tiene operaciones.
+        """
+        agente_ops = obtener_filas_store(datos, "detalle_reembolso", store_id)
+        if agente_ops.empty:
+            return None
+
+        agente_ops = agente_ops.sort_values(by=["transaction_date", "transaction_id"])
+
+        # === Resumen agrupado por tipo de reembolso (company_description, precalculado) ===
+        resumen = obtener_filas_store(datos, "resumen_reembolso_entidad", store_id)
+        totales = datos["totales"]["reembolso"].get(store_id, {})
+        subtotal_operaciones = totales.get("total_comision", 0)
+        subtotal_operaciones_cantidad = totales.get("cantidad", 0)
+
+        # === IGV (cuando esté en el parquet lo tomará directamente) ===
+        igv_total_operaciones = datos["totales"]["reembolso_igv"].get(store_id, {}).get("igv", 0)
+
+        # === Total Depósito ===
+        total_sin_igv = subtotal_operaciones
+        igv_total = round(igv_total_operaciones, 2)
+        total_deposito = round(total_sin_igv + igv_total, 2)
+
+        # === Detalle por entidad (un solo split del DataFrame) ===
+        agente_ops = agente_ops.assign(
+            importe=montos(agente_ops, "transaction_amount"),
+            comision=montos(agente_ops, "comission_amount")
+        )
+        columnas_detalle = {
+            "entidad": "company_description",
+            "fecha": "transaction_date",
+            "descripcion": "operation_description",
+            "pos": "pos",
+            "numero_operacion": "transaction_id",  # si es necesario renombrar luego
+            "importe": "importe",
+            "comision": "comision"
+        }
+        detalle_entidades = [
+            {"nombre": entidad, "operaciones": registros(grupo, columnas_detalle)}  # company_description
+            for entidad, grupo in agente_ops.groupby("company_description", sort=True, observed=True)
+        ]
+
+        # === Contexto para el template ===
+        context = self._contexto_agente(store_id, row, config, cabecera)
+        context.update({
+            "resumen_entidades": registros(resumen, {
+                "descripcion_entidad": "company_description",
+                "cantidad": "cantidad",
+                "total_comision": "total_comision"
+            }),
+            "detalle_entidades": detalle_entidades,
+            "subtotal_operaciones": subtotal_operaciones,
+            "subtotal_operaciones_cantidad": subtotal_operaciones_cantidad,
+            "total_sin_igv": total_sin_igv,  # NUEVO
+            "igv_total": igv_total,          # NUEVO
+            "total_deposito": total_deposito # NUEVO
+        })
+        return context
 
 
 class PDFGeneratorAdquirencia(PDFGeneratorBase):
@@ -354,120 +716,55 @@ class PDFGeneratorAdquirencia(PDFGeneratorBase):
     Genera PDFs de Adquirencia por agente.
     """
 
-    def generar_individual(self, store_id, df_agentes, datos: dict, config: dict):
+    template_key = "template_adquirencia"
+    tipo = "adquirencia"
+    clave_detalle = "detalle_adquirencia"
+
+    def construir_contexto(self, store_id: str, row: dict, datos: dict, config: dict, cabecera: dict = None):
         """
-        Genera el PDF para un solo agente, dado su store_id.
+        Arma el contexto del template para un agente. Devuelve None si no tiene operaciones.
         """
-        agente_row = df_agentes[df_agentes["store_id"] == store_id]
-        if agente_row.empty:
-            logging.warning(f"[PDFGeneratorAdquirencia] - Agente {store_id} no encontrado en df_agentes.")
-            return
-        
-        self.generar(agente_row, datos, config)
-
-    def generar(self, df_agentes, datos: dict, config: dict):
-        logging.info("[PDFGeneratorAdquirencia] - Iniciando generación de PDFs")
-        
-        df_agentes = df_agentes.copy()
-        df_agentes["store_id"] = df_agentes["store_id"].astype(str)
-
-        generados, fallidos = 0, 0
-
-        datos["detalle_adquirencia"]["store_id"] = datos["detalle_adquirencia"]["store_id"].astype(str)
-
-        for _, row in df_agentes.iterrows():
-            store_id = row["store_id"]
-            agente_ops = datos["detalle_adquirencia"][datos["detalle_adquirencia"]["store_id"] == store_id]
-
-            agente_ops = agente_ops.sort_values(by=["transaction_date", "entity_transaction_id"])
-
-            if agente_ops.empty:
-                logging.warning(f"[PDFGeneratorAdquirencia] - Agente {store_id} sin datos para Procesar.")
-                fallidos += 1
-                continue
-
-            ### === Resumen agrupado por fecha ===
-            resumen = (
-                agente_ops.groupby("transaction_date")
-                .agg(
-                    cantidad=("transaction_amount", "count"),
-                    importe_venta=("transaction_amount", "sum"),
-                    comision_venta=("comission_amount_igv", "sum"),
-                    importe_abonado=("importe_abonado", "sum")
-                )
-                .reset_index()
-            )
-
-            total_cantidad = resumen["cantidad"].sum()
-            total_importe_venta = resumen["importe_venta"].sum()
-            total_comision_venta = resumen["comision_venta"].sum()
-            total_importe_abonado = resumen["importe_abonado"].sum()
-
-            ### === Detalle por fecha (Página 2 en adelante) ===
-            detalle_adquirencia = [
-                        {
-                            "fecha": op["transaction_date"],
-                            "hora": op["transaction_hour"],
-                            "pos": op["pos"],
-                            "numero_operacion": op["entity_transaction_id"],
-                            "importe_venta": op["transaction_amount"],
-                            "comision_venta": op["comission_amount_igv"],
-                            "importe_abonado": op["importe_abonado"]
-                        }
-                        for _, op in agente_ops.iterrows()
-                    ]
-
-            ### === Contexto para el template ===
-
-            anio = config["periodo"]["anio"]
-            mes_num = config["periodo"]["mes"]
-
-            ### Traducción manual del mes
-            meses_es = [
-                    "", "ENERO", "FEBRERO", "MARZO", "ABRIL", "MAYO", "JUNIO",
-                    "JULIO", "AGOSTO", "SEPTIEMBRE", "OCTUBRE", "NOVIEMBRE", "DICIEMBRE"
-                ]
-            nombre_mes = meses_es[mes_num] 
-
-            context = {
-                "nombre_mes": nombre_mes,
-                "anio": anio,
-                "cod_agente": store_id,
-                "nombre_agente": row["merchant"],
-                "titular": row["store_owner"],
-                "direccion": row["address"],
-                "provincia": row["province"],
-                "departamento": row["region"],
-                "periodo": f"{config['periodo']['mes']}/{config['periodo']['anio']}",
-                "logo_base64": config["logo_base64"],
-                "informacion_adicional": config["textos_fijos"]["informacion_adicional"],
-                "nota_importante": config["textos_fijos"]["nota_importante"],
-                "campanas_activas": config["textos_fijos"]["campanas_activas"],
-
-                "resumen_adquirencia": [
-                    {
-                        "fecha": r.transaction_date,
-                        "cantidad": r.cantidad,
-                        "importe_venta": r.importe_venta,
-                        "comision_venta": r.comision_venta,
-                        "importe_abonado": r.importe_abonado
-                    }
-                    for _, r in resumen.iterrows()
-                ],
-                "total_cantidad": total_cantidad,
-                "total_importe_venta": total_importe_venta,
-                "total_comision_venta": total_comision_venta,
-                "total_importe_abonado": total_importe_abonado,
-
-                "detalle_adquirencia": detalle_adquirencia
-
-            }
-            
-            ### nuevo
-            output_file = f"{store_id}.pdf"
-            self._render_pdf(config["rutas"]["template_adquirencia"], context, tipo_actual="adquirencia", store_id=store_id)
-
-            logging.info(f"[PDFGeneratorAdquirencia] - PDF generado: {output_file}")
-            generados += 1
-
-        logging.info(f"[PDFGeneratorAdquirencia] - Completado: {generados} generados, {fallidos} fallidos.")
+        agente_ops = obtener_filas_store(datos, "detalle_adquirencia", store_id)
+        if agente_ops.empty:
+            return None
+
+        agente_ops = agente_ops.sort_values(by=["transaction_date", "entity_transaction_id"])
+
+        ### === Resumen agrupado por fecha (precalculado en procesar_datos) ===
+        resumen = obtener_filas_store(datos, "resumen_adquirencia_fecha", store_id)
+        totales = datos["totales"]["adquirencia"].get(store_id, {})
+
+        total_cantidad = totales.get("cantidad", 0)
+        total_importe_venta = totales.get("importe_venta", 0)
+        total_comision_venta = totales.get("comision_venta", 0)
+        total_importe_abonado = totales.get("importe_abonado", 0)
+
+        ### === Detalle por fecha (Página 2 en adelante) ===
+        detalle_adquirencia = registros(agente_ops, {
+            "fecha": "transaction_date",
+            "hora": "transaction_hour",
+            "pos": "pos",
+            "numero_operacion": "entity_transaction_id",
+            "importe_venta": "transaction_amount",
+            "comision_venta": "comission_amount_igv",
+            "importe_abonado": "importe_abonado"
+        })
+
+        ### === Contexto para el template ===
+        context = self._contexto_agente(store_id, row, config, cabecera)
+        context.update({
+            "resumen_adquirencia": registros(resumen, {
+                "fecha": "transaction_date",
+                "cantidad": "cantidad",
+                "importe_venta": "importe_venta",
+                "comision_venta": "comision_venta",
+                "importe_abonado": "importe_abonado"
+            }),
+            "total_cantidad": total_cantidad,
+            "total_importe_venta": total_importe_venta,
+            "total_comision_venta": total_comision_venta,
+            "total_importe_abonado": total_importe_abonado,
+
+            "detalle_adquirencia": detalle_adquirencia
+        })
+        return context
@@ -1,14 +1,14 @@
-import boto3
 import pandas as pd
 import io
 from datetime import datetime
 import logging
+from modules.clientes_s3 import obtener_cliente_s3
 
 class ProgressTrackerS3:
     def __init__(self, bucket, key):
         self.bucket = bucket
         self.key = key
-        self.s3_client = boto3.client("s3")
+        self.s3_client = obtener_cliente_s3("output")
         self.df = self._load_or_init()
 
     def _load_or_init(self):
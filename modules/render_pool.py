@@ -0,0 +1,287 @@
+import os
+import queue
+import shutil
+import logging
+import tempfile
+import threading
+import subprocess
+from io import BytesIO
+from pathlib import Path
+
+try:
+    from pypdf import PdfWriter
+except ImportError:  # opcional: sin pypdf no se fragmentan los PDF grandes
+    PdfWriter = None
+
+# Opciones de página para wkhtmltopdf (mismas que usaba pdfkit en _render_pdf)
+OPCIONES_PDF = {
+    "page-size": "A4",
+    "margin-top": "5mm",
+    "margin-right": "5mm",
+    "margin-bottom": "25mm",
+    "margin-left": "5mm",
+    "encoding": "UTF-8",
+    "enable-local-file-access": None,
+    "print-media-type": ''
+}
+
+WKHTMLTOPDF_DEFAULT = r"C:\Program Files\wkhtmltopdf\bin\wkhtmltopdf.exe"
+
+# Valores por defecto de config["render"]
+OPCIONES_RENDER = {
+    "motor": "wkhtmltopdf",            # "wkhtmltopdf", "pdf_directo" o dict tipo -> motor
+    "wkhtmltopdf": WKHTMLTOPDF_DEFAULT,
+    # Sin validar contra el wkhtmltopdf de producción: correr antes benchmarks/verificar_pool_wkhtmltopdf.py
+    "pool_persistente": False,
+    "workers": 4,
+    "max_trabajos_por_worker": 500,
+    "timeout_segundos": 300,
+    "umbral_archivo_temporal_mb": 50,  # PDFs mayores se suben vía archivo temporal
+    "assets_estaticos": False,
+    "directorio_assets": "output/assets",
+    "umbral_filas_fragmento": 5000,    # agentes con más filas de detalle se renderizan por fragmentos (0 = nunca)
+    "filas_por_fragmento": 2000,
+    "workers_fragmentos": 4            # fragmentos de un mismo agente renderizados en paralelo
+}
+
+
+def opciones_render(config: dict) -> dict:
+    opciones = dict(OPCIONES_RENDER)
+    opciones.update(config.get("render", {}))
+    return opciones
+
+
+def argumentos_wkhtmltopdf(opciones: dict) -> list:
+    """
+    Convierte el dict de opciones (formato pdfkit) en argumentos de línea de comandos.
+    """
+    argumentos = []
+    for clave, valor in opciones.items():
+        argumentos.append(f"--{clave}")
+        if valor not in (None, ""):
+            argumentos.append(str(valor))
+    return argumentos
+
+
+def unir_pdfs(partes: list) -> bytes:
+    """
+    Une varios PDF (bytes) en uno solo, en el orden dado. Requiere pypdf.
+    """
+    escritor = PdfWriter()
+    for parte in partes:
+        escritor.append(BytesIO(parte))
+    salida = BytesIO()
+    escritor.write(salida)
+    return salida.getvalue()
+
+
+class ErrorRender(RuntimeError):
+    pass
+
+
+# Resultado de una línea de stderr de wkhtmltopdf en modo --read-args-from-stdin
+FIN = "fin"            # "Done": la conversión terminó bien
+FALLO = "fallo"        # "Exit with code N due to ...": la conversión terminó con error
+MENSAJE = "mensaje"    # "Error: ...", "Warning: ...", etapas ("Loading pages (1/6)"): se guarda como contexto
+IGNORAR = "ignorar"    # línea vacía o barra de progreso ("[=====>   ] 42%")
+
+
+def clasificar_linea_stderr(linea: str) -> str:
+    """
+    Clasifica una línea de stderr de wkhtmltopdf. Cada conversión termina con una sola línea
+    "Done" o "Exit with code ..."; los "Error: ..." previos no la terminan (le siguen el
+    "Exit with code" de la misma conversión), así que solo se acumulan como mensajes.
+    """
+    linea = linea.strip()
+    if linea == "Done":
+        return FIN
+    if linea.startswith("Exit with code"):
+        return FALLO
+    if not linea or linea.startswith("["):
+        return IGNORAR
+    return MENSAJE
+
+
+class WorkerWkhtmltopdf:
+    """
+    Proceso wkhtmltopdf de larga vida en modo --read-args-from-stdin.
+    Cada línea enviada por stdin es una conversión "entrada.html salida.pdf"; el motor
+    (Qt/WebKit) se carga una sola vez por proceso.
+    """
+
+    def __init__(self, ejecutable: str, opciones: dict, timeout: float):
+        self.timeout = timeout
+        self.trabajos = 0
+        self.directorio = tempfile.mkdtemp(prefix="render_worker_")
+        self.proceso = subprocess.Popen(
+            [ejecutable, *argumentos_wkhtmltopdf(opciones), "--read-args-from-stdin"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+            errors="replace"
+        )
+        # stderr se lee en un hilo aparte para poder esperar con timeout
+        self._salida = queue.Queue()
+        threading.Thread(target=self._leer_stderr, daemon=True).start()
+        logging.info(f"[WorkerWkhtmltopdf] - Iniciado (pid {self.proceso.pid})")
+
+    def _leer_stderr(self):
+        for linea in self.proceso.stderr:
+            self._salida.put(linea.strip())
+        self._salida.put(None)  # fin del proceso
+
+    def _esperar_conversion(self):
+        """
+        Consume stderr hasta el fin de una conversión (ver clasificar_linea_stderr).
+        Timeout o fin del proceso a mitad de la conversión también son ErrorRender.
+        """
+        mensajes = []
+        while True:
+            try:
+                linea = self._salida.get(timeout=self.timeout)
+            except queue.Empty:
+                raise ErrorRender(f"Timeout de {self.timeout}s esperando a wkhtmltopdf: {' | '.join(mensajes[-5:])}")
+            if linea is None:
+                raise ErrorRender(f"wkhtmltopdf terminó inesperadamente: {' | '.join(mensajes[-5:])}")
+            estado = clasificar_linea_stderr(linea)
+            if estado == FIN:
+                return
+            if estado == FALLO:
+                raise ErrorRender(" | ".join([*mensajes[-5:], linea]))
+            if estado == MENSAJE:
+                mensajes.append(linea)
+
+    def renderizar_lote(self, htmls: list) -> list:
+        """
+        Convierte varios HTML en una sola invocación del worker y devuelve los PDF en bytes.
+        """
+        rutas = []
+        for i, html in enumerate(htmls):
+            entrada = Path(self.directorio, f"{self.trabajos + i}.html")
+            salida = Path(self.directorio, f"{self.trabajos + i}.pdf")
+            entrada.write_text(html, encoding="utf-8")
+            rutas.append((entrada, salida))
+
+        try:
+            lineas = "".join(f'"{e.as_posix()}" "{s.as_posix()}"\n' for e, s in rutas)
+            try:
+                self.proceso.stdin.write(lineas)
+                self.proceso.stdin.flush()
+            except OSError as e:
+                # BrokenPipeError: el proceso ya no existe
+                raise ErrorRender(f"wkhtmltopdf terminó inesperadamente: {e}") from e
+
+            pdfs = []
+            for _, salida in rutas:
+                self._esperar_conversion()
+                pdfs.append(salida.read_bytes())
+            return pdfs
+        finally:
+            self.trabajos += len(htmls)
+            for entrada, salida in rutas:
+                for ruta in (entrada, salida):
+                    try:
+                        ruta.unlink()
+                    except FileNotFoundError:
+                        pass
+
+    def cerrar(self, forzar: bool = False):
+        """
+        Cierra stdin y espera a que wkhtmltopdf termine. Con forzar (worker colgado o que falló)
+        o si no termina en 10s, lo mata; siempre se espera al proceso para no dejar zombies.
+        """
+        if not forzar:
+            try:
+                self.proceso.stdin.close()
+                self.proceso.wait(timeout=10)
+            except Exception:
+                forzar = True
+        if forzar:
+            self.proceso.kill()
+            self.proceso.wait()
+        shutil.rmtree(self.directorio, ignore_errors=True)
+        logging.info(f"[WorkerWkhtmltopdf] - Cerrado (pid {self.proceso.pid}, {self.trabajos} PDFs)")
+
+
+class PoolRender:
+    """
+    Pool de workers wkhtmltopdf persistentes compartido entre hilos.
+    Un worker que falla se descarta y otro nuevo ocupa su lugar; también se recicla
+    tras max_trabajos_por_worker conversiones para acotar la memoria de WebKit.
+    """
+
+    def __init__(self, ejecutable: str, opciones: dict, workers: int, max_trabajos_por_worker: int, timeout: float):
+        self.ejecutable = ejecutable
+        self.opciones = opciones
+        self.max_trabajos = max_trabajos_por_worker
+        self.timeout = timeout
+        self._libres = queue.Queue()
+        self._cupos = threading.BoundedSemaphore(workers)
+
+    def _tomar(self) -> WorkerWkhtmltopdf:
+        self._cupos.acquire()
+        try:
+            return self._libres.get_nowait()
+        except queue.Empty:
+            try:
+                return WorkerWkhtmltopdf(self.ejecutable, self.opciones, self.timeout)
+            except Exception:
+                self._cupos.release()
+                raise
+
+    def _devolver(self, worker: WorkerWkhtmltopdf, valido: bool):
+        if valido and worker.trabajos < self.max_trabajos:
+            self._libres.put(worker)
+        else:
+            worker.cerrar(forzar=not valido)
+        self._cupos.release()
+
+    def renderizar_lote(self, htmls: list) -> list:
+        worker = self._tomar()
+        valido = False
+        try:
+            pdfs = worker.renderizar_lote(htmls)
+            valido = True
+            return pdfs
+        finally:
+            self._devolver(worker, valido)
+
+    def renderizar(self, html: str) -> bytes:
+        return self.renderizar_lote([html])[0]
+
+    def cerrar(self):
+        while True:
+            try:
+                self._libres.get_nowait().cerrar()
+            except queue.Empty:
+                break
+
+
+_pool = None
+_lock_pool = threading.Lock()
+
+
+def obtener_pool(config: dict) -> PoolRender:
+    """
+    Pool compartido por todos los generadores del proceso (se crea una sola vez).
+    """
+    global _pool
+    with _lock_pool:
+        if _pool is None:
+            opciones = opciones_render(config)
+            _pool = PoolRender(
+                opciones["wkhtmltopdf"], OPCIONES_PDF, opciones["workers"],
+                opciones["max_trabajos_por_worker"], opciones["timeout_segundos"]
+            )
+            logging.info(f"[render_pool] - Pool persistente de {opciones['workers']} workers wkhtmltopdf")
+        return _pool
+
+
+def cerrar_pool():
+    global _pool
+    with _lock_pool:
+        if _pool is not None:
+            _pool.cerrar()
+            _pool = None
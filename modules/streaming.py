@@ -0,0 +1,230 @@
+import logging
+import threading
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from concurrent.futures import ThreadPoolExecutor
+from modules.data_processor import (
+    construir_path_parquet, crear_filesystem_input, normalizar_tablas, armar_resultado, construir_indice_store
+)
+from modules.parquet_loader import cargar_parquets, COLUMNAS_DATASET
+from modules.ejecucion import (
+    ESTADOS, generar_estados_agente, subidas_fallidas, reclasificar_fallidas, registrar_conteo
+)
+from modules.concurrencia import crear_controlador
+
+DATASETS_DETALLE = ["contraprestacion", "bonos", "descuentos", "reembolso", "adquirencia"]
+
+
+class CursorStore:
+    """
+    Recorre un Parquet ordenado por store_id lote a lote (row groups) y entrega
+    las filas de un store_id por vez. En memoria solo queda el lote en curso.
+    """
+
+    def __init__(self, nombre: str, archivo, batch_size: int = 65536):
+        self.nombre = nombre
+        self.parquet = pq.ParquetFile(archivo)
+        esquema = self.parquet.schema_arrow
+        self.tipo_store_id = esquema.field("store_id").type
+        self.columnas = [c for c in COLUMNAS_DATASET[nombre] if c in esquema.names]
+        self._lotes = self.parquet.iter_batches(batch_size=batch_size, columns=self.columnas)
+        self._pendiente = None
+        self._ultimo_pedido = None
+        self._ultimo_leido = None
+        self._verificar_row_groups()
+
+    def _verificar_row_groups(self):
+        """
+        Verifica el orden entre row groups con sus estadísticas (min/max de store_id) al abrir el
+        archivo, antes de generar ningún PDF. Un desorden dentro de un mismo row group (o en row
+        groups sin estadísticas) recién se detecta al leerlo en _siguiente_lote: en ese caso los
+        PDF de los agentes anteriores ya quedaron generados.
+        """
+        metadatos = self.parquet.metadata
+        columna = next(
+            (j for j in range(metadatos.num_columns) if metadatos.schema.column(j).path == "store_id"), None
+        )
+        maximo_anterior = None
+        for i in range(metadatos.num_row_groups):
+            estadisticas = metadatos.row_group(i).column(columna).statistics
+            if estadisticas is None or not estadisticas.has_min_max:
+                maximo_anterior = None
+                continue
+            if maximo_anterior is not None and estadisticas.min < maximo_anterior:
+                raise ValueError(
+                    f"[CursorStore] - {self.nombre}: el Parquet no está ordenado por store_id "
+                    f"(row group {i} empieza en {estadisticas.min}, el anterior termina en {maximo_anterior})."
+                )
+            maximo_anterior = estadisticas.max
+
+    def _siguiente_lote(self):
+        lote = next(self._lotes, None)
+        if lote is None:
+            return None
+
+        ids = lote.column("store_id").to_numpy(zero_copy_only=False)
+        if len(ids) and ((self._ultimo_leido is not None and ids[0] < self._ultimo_leido) or np.any(ids[1:] < ids[:-1])):
+            raise ValueError(f"[CursorStore] - {self.nombre}: el Parquet no está ordenado por store_id.")
+        if len(ids):
+            self._ultimo_leido = ids[-1]
+        return pa.Table.from_batches([lote]), ids
+
+    def filas(self, store_id) -> pa.Table:
+        """
+        Avanza hasta store_id y devuelve sus filas. Debe llamarse con store_id crecientes;
+        las filas de store_id intermedios que no se pidan se descartan.
+        """
+        if self._ultimo_pedido is not None and store_id < self._ultimo_pedido:
+            raise ValueError(f"[CursorStore] - {self.nombre}: store_id pedidos fuera de orden ({store_id}).")
+        self._ultimo_pedido = store_id
+
+        partes = []
+        while True:
+            if self._pendiente is None:
+                self._pendiente = self._siguiente_lote()
+                if self._pendiente is None:
+                    break
+
+            tabla, ids = self._pendiente
+            izquierda = np.searchsorted(ids, store_id, side="left")
+            derecha = np.searchsorted(ids, store_id, side="right")
+            if derecha > izquierda:
+                partes.append(tabla.slice(izquierda, derecha - izquierda))
+
+            if derecha < len(ids):
+                self._pendiente = (tabla.slice(derecha), ids[derecha:])
+                break
+            self._pendiente = None  # el agente puede continuar en el siguiente lote
+
+        if not partes:
+            return self.parquet.schema_arrow.empty_table().select(self.columnas)
+        return pa.concat_tables(partes)
+
+
+def cargar_agentes(config: dict, fs=None):
+    """
+    Carga solo la tabla de agentes (liviana); el detalle se recorre luego en streaming.
+    """
+    fs = fs or crear_filesystem_input(config)
+    dfs, _ = cargar_parquets(fs, {"agentes": construir_path_parquet("agentes", config)}, config)
+    return dfs["agentes"]
+
+
+def _orden_recorrido(ids_por_tipo: dict, cursores: dict) -> list:
+    """
+    Posiciones de los agentes en el orden de los Parquet de detalle: cada cursor solo avanza,
+    así que los store_id se piden ordenados por su valor ya convertido al tipo del detalle
+    (con agentes int y detalle string, "10" va antes que "2"). Todos los detalles deben
+    ordenar igual: texto o numérico.
+    """
+    textos = {
+        pa.types.is_string(cursor.tipo_store_id) or pa.types.is_large_string(cursor.tipo_store_id)
+        for cursor in cursores.values()
+    }
+    if len(textos) > 1:
+        raise ValueError(
+            "[streaming] - store_id de los Parquet de detalle mezcla tipos texto y numéricos: "
+            + ", ".join(f"{tipo} {cursores[tipo].tipo_store_id}" for tipo in cursores)
+        )
+    referencia = ids_por_tipo[next(iter(cursores))]
+    return sorted(range(len(referencia)), key=referencia.__getitem__)
+
+
+def iterar_agentes(config: dict, df_agentes, fs=None, batch_size: int = 65536):
+    """
+    Recorre los Parquet de detalle (ordenados por store_id) en paralelo con la tabla de
+    agentes y genera, por cada agente, un diccionario con la misma forma que procesar_datos
+    pero con solo sus filas. La memoria queda acotada por el agente más grande.
+
+    df_agentes debe venir con store_id en su tipo original (sin normalizar a str).
+    """
+    fs = fs or crear_filesystem_input(config)
+    archivos = {tipo: fs.open(construir_path_parquet(tipo, config), "rb") for tipo in DATASETS_DETALLE}
+
+    try:
+        cursores = {tipo: CursorStore(tipo, archivo, batch_size) for tipo, archivo in archivos.items()}
+
+        # Agentes agrupados por store_id en su tipo original, con offsets por agente
+        df_agentes, indice = construir_indice_store(df_agentes)
+        ids_agentes = list(indice)
+        # store_id de cada agente convertido al tipo de cada Parquet de detalle
+        ids_por_tipo = {
+            tipo: pa.array(ids_agentes).cast(cursor.tipo_store_id).to_pylist()
+            for tipo, cursor in cursores.items()
+        }
+
+        for posicion in _orden_recorrido(ids_por_tipo, cursores):
+            store_id = ids_agentes[posicion]
+            inicio, fin = indice[store_id]
+            agente = df_agentes.iloc[inicio:fin]
+
+            tablas = {
+                tipo: cursor.filas(ids_por_tipo[tipo][posicion]).to_pandas()
+                for tipo, cursor in cursores.items()
+            }
+            tablas["agentes"] = agente.copy()
+
+            yield armar_resultado(normalizar_tablas(tablas))
+    finally:
+        for archivo in archivos.values():
+            archivo.close()
+
+
+def generar_en_streaming(config: dict, df_agentes, generadores: dict, generados: dict, fs=None):
+    """
+    Genera los PDF agente por agente a medida que se leen sus datos.
+
+    Args:
+        generadores (dict): tipo -> (generador, clave de detalle), solo los tipos habilitados.
+        generados (dict): tipo -> set de store_id ya generados (se omiten).
+    """
+    opciones = config.get("ejecucion", {})
+    max_workers = opciones.get("max_workers", 10)
+    # Cota de agentes en vuelo: limita la memoria a unos pocos bundles a la vez
+    en_vuelo = threading.BoundedSemaphore(opciones.get("streaming_max_en_vuelo", max_workers * 2))
+
+    por_tipo = {tipo: generador for tipo, (generador, _) in generadores.items()}
+    controlador = crear_controlador(config, "streaming", max_workers)
+    generar = controlador.envolver(generar_estados_agente) if controlador else generar_estados_agente
+
+    # Mismo resumen que generar_pdfs: tipo -> {estado: cantidad} y tipo -> store_id pendientes
+    conteo = {tipo: dict.fromkeys(ESTADOS, 0) for tipo in generadores}
+    pendientes = {tipo: [] for tipo in generadores}
+    lock_conteo = threading.Lock()
+
+    def procesar(datos):
+        store_id, tipos, estados = None, list(generadores), {}
+        try:
+            row = datos["agentes"].to_dict(orient="records")[0]
+            store_id = row["store_id"]
+            tipos = [tipo for tipo in generadores if store_id not in generados.get(tipo, set())]
+            # Tipos sin filas del agente en el mes: sin_datos, igual que generar_agente
+            estados = {tipo: "sin_datos" for tipo in tipos if datos[generadores[tipo][1]].empty}
+            con_datos = [tipo for tipo in tipos if tipo not in estados]
+            if con_datos:
+                estados.update(generar(por_tipo, con_datos, store_id, row, datos, config))
+        except Exception as e:
+            logging.error(f"[streaming] - Error generando PDFs de {store_id}: {e}", exc_info=True)
+            estados.update({tipo: "error" for tipo in tipos if tipo not in estados})
+        finally:
+            with lock_conteo:
+                for tipo, estado in estados.items():
+                    conteo[tipo][estado] += 1
+                    pendientes[tipo].append(store_id)
+            en_vuelo.release()
+
+    total = 0
+    with ThreadPoolExecutor(max_workers=controlador.maximo if controlador else max_workers) as executor:
+        for datos in iterar_agentes(config, df_agentes, fs):
+            en_vuelo.acquire()
+            executor.submit(procesar, datos)
+            total += 1
+
+    if controlador is not None:
+        controlador.resumen()
+    reclasificar_fallidas(conteo, subidas_fallidas(por_tipo))
+    registrar_conteo(conteo, pendientes)
+    for generador, _ in generadores.values():
+        generador.guardar_manifiestos()
+    logging.info(f"[streaming] - {total} agentes procesados en modo streaming.")
@@ -0,0 +1,226 @@
+import os
+import errno
+import random
+import asyncio
+import logging
+import threading
+from concurrent.futures import wait
+from botocore.exceptions import ClientError, HTTPClientError, ConnectionError as BotoConnectionError
+from modules.clientes_s3 import credenciales, opciones_cliente
+from modules.almacenamiento import salida_local
+
+try:
+    from aiobotocore.session import get_session
+    from aiobotocore.config import AioConfig
+except ImportError:  # opcional: sin aiobotocore las transferencias usan el cliente boto3 en los hilos de trabajo
+    get_session = None
+    AioConfig = None
+
+# Valores por defecto de config["s3"]["transferencias"]
+OPCIONES_TRANSFERENCIAS = {
+    "habilitado": False,
+    "max_en_vuelo": 256,          # peticiones S3 simultáneas (semáforo del event loop y pool de conexiones)
+    "max_pendientes": 512,        # subidas/descargas encoladas antes de frenar a quien las pide (memoria)
+    "reintentos": 5,
+    "espera_base_segundos": 0.2,  # backoff exponencial con jitter: base * 2^intento
+    "endpoint_url": None          # p.ej. http://127.0.0.1:5000 para un moto server local
+}
+
+# Códigos de S3 que se reintentan (además de errores HTTP 5xx y de conexión)
+CODIGOS_TRANSITORIOS = {
+    "SlowDown", "Throttling", "ThrottlingException", "RequestTimeout", "RequestTimeTooSkewed",
+    "InternalError", "ServiceUnavailable"
+}
+# errno de red sin subclase propia de OSError (ConnectionResetError y similares ya son ConnectionError)
+ERRNOS_RED = {
+    getattr(errno, nombre) for nombre in ("ENETDOWN", "ENETUNREACH", "ENETRESET", "EHOSTDOWN", "EHOSTUNREACH")
+    if hasattr(errno, nombre)
+}
+
+_transferencias = {}
+_lock = threading.Lock()
+
+
+def _reiniciar_tras_fork():
+    """
+    El hilo del event loop no existe en el proceso hijo: cada proceso crea el suyo.
+    """
+    global _lock
+    _transferencias.clear()
+    _lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reiniciar_tras_fork)
+
+
+def opciones_transferencias(config: dict = None) -> dict:
+    opciones = dict(OPCIONES_TRANSFERENCIAS)
+    opciones.update((config or {}).get("s3", {}).get("transferencias", {}))
+    return opciones
+
+
+def _es_transitorio(error: Exception) -> bool:
+    if isinstance(error, ClientError):
+        codigo = error.response.get("Error", {}).get("Code")
+        estado = error.response.get("ResponseMetadata", {}).get("HTTPStatusCode") or 0
+        return codigo in CODIGOS_TRANSITORIOS or estado >= 500
+    if isinstance(error, (HTTPClientError, BotoConnectionError, asyncio.TimeoutError, ConnectionError, TimeoutError)):
+        return True
+    # Otros OSError (FileNotFoundError, PermissionError, ...) son locales y permanentes: no se reintentan
+    return isinstance(error, OSError) and error.errno in ERRNOS_RED
+
+
+class TransferenciasS3:
+    """
+    Subidas y descargas S3 con aiobotocore en un event loop propio (hilo en segundo plano).
+    Los hilos de trabajo encolan operaciones y reciben concurrent.futures.Future: un solo
+    proceso mantiene cientos de peticiones en vuelo sin un hilo bloqueado por cada una.
+    """
+
+    def __init__(self, cuenta: str, opciones: dict, config: dict = None):
+        self.cuenta = cuenta
+        self.opciones = opciones
+        self._config = config
+        # Cota de trabajo encolado: quien encola espera si ya hay max_pendientes sin terminar
+        self._pendientes = threading.BoundedSemaphore(opciones["max_pendientes"])
+        self._futuros = set()
+        self._lock_futuros = threading.Lock()
+        self._loop = asyncio.new_event_loop()
+        self._hilo = threading.Thread(target=self._loop.run_forever, name=f"transferencias-s3-{cuenta}", daemon=True)
+        self._hilo.start()
+        self._cliente, self._contexto_cliente, self._semaforo = asyncio.run_coroutine_threadsafe(
+            self._iniciar(), self._loop
+        ).result()
+        logging.info(
+            f"[TransferenciasS3] - Cuenta {cuenta}: hasta {opciones['max_en_vuelo']} peticiones en vuelo, "
+            f"{opciones['reintentos']} reintentos"
+        )
+
+    async def _iniciar(self):
+        cuenta_aws = credenciales(self.cuenta)
+        cliente_opciones = opciones_cliente(self._config)
+        contexto = get_session().create_client(
+            "s3",
+            aws_access_key_id=cuenta_aws["aws_access_key_id"],
+            aws_secret_access_key=cuenta_aws["aws_secret_access_key"],
+            aws_session_token=cuenta_aws["aws_session_token"],
+            endpoint_url=self.opciones["endpoint_url"],
+            config=AioConfig(
+                max_pool_connections=self.opciones["max_en_vuelo"],
+                connect_timeout=cliente_opciones["connect_timeout"],
+                read_timeout=cliente_opciones["read_timeout"],
+                # Los reintentos los hace _con_reintentos (con backoff propio)
+                retries={"mode": "standard", "total_max_attempts": 1}
+            )
+        )
+        cliente = await contexto.__aenter__()
+        return cliente, contexto, asyncio.BoundedSemaphore(self.opciones["max_en_vuelo"])
+
+    async def _con_reintentos(self, operacion, descripcion: str):
+        for intento in range(self.opciones["reintentos"] + 1):
+            try:
+                async with self._semaforo:
+                    return await operacion()
+            except Exception as e:
+                if intento == self.opciones["reintentos"] or not _es_transitorio(e):
+                    raise
+                espera = self.opciones["espera_base_segundos"] * (2 ** intento) * (0.5 + random.random())
+                logging.warning(f"[TransferenciasS3] - {descripcion}: {e}. Reintento {intento + 1} en {espera:.1f}s")
+                await asyncio.sleep(espera)
+
+    async def _subir(self, bucket: str, key: str, cuerpo: bytes, extra: dict):
+        await self._con_reintentos(
+            lambda: self._cliente.put_object(Bucket=bucket, Key=key, Body=cuerpo, **extra), f"put s3://{bucket}/{key}"
+        )
+
+    async def _descargar(self, bucket: str, key: str):
+        async def operacion():
+            try:
+                respuesta = await self._cliente.get_object(Bucket=bucket, Key=key)
+            except ClientError as e:
+                if e.response.get("Error", {}).get("Code") == "NoSuchKey":
+                    logging.warning(f"[S3] No encontrado: {key}")
+                    return None
+                raise
+            async with respuesta["Body"] as cuerpo:
+                return await cuerpo.read()
+        return await self._con_reintentos(operacion, f"get s3://{bucket}/{key}")
+
+    def _programar(self, corrutina):
+        self._pendientes.acquire()
+        futuro = asyncio.run_coroutine_threadsafe(corrutina, self._loop)
+        with self._lock_futuros:
+            self._futuros.add(futuro)
+        futuro.add_done_callback(self._terminado)
+        return futuro
+
+    def _terminado(self, futuro):
+        with self._lock_futuros:
+            self._futuros.discard(futuro)
+        self._pendientes.release()
+
+    def subir(self, bucket: str, key: str, cuerpo: bytes, **extra):
+        """
+        Encola un put_object (extra: ContentType, Metadata, ...). Devuelve un Future que
+        termina cuando el objeto quedó en S3 o falló tras los reintentos.
+        """
+        return self._programar(self._subir(bucket, key, cuerpo, extra))
+
+    def descargar(self, bucket: str, key: str):
+        """
+        Encola un get_object. El Future devuelve los bytes, o None si el objeto no existe.
+        """
+        return self._programar(self._descargar(bucket, key))
+
+    def descargar_varios(self, objetos: dict) -> dict:
+        """
+        Igual que utils_s3.obtener_pdfs_s3: nombre -> (bucket, key) a nombre -> bytes o None.
+        """
+        futuros = {nombre: self.descargar(*destino) for nombre, destino in objetos.items()}
+        return {nombre: futuro.result() for nombre, futuro in futuros.items()}
+
+    def esperar(self):
+        """
+        Espera a que terminen todas las transferencias encoladas hasta ahora.
+        """
+        with self._lock_futuros:
+            futuros = list(self._futuros)
+        wait(futuros)
+
+    def cerrar(self):
+        self.esperar()
+        asyncio.run_coroutine_threadsafe(self._contexto_cliente.__aexit__(None, None, None), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._hilo.join()
+        self._loop.close()
+
+
+def obtener_transferencias(config: dict = None, cuenta: str = "output"):
+    """
+    Motor de transferencias compartido por el proceso para la cuenta, o None si
+    s3.transferencias.habilitado es false, la salida es local (file://) o aiobotocore no está instalado.
+    """
+    opciones = opciones_transferencias(config)
+    if not opciones["habilitado"]:
+        return None
+    if cuenta == "output" and salida_local(config):
+        return None
+    if get_session is None:
+        logging.warning("[TransferenciasS3] - aiobotocore no está instalado; se usa el cliente boto3.")
+        return None
+    with _lock:
+        if cuenta not in _transferencias:
+            _transferencias[cuenta] = TransferenciasS3(cuenta, opciones, config)
+        return _transferencias[cuenta]
+
+
+def cerrar_transferencias():
+    """
+    Espera las transferencias pendientes y cierra los event loops (llamar al terminar).
+    """
+    with _lock:
+        transferencias = list(_transferencias.values())
+        _transferencias.clear()
+    for motor in transferencias:
+        motor.cerrar()
@@ -1,39 +1,45 @@
-import os
 import logging
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
 
-def download_pdf_from_s3_if_exists(s3_client, bucket: str, key: str, subfolder: str = "") -> str:
+
+def separar_uri_s3(uri: str) -> tuple:
     """
-    Descarga un archivo PDF desde S3 si existe y lo guarda en una subcarpeta temporal específica.
-    
-    Args:
-        s3_client: Cliente de boto3 para S3.
-        bucket (str): Nombre del bucket S3.
-        key (str): Clave completa del objeto PDF en S3.
-        subfolder (str): Subcarpeta dentro de 'temp_emails' donde guardar el archivo temporal.
+    "s3://bucket/ruta/archivo.pdf" -> ("bucket", "ruta/archivo.pdf")
+    """
+    parsed = urlparse(uri)
+    return parsed.netloc, parsed.path.lstrip("/")
+
+
+def obtener_pdf_s3(s3_client, bucket: str, key: str):
+    """
+    Lee un objeto de S3 en una sola petición (get_object).
 
     Returns:
-        str: Ruta local al archivo descargado si existe, o None si no se encontró.
+        bytes: contenido del objeto, o None si no existe (NoSuchKey).
     """
     try:
-        s3_client.head_object(Bucket=bucket, Key=key)  # Verifica existencia
+        respuesta = s3_client.get_object(Bucket=bucket, Key=key)
+    except s3_client.exceptions.NoSuchKey:
+        logging.warning(f"[S3] No encontrado: {key}")
+        return None
+    with respuesta["Body"] as cuerpo:
+        return cuerpo.read()
 
-        # Crear carpeta temporal específica por tipo
-        temp_dir = os.path.join("temp_emails", subfolder)
-        os.makedirs(temp_dir, exist_ok=True)
 
-        filename = os.path.basename(key)
-        ruta_local = os.path.join(temp_dir, filename)
-
-        s3_client.download_file(bucket, key, ruta_local)
-        logging.info(f"PDF descargado de S3: {ruta_local}")
-        return ruta_local
-
-    except s3_client.exceptions.ClientError as e:
-        if e.response['Error']['Code'] == "404":
-            logging.warning(f"[S3] No encontrado: {key}")
-            return None
-        else:
-            raise
+def obtener_pdfs_s3(s3_client, objetos: dict, max_workers: int = 4) -> dict:
+    """
+    Lee varios objetos en paralelo, una petición por objeto.
 
+    Args:
+        objetos (dict): nombre -> (bucket, key)
 
+    Returns:
+        dict: nombre -> bytes o None si no existe, en el mismo orden que objetos.
+    """
+    if len(objetos) <= 1:
+        return {nombre: obtener_pdf_s3(s3_client, *destino) for nombre, destino in objetos.items()}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(objetos))) as executor:
+        futuros = {nombre: executor.submit(obtener_pdf_s3, s3_client, *destino) for nombre, destino in objetos.items()}
+        return {nombre: futuro.result() for nombre, futuro in futuros.items()}
 
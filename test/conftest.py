@@ -0,0 +1,55 @@
+import os
+import sys
+import base64
+import pytest
+
+# Los tests importan modules.* desde la raíz del repositorio
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from benchmarks.datos_sinteticos import generar_tablas  # noqa: E402
+from modules.data_processor import armar_resultado, normalizar_tablas  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def tablas_sinteticas():
+    """
+    Mes sintético chico (tal como viene de los Parquet), con textos no ASCII en los agentes.
+    Cada test debe copiar las tablas antes de modificarlas.
+    """
+    tablas = generar_tablas(agentes=12, ops_por_agente=20, sesgo=1.0)
+    tablas["agentes"].loc[0, ["merchant", "store_owner", "address"]] = ["BODEGA ÑANDÚ", "José Peña", "Jr. Ayacucho 123"]
+    return tablas
+
+
+@pytest.fixture
+def datos_sinteticos(tablas_sinteticas):
+    """
+    Resultado de procesar_datos sobre el mes sintético.
+    """
+    return armar_resultado(normalizar_tablas({tipo: df.copy() for tipo, df in tablas_sinteticas.items()}))
+
+
+@pytest.fixture
+def config_generadores(tmp_path):
+    """
+    Config mínima para crear los generadores: templates del repositorio y salida local (file://).
+    """
+    with open(os.path.join(RAIZ, "logo_kasnet.png"), "rb") as logo:
+        logo_base64 = base64.b64encode(logo.read()).decode("utf-8")
+    salida = tmp_path.as_posix().lstrip("/")
+    return {
+        "periodo": {"mes": 7, "anio": 2025},
+        "logo_base64": logo_base64,
+        "textos_fijos": {
+            "informacion_adicional": "Información para el agente.",
+            "nota_importante": "Nota con tilde: comisión.",
+            "campanas_activas": "Campaña del año."
+        },
+        "rutas": {
+            "template_contraprestaciones": os.path.join(RAIZ, "templates", "template_contraprestaciones.html"),
+            "template_reembolso": os.path.join(RAIZ, "templates", "template_reembolso.html"),
+            "template_adquirencia": os.path.join(RAIZ, "templates", "template_adquirencia.html"),
+            "salida_s3": {tipo: f"file:///{salida}/{tipo}/" for tipo in ("contraprestacion", "reembolso", "adquirencia")}
+        }
+    }
@@ -0,0 +1,77 @@
+import pytest
+from modules import almacenamiento
+from modules.almacenamiento import ClienteLocal, esquema, salida_local
+
+
+@pytest.fixture
+def cliente():
+    return ClienteLocal()
+
+
+def keys(cliente, bucket, **argumentos):
+    paginas = list(cliente.get_paginator("list_objects_v2").paginate(Bucket=bucket, **argumentos))
+    return [[obj["Key"] for obj in pagina["Contents"]] for pagina in paginas]
+
+
+def test_put_get_head(cliente, tmp_path):
+    bucket = str(tmp_path)
+    cliente.put_object(Bucket=bucket, Key="contraprestacion/202507/123.pdf", Body=b"%PDF-1.4", ContentType="application/pdf")
+
+    assert cliente.get_object(Bucket=bucket, Key="contraprestacion/202507/123.pdf")["Body"].read() == b"%PDF-1.4"
+    cabecera = cliente.head_object(Bucket=bucket, Key="contraprestacion/202507/123.pdf")
+    assert cabecera["ContentLength"] == 8
+    assert cabecera["ETag"].startswith('"') and cabecera["LastModified"].tzinfo is not None
+    assert not list(tmp_path.rglob("*.tmp"))
+
+
+def test_objeto_inexistente(cliente, tmp_path):
+    with pytest.raises(ClienteLocal.exceptions.NoSuchKey):
+        cliente.get_object(Bucket=str(tmp_path), Key="no/existe.pdf")
+    with pytest.raises(cliente.exceptions.NoSuchKey):
+        cliente.head_object(Bucket=str(tmp_path), Key="no/existe.pdf")
+
+
+def test_upload_file(cliente, tmp_path):
+    origen = tmp_path / "origen.pdf"
+    origen.write_bytes(b"%PDF grande")
+    cliente.upload_file(str(origen), str(tmp_path), "salida/1.pdf", ExtraArgs={"ContentType": "application/pdf"})
+    assert (tmp_path / "salida" / "1.pdf").read_bytes() == b"%PDF grande"
+
+
+def test_listado_por_prefijo_ordenado(cliente, tmp_path):
+    bucket = str(tmp_path)
+    for key in ["p/202507/20.pdf", "p/202507/10.pdf", "p/202507/3.pdf", "p/202508/1.pdf", "otro/1.pdf"]:
+        cliente.put_object(Bucket=bucket, Key=key, Body=b"x")
+    (tmp_path / "p" / "202507" / "a_medio_escribir.tmp").write_bytes(b"")
+
+    assert keys(cliente, bucket, Prefix="p/202507/") == [["p/202507/10.pdf", "p/202507/20.pdf", "p/202507/3.pdf"]]
+    assert keys(cliente, bucket, Prefix="p/202507/2") == [["p/202507/20.pdf"]]
+    assert keys(cliente, bucket, Prefix="p/202507/", StartAfter="p/202507/20.pdf") == [["p/202507/3.pdf"]]
+    assert keys(cliente, bucket, Prefix="p/202509/") == [[]]
+
+
+def test_listado_paginado(cliente, tmp_path, monkeypatch):
+    monkeypatch.setattr(almacenamiento, "OBJETOS_POR_PAGINA", 2)
+    bucket = str(tmp_path)
+    for i in range(5):
+        cliente.put_object(Bucket=bucket, Key=f"p/{i}.pdf", Body=b"x")
+    assert keys(cliente, bucket, Prefix="p/") == [["p/0.pdf", "p/1.pdf"], ["p/2.pdf", "p/3.pdf"], ["p/4.pdf"]]
+
+
+def test_operacion_no_soportada(cliente):
+    with pytest.raises(ValueError):
+        cliente.get_paginator("list_objects")
+
+
+def test_esquemas():
+    assert esquema("s3://bucket/ruta") == "s3"
+    assert esquema("file:///datos/ruta") == "file"
+    with pytest.raises(ValueError):
+        esquema("/datos/ruta")
+
+
+def test_salida_local():
+    assert salida_local({"rutas": {"salida_s3": {"a": "file:///x/", "b": "file:///y/"}}})
+    assert not salida_local({"rutas": {"salida_s3": {"a": "s3://bucket/x/"}}})
+    with pytest.raises(ValueError, match="mezcla"):
+        salida_local({"rutas": {"salida_s3": {"a": "file:///x/", "b": "s3://bucket/y/"}}})
@@ -0,0 +1,102 @@
+import os
+import pytest
+from modules.cache_parquet import MB, CacheParquetS3
+from modules.parquet_loader import OPCIONES_LECTURA, crear_cache, descargar_archivo
+
+
+class FilesystemEtag:
+    """
+    Filesystem mínimo con la interfaz de s3fs que usa descargar_archivo (info con ETag y cat_file).
+    """
+
+    def __init__(self, archivos: dict):
+        self.archivos = archivos  # path -> (etag, contenido)
+        self.descargas = 0
+
+    def info(self, path):
+        etag, contenido = self.archivos[path]
+        return {"size": len(contenido), "ETag": f'"{etag}"'}
+
+    def cat_file(self, path, start=None, end=None):
+        self.descargas += 1
+        return self.archivos[path][1][start:end]
+
+
+def cache_en(directorio, max_mb=1):
+    return CacheParquetS3(str(directorio), max_mb)
+
+
+def archivos_en(directorio):
+    return sorted(nombre for nombre in os.listdir(directorio) if nombre.endswith(".parquet"))
+
+
+def test_hit_con_el_mismo_etag(tmp_path):
+    fs = FilesystemEtag({"bucket/agentes.parquet": ("v1", b"contenido v1")})
+    cache = cache_en(tmp_path)
+
+    assert descargar_archivo(fs, "bucket/agentes.parquet", OPCIONES_LECTURA, cache) == (b"contenido v1", 12, 1, False)
+    assert descargar_archivo(fs, "bucket/agentes.parquet", OPCIONES_LECTURA, cache) == (b"contenido v1", 12, 0, True)
+    assert fs.descargas == 1
+
+
+def test_etag_distinto_vuelve_a_descargar(tmp_path):
+    fs = FilesystemEtag({"bucket/agentes.parquet": ("v1", b"contenido v1")})
+    cache = cache_en(tmp_path)
+    descargar_archivo(fs, "bucket/agentes.parquet", OPCIONES_LECTURA, cache)
+
+    fs.archivos["bucket/agentes.parquet"] = ("v2", b"contenido v2 nuevo")
+    contenido, _, peticiones, desde_cache = descargar_archivo(fs, "bucket/agentes.parquet", OPCIONES_LECTURA, cache)
+    assert (contenido, peticiones, desde_cache) == (b"contenido v2 nuevo", 1, False)
+    assert descargar_archivo(fs, "bucket/agentes.parquet", OPCIONES_LECTURA, cache)[3] is True
+    assert fs.descargas == 2
+
+
+def test_misma_version_de_otro_path_no_colisiona(tmp_path):
+    fs = FilesystemEtag({"bucket/a.parquet": ("v1", b"a"), "bucket/b.parquet": ("v1", b"b")})
+    cache = cache_en(tmp_path)
+    descargar_archivo(fs, "bucket/a.parquet", OPCIONES_LECTURA, cache)
+    assert descargar_archivo(fs, "bucket/b.parquet", OPCIONES_LECTURA, cache)[:2] == (b"b", 1)
+
+
+def test_clave_sin_etag_usa_tamano_y_fecha():
+    clave = CacheParquetS3.clave("f.parquet", {"size": 10, "mtime": 1.0})
+    assert clave == CacheParquetS3.clave("f.parquet", {"size": 10, "mtime": 1.0})
+    assert clave != CacheParquetS3.clave("f.parquet", {"size": 10, "mtime": 2.0})
+
+
+def test_expulsion_lru_al_superar_el_limite(tmp_path):
+    cache = cache_en(tmp_path, max_mb=3500 / MB)
+    for i, path in enumerate(["viejo", "medio", "reciente"]):
+        ruta = cache.guardar(path, {"ETag": path}, b"x" * 1000)
+        os.utime(ruta, (1000 + i, 1000 + i))
+
+    # Leer "viejo" lo marca como usado recientemente: el expulsado pasa a ser "medio"
+    assert cache.buscar("viejo", {"ETag": "viejo"}) is not None
+    cache.guardar("nuevo", {"ETag": "nuevo"}, b"x" * 1000)
+
+    assert cache.buscar("medio", {"ETag": "medio"}) is None
+    for path in ["viejo", "reciente", "nuevo"]:
+        assert cache.buscar(path, {"ETag": path}) is not None
+    assert len(archivos_en(tmp_path)) == 3
+
+
+def test_archivo_mayor_que_el_limite_se_conserva(tmp_path):
+    cache = cache_en(tmp_path, max_mb=500 / MB)
+    cache.guardar("grande", {"ETag": "1"}, b"x" * 1000)
+    assert cache.buscar("grande", {"ETag": "1"}) == b"x" * 1000
+
+
+def test_reutilizada_entre_corridas(tmp_path):
+    config = {"s3": {"input": {"cache": {"habilitado": True, "directorio": str(tmp_path), "max_mb": 1}}}}
+    fs = FilesystemEtag({"bucket/agentes.parquet": ("v1", b"contenido")})
+    descargar_archivo(fs, "bucket/agentes.parquet", OPCIONES_LECTURA, crear_cache(config))
+
+    # Otra corrida: instancia nueva sobre el mismo directorio
+    assert descargar_archivo(fs, "bucket/agentes.parquet", OPCIONES_LECTURA, crear_cache(config))[3] is True
+    assert fs.descargas == 1
+    assert not [nombre for nombre in os.listdir(tmp_path) if nombre.endswith(".tmp")]
+
+
+def test_cache_deshabilitada():
+    assert crear_cache({}) is None
+    assert crear_cache({"s3": {"input": {"cache": {"habilitado": False}}}}) is None
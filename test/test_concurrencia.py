@@ -0,0 +1,122 @@
+import logging
+import threading
+import time
+import pytest
+from modules import concurrencia
+from modules.concurrencia import OPCIONES_CONCURRENCIA, ControladorConcurrencia, crear_controlador
+
+
+@pytest.fixture(autouse=True)
+def sin_presion(monkeypatch):
+    # Memoria del host fija: el resultado no depende de la máquina que corre los tests
+    monkeypatch.setattr(concurrencia, "memoria_libre_pct", lambda: 80.0)
+    monkeypatch.setattr(concurrencia, "rss_hijos_mb", lambda: 100.0)
+
+
+def controlador(inicial=4, **opciones):
+    valores = dict(OPCIONES_CONCURRENCIA, minimo=2, maximo=8, intervalo_segundos=0, min_muestras=1)
+    valores.update(opciones)
+    return ControladorConcurrencia("prueba", valores, inicial)
+
+
+def intervalo(c, p50: float):
+    """
+    Un intervalo de ajuste cuyas tareas tardaron p50 segundos.
+    """
+    c.adquirir()
+    c.liberar(p50)
+
+
+def test_limite_bloquea_tareas_en_vuelo():
+    c = controlador(inicial=2, min_muestras=1000)
+    c.adquirir()
+    c.adquirir()
+    entro = threading.Event()
+    hilo = threading.Thread(target=lambda: (c.adquirir(), entro.set()))
+    hilo.start()
+    assert not entro.wait(0.2)
+    c.liberar(0.01)
+    assert entro.wait(2)
+    hilo.join()
+    assert c.en_vuelo == 2
+
+
+def test_envolver_devuelve_el_resultado():
+    c = controlador()
+    assert c.envolver(lambda x: x * 2)(21) == 42
+    assert c.en_vuelo == 0
+
+
+def test_sube_con_latencia_estable_y_respeta_el_maximo():
+    c = controlador(inicial=6)
+    for _ in range(5):
+        intervalo(c, 0.1)
+    assert c.limite == 8
+    assert c.limite_alcanzado == 8
+
+
+def test_baja_cuando_la_latencia_supera_la_referencia():
+    c = controlador(inicial=6)
+    intervalo(c, 0.1)
+    intervalo(c, 0.3)
+    assert c.limite == 6  # 6 -> 7 -> 6
+
+
+def test_presion_de_memoria_reduce_multiplicativamente(monkeypatch):
+    monkeypatch.setattr(concurrencia, "memoria_libre_pct", lambda: 5.0)
+    c = controlador(inicial=8)
+    intervalo(c, 0.1)
+    assert c.limite == 5  # int(8 * 0.7)
+    intervalo(c, 0.1)
+    intervalo(c, 0.1)
+    assert c.limite == 2  # nunca por debajo del mínimo
+
+
+def test_rss_de_hijos_sobre_el_tope(monkeypatch):
+    monkeypatch.setattr(concurrencia, "rss_hijos_mb", lambda: 3000.0)
+    c = controlador(inicial=8, max_rss_hijos_mb=2048)
+    intervalo(c, 0.1)
+    assert c.limite == 5
+
+
+def test_referencia_con_ventana_no_queda_fija_en_una_racha_rapida():
+    c = controlador(inicial=4, ventana_referencia=3)
+    # Racha de agentes chicos y luego lotes normales, 3 veces más lentos
+    intervalo(c, 0.1)
+    for _ in range(3):
+        intervalo(c, 0.3)
+    limite_tras_la_racha = c.limite
+    # Una vez fuera de la ventana, 0.3 s es la referencia y el límite vuelve a subir
+    for _ in range(3):
+        intervalo(c, 0.3)
+    assert c.limite > limite_tras_la_racha
+    assert c._referencia == pytest.approx(0.3)
+
+
+def test_sin_psutil_avisa_si_hay_tope_de_rss(monkeypatch, caplog):
+    monkeypatch.setattr(concurrencia, "psutil", None)
+    with caplog.at_level(logging.WARNING):
+        controlador(max_rss_hijos_mb=2048)
+    assert "psutil no está instalado" in caplog.text
+
+    caplog.clear()
+    with caplog.at_level(logging.WARNING):
+        controlador(max_rss_hijos_mb=0)
+    assert not caplog.text
+
+
+def test_ajuste_espera_intervalo_y_muestras():
+    c = controlador(inicial=4, intervalo_segundos=3600, min_muestras=1)
+    intervalo(c, 0.1)
+    assert c.limite == 4
+    c._ultimo_ajuste = time.monotonic() - 3600
+    intervalo(c, 0.1)
+    assert c.limite == 5
+
+
+def test_crear_controlador():
+    assert crear_controlador({}, "generacion", 10) is None
+    c = crear_controlador(
+        {"ejecucion": {"concurrencia_adaptativa": True, "concurrencia": {"minimo": 3, "maximo": 12}}}, "generacion", 20
+    )
+    assert (c.minimo, c.maximo, c.limite) == (3, 12, 12)
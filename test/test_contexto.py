@@ -0,0 +1,222 @@
+import pytest
+
+pytest.importorskip("pdfkit")
+from benchmarks import bench_contexto  # noqa: E402
+from modules.pdf_generator import (  # noqa: E402
+    PDFGeneratorAdquirencia, PDFGeneratorContraprestaciones, PDFGeneratorReembolso
+)
+
+# === Camino anterior (referencia) ===
+# Filtro con máscara booleana por agente, groupby por agente e iterrows, como los generadores
+# antes del índice por store_id y de los resúmenes globales.
+
+
+def filas(datos: dict, clave: str, store_id: str):
+    return datos[clave][datos[clave]["store_id"] == store_id]
+
+
+def contexto_contraprestacion(store_id: str, datos: dict) -> dict:
+    agente_ops = filas(datos, "detalle_contra", store_id)
+    if agente_ops.empty:
+        return None
+    resumen = (
+        agente_ops.groupby("entity_description")
+        .agg(cantidad=("transaction_amount", "count"), total_comision=("comission_amount", "sum"),
+             total_igv=("comission_amount_igv", "sum"), igv=("igv", "sum"))
+        .reset_index()
+    )
+    subtotal_operaciones = resumen["total_comision"].sum()
+    igv_total_operaciones = resumen["igv"].sum()
+    agente_ops = agente_ops.sort_values(by=["transaction_date", "transaction_id"])
+
+    bonos_agente = filas(datos, "detalle_bonos", store_id)
+    desc_agente = filas(datos, "detalle_desc", store_id)
+    subtotal_bonos = bonos_agente["monto"].sum() if not bonos_agente.empty else 0
+    subtotal_descuentos = desc_agente["monto"].sum() if not desc_agente.empty else 0
+    total_sin_igv = subtotal_operaciones + subtotal_bonos + subtotal_descuentos
+    igv_total = round(igv_total_operaciones + bonos_agente["igv"].sum() + desc_agente["igv"].sum(), 2)
+    return {
+        "resumen_entidades": [
+            {"descripcion_entidad": r.entity_description, "cantidad": r.cantidad, "total_comision": r.total_comision}
+            for _, r in resumen.iterrows()
+        ],
+        "detalle_entidades": [
+            {
+                "nombre": entidad,
+                "operaciones": [
+                    {
+                        "entidad_financiera": op["entity_description"],
+                        "fecha": op["transaction_date"],
+                        "descripcion": op["operation_description"],
+                        "pos": op["pos"],
+                        "numero_operacion": op["transaction_id"],
+                        "importe": float(op["transaction_amount"] or 0.0),
+                        "comision": float(op["comission_amount"] or 0.0)
+                    }
+                    for _, op in agente_ops[agente_ops["entity_description"] == entidad].iterrows()
+                ]
+            }
+            for entidad in resumen["entity_description"]
+        ],
+        "subtotal_operaciones": subtotal_operaciones,
+        "subtotal_operaciones_cantidad": resumen["cantidad"].sum(),
+        "bonos": [{"descripcion": r["bonus_type"], "monto": r["monto"], "igv": r["igv"]} for _, r in bonos_agente.iterrows()],
+        "subtotal_bonos": subtotal_bonos,
+        "descuentos": [
+            {"descripcion": r["discount_type"], "monto": r["monto"], "igv": r["igv"]} for _, r in desc_agente.iterrows()
+        ],
+        "subtotal_descuentos": subtotal_descuentos,
+        "total_sin_igv": total_sin_igv,
+        "igv_total": igv_total,
+        "total_deposito": round(total_sin_igv + igv_total, 2)
+    }
+
+
+def contexto_reembolso(store_id: str, datos: dict) -> dict:
+    agente_ops = filas(datos, "detalle_reembolso", store_id).sort_values(by=["transaction_date", "transaction_id"])
+    if agente_ops.empty:
+        return None
+    resumen = (
+        agente_ops.groupby("company_description")
+        .agg(cantidad=("transaction_amount", "count"), total_comision=("comission_amount", "sum"))
+        .reset_index()
+    )
+    total_sin_igv = resumen["total_comision"].sum()
+    igv_total = round(agente_ops["igv"].sum(), 2)
+    return {
+        "resumen_entidades": [
+            {"descripcion_entidad": r.company_description, "cantidad": r.cantidad, "total_comision": r.total_comision}
+            for _, r in resumen.iterrows()
+        ],
+        "detalle_entidades": [
+            {
+                "nombre": entidad,
+                "operaciones": [
+                    {
+                        "entidad": entidad,
+                        "fecha": op["transaction_date"],
+                        "descripcion": op["operation_description"],
+                        "pos": op["pos"],
+                        "numero_operacion": op["transaction_id"],
+                        "importe": float(op["transaction_amount"] or 0.0),
+                        "comision": float(op["comission_amount"] or 0.0)
+                    }
+                    for _, op in agente_ops[agente_ops["company_description"] == entidad].iterrows()
+                ]
+            }
+            for entidad in resumen["company_description"]
+        ],
+        "subtotal_operaciones": total_sin_igv,
+        "subtotal_operaciones_cantidad": resumen["cantidad"].sum(),
+        "total_sin_igv": total_sin_igv,
+        "igv_total": igv_total,
+        "total_deposito": round(total_sin_igv + igv_total, 2)
+    }
+
+
+def contexto_adquirencia(store_id: str, datos: dict) -> dict:
+    agente_ops = filas(datos, "detalle_adquirencia", store_id).sort_values(by=["transaction_date", "entity_transaction_id"])
+    if agente_ops.empty:
+        return None
+    resumen = (
+        agente_ops.groupby("transaction_date")
+        .agg(cantidad=("transaction_amount", "count"), importe_venta=("transaction_amount", "sum"),
+             comision_venta=("comission_amount_igv", "sum"), importe_abonado=("importe_abonado", "sum"))
+        .reset_index()
+    )
+    return {
+        "resumen_adquirencia": [
+            {
+                "fecha": r.transaction_date, "cantidad": r.cantidad, "importe_venta": r.importe_venta,
+                "comision_venta": r.comision_venta, "importe_abonado": r.importe_abonado
+            }
+            for _, r in resumen.iterrows()
+        ],
+        "total_cantidad": resumen["cantidad"].sum(),
+        "total_importe_venta": resumen["importe_venta"].sum(),
+        "total_comision_venta": resumen["comision_venta"].sum(),
+        "total_importe_abonado": resumen["importe_abonado"].sum(),
+        "detalle_adquirencia": [
+            {
+                "fecha": op["transaction_date"],
+                "hora": op["transaction_hour"],
+                "pos": op["pos"],
+                "numero_operacion": op["entity_transaction_id"],
+                "importe_venta": op["transaction_amount"],
+                "comision_venta": op["comission_amount_igv"],
+                "importe_abonado": op["importe_abonado"]
+            }
+            for _, op in agente_ops.iterrows()
+        ]
+    }
+
+
+REFERENCIAS = {
+    PDFGeneratorContraprestaciones: contexto_contraprestacion,
+    PDFGeneratorReembolso: contexto_reembolso,
+    PDFGeneratorAdquirencia: contexto_adquirencia,
+}
+
+# Listas de detalle armadas fila por fila (antes con iterrows)
+CLAVES_DETALLE = {"detalle_entidades", "bonos", "descuentos", "detalle_adquirencia"}
+# Resúmenes y totales (antes un groupby por agente, ahora precalculados en armar_resultado)
+CLAVES_RESUMEN = {
+    "resumen_entidades", "resumen_adquirencia", "subtotal_operaciones", "subtotal_operaciones_cantidad",
+    "subtotal_bonos", "subtotal_descuentos", "total_sin_igv", "igv_total", "total_deposito",
+    "total_cantidad", "total_importe_venta", "total_comision_venta", "total_importe_abonado"
+}
+
+
+def redondear(valor, decimales: int = 9):
+    """
+    Redondea los float anidados: las sumas globales (groupby) y las del groupby por agente
+    pueden diferir en el último bit; los templates muestran los montos con round(2).
+    """
+    if isinstance(valor, dict):
+        return {k: redondear(v, decimales) for k, v in valor.items()}
+    if isinstance(valor, list):
+        return [redondear(v, decimales) for v in valor]
+    if isinstance(valor, float):
+        return round(valor, decimales)
+    return valor
+
+
+def comparar_contextos(datos: dict, config: dict, claves: set, exacto: bool = True) -> int:
+    comparados = 0
+    for clase, referencia in REFERENCIAS.items():
+        generador = clase(config)
+        for row in datos["agentes"].to_dict(orient="records"):
+            anterior = referencia(row["store_id"], datos)
+            nuevo = generador.construir_contexto(row["store_id"], row, datos, config)
+            if anterior is None:
+                assert nuevo is None
+                continue
+            for clave in claves & set(anterior):
+                if exacto:
+                    assert nuevo[clave] == anterior[clave], f"{clase.tipo} {row['store_id']}: {clave}"
+                else:
+                    assert redondear(nuevo[clave]) == redondear(anterior[clave]), f"{clase.tipo} {row['store_id']}: {clave}"
+            comparados += 1
+    return comparados
+
+
+def test_detalle_igual_al_de_iterrows(datos_sinteticos, config_generadores):
+    assert comparar_contextos(datos_sinteticos, config_generadores, CLAVES_DETALLE) > 12
+
+
+def test_resumenes_iguales_al_groupby_por_agente(datos_sinteticos, config_generadores):
+    assert comparar_contextos(datos_sinteticos, config_generadores, CLAVES_RESUMEN, exacto=False) > 12
+
+
+def test_benchmark_de_contexto():
+    # Misma comparación que benchmarks/bench_contexto.py, en un agente con muchas operaciones
+    datos = bench_contexto.datos_sinteticos(operaciones=3000, entidades=7)
+    agente = datos["agentes"].to_dict(orient="records")[0]
+    generador = PDFGeneratorContraprestaciones.__new__(PDFGeneratorContraprestaciones)
+    config = {
+        "periodo": {"mes": 7, "anio": 2025}, "logo_base64": "",
+        "textos_fijos": {"informacion_adicional": "", "nota_importante": "", "campanas_activas": ""}
+    }
+    anterior = bench_contexto.contexto_iterrows(datos)
+    nuevo = generador.construir_contexto(bench_contexto.STORE_ID, agente, datos, config)
+    assert {clave: nuevo[clave] for clave in anterior} == anterior
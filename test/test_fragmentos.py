@@ -0,0 +1,54 @@
+import pytest
+
+pytest.importorskip("pdfkit")
+from modules.pdf_generator import fragmentar_entidades
+
+
+def entidades(*cantidades):
+    return [
+        {"nombre": f"E{i}", "operaciones": [{"n": n, "comision": 0.5 * (n + 1)} for n in range(cantidad)]}
+        for i, cantidad in enumerate(cantidades)
+    ]
+
+
+def test_respeta_filas_por_fragmento():
+    fragmentos = fragmentar_entidades(entidades(7, 3, 12), 5)
+    filas = [sum(len(parte["operaciones"]) for parte in fragmento) for fragmento in fragmentos]
+    assert filas == [5, 5, 5, 5, 2]
+
+
+def test_offsets_y_continuaciones():
+    fragmentos = fragmentar_entidades(entidades(7, 3), 5)
+    partes = [(p["nombre"], p["offset"], len(p["operaciones"]), p["continuacion"], p["continua"])
+              for fragmento in fragmentos for p in fragmento]
+    assert partes == [
+        ("E0", 0, 5, False, True),
+        ("E0", 5, 2, True, False),
+        ("E1", 0, 3, False, False),
+    ]
+
+
+def test_subtotal_de_la_entidad_completa_en_cada_parte():
+    originales = entidades(11)
+    subtotal = sum(op["comision"] for op in originales[0]["operaciones"])
+    partes = [p for fragmento in fragmentar_entidades(originales, 4) for p in fragmento]
+    assert len(partes) == 3
+    assert all(p["subtotal"] == subtotal for p in partes)
+
+
+def test_las_partes_reconstruyen_el_detalle():
+    originales = entidades(4, 9, 1, 6)
+    por_entidad = {}
+    for fragmento in fragmentar_entidades(originales, 3):
+        for parte in fragmento:
+            operaciones = por_entidad.setdefault(parte["nombre"], [])
+            assert parte["offset"] == len(operaciones)
+            operaciones.extend(parte["operaciones"])
+    assert por_entidad == {e["nombre"]: e["operaciones"] for e in originales}
+
+
+def test_entidad_que_completa_el_fragmento_exacto():
+    fragmentos = fragmentar_entidades(entidades(4, 4), 4)
+    assert [[(p["nombre"], p["continua"]) for p in fragmento] for fragmento in fragmentos] == [
+        [("E0", False)], [("E1", False)]
+    ]
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+from modules.data_processor import construir_indice_store, obtener_filas_store
+
+
+def filtrado_base(df: pd.DataFrame, store_id) -> pd.DataFrame:
+    """
+    Camino anterior al índice: máscara booleana sobre la tabla completa.
+    """
+    return df[df["store_id"] == store_id]
+
+
+def tabla_intercalada(store_ids: list, filas: int = 400, semilla: int = 3) -> pd.DataFrame:
+    # Agentes intercalados y desordenados; "orden" identifica la fila original para comparar el orden
+    rng = np.random.default_rng(semilla)
+    return pd.DataFrame({
+        "store_id": rng.choice(np.array(store_ids, dtype=object), filas),
+        "orden": np.arange(filas),
+        "monto": rng.integers(1, 10_000, filas) / 100
+    }).infer_objects()
+
+
+def comparar(df: pd.DataFrame, consultas: list):
+    ordenado, indice = construir_indice_store(df)
+    datos = {"t": ordenado, "indices": {"t": indice}}
+    for store_id in consultas:
+        esperado = filtrado_base(df, store_id).reset_index(drop=True)
+        obtenido = obtener_filas_store(datos, "t", store_id).reset_index(drop=True)
+        pd.testing.assert_frame_equal(obtenido, esperado, check_dtype=True)
+
+
+@pytest.mark.parametrize("store_ids", [
+    ["100003", "100001", "2", "100002", "99"],
+    [100003, 100001, 2, 100002, 99],
+])
+def test_porciones_iguales_al_filtrado(store_ids):
+    df = tabla_intercalada(store_ids)
+    es_entero = pd.api.types.is_integer_dtype(df["store_id"])
+    assert es_entero != isinstance(store_ids[0], str)
+    # Todos los agentes, uno ausente y uno con el otro tipo de store_id
+    ausente = "404" if isinstance(store_ids[0], str) else 404
+    otro_tipo = int(store_ids[0]) if isinstance(store_ids[0], str) else str(store_ids[0])
+    comparar(df, store_ids + [ausente, otro_tipo])
+
+
+def test_orden_de_filas_del_agente_se_conserva():
+    df = tabla_intercalada(["b", "a", "c"])
+    ordenado, indice = construir_indice_store(df)
+    assert list(ordenado["store_id"]) == sorted(df["store_id"])
+    for store_id, (inicio, fin) in indice.items():
+        assert ordenado["orden"].iloc[inicio:fin].is_monotonic_increasing
+
+
+def test_agente_ausente_y_tabla_vacia():
+    vacia = tabla_intercalada(["1"]).iloc[0:0]
+    ordenado, indice = construir_indice_store(vacia)
+    assert indice == {}
+    filas = obtener_filas_store({"t": ordenado, "indices": {"t": indice}}, "t", "1")
+    assert filas.empty and list(filas.columns) == ["store_id", "orden", "monto"]
+
+
+def test_un_solo_agente():
+    df = tabla_intercalada(["7"], filas=5)
+    _, indice = construir_indice_store(df)
+    assert indice == {"7": (0, 5)}
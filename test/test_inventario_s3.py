@@ -0,0 +1,117 @@
+import logging
+import boto3
+import pytest
+from modules.almacenamiento import ClienteLocal
+from modules.inventario_s3 import MAXIMO, escanear_inventario, rangos_sin_particion
+
+ThreadedMotoServer = pytest.importorskip("moto.server").ThreadedMotoServer
+
+BUCKET = "inventario-prueba"
+BASE = "contraprestacion/202507/"
+
+
+@pytest.fixture(scope="module")
+def s3():
+    servidor = ThreadedMotoServer(port=0, verbose=False)
+    servidor.start()
+    cliente = boto3.client(
+        "s3", endpoint_url=f"http://127.0.0.1:{servidor.get_host_and_port()[1]}",
+        aws_access_key_id="prueba", aws_secret_access_key="prueba", region_name="us-east-1"
+    )
+    yield cliente
+    servidor.stop()
+
+
+@pytest.fixture
+def bucket(s3):
+    s3.create_bucket(Bucket=BUCKET)
+    yield s3
+    for obj in s3.list_objects_v2(Bucket=BUCKET).get("Contents", []):
+        s3.delete_object(Bucket=BUCKET, Key=obj["Key"])
+    s3.delete_bucket(Bucket=BUCKET)
+
+
+def configuracion(particiones, salida=f"s3://{BUCKET}/contraprestacion/") -> dict:
+    return {
+        "rutas": {"salida_s3": {"contraprestacion": salida}},
+        "periodo": {"anio": 2025, "mes": 7},
+        "s3": {"inventario": {"particiones": particiones, "max_workers": 4}}
+    }
+
+
+def subir(s3, nombres: list, base: str = BASE):
+    for nombre in nombres:
+        s3.put_object(Bucket=BUCKET, Key=base + nombre, Body=b"%PDF")
+
+
+def fuera_de_particiones(caplog) -> list:
+    """
+    Cantidad de PDFs de cada aviso "fuera de las particiones".
+    """
+    return [
+        int(r.getMessage().split(": ")[1].split(" ")[0]) for r in caplog.records if "fuera de las particiones" in r.getMessage()
+    ]
+
+
+def test_rangos_sin_particion():
+    assert rangos_sin_particion("b/", "0123456789") == [(None, "b/0"), ("b/9" + MAXIMO, None)]
+    assert rangos_sin_particion("b/", "9150") == [
+        (None, "b/0"), ("b/1" + MAXIMO, "b/5"), ("b/5" + MAXIMO, "b/9"), ("b/9" + MAXIMO, None)
+    ]
+    assert rangos_sin_particion("b/", "") == []
+    assert rangos_sin_particion("b/", [""]) == []
+
+
+# Keys en los bordes: justo en el inicio de cada partición, antes de la primera, después de la
+# última y después del centinela (una partición seguida de MAXIMO y más caracteres)
+EN_PARTICIONES = ["0", "0000", "5", "59", "100001", "9", "99999999", "9" + MAXIMO + "z"]
+FUERA = ["-1", "A1", "ZZZ", MAXIMO, MAXIMO + "1"]
+
+
+def test_escanea_bordes_particiones_vacias_y_centinela(bucket, caplog):
+    # Las particiones 1-4 y 6-8 quedan vacías; también hay un PDF de otro periodo y un archivo que no es PDF
+    subir(bucket, [n + ".pdf" for n in EN_PARTICIONES + FUERA] + ["5.txt"])
+    subir(bucket, ["100002.pdf"], base="contraprestacion/202506/")
+
+    with caplog.at_level(logging.WARNING):
+        inventario = escanear_inventario(bucket, configuracion("0123456789"))
+
+    assert inventario.store_ids("contraprestacion") == set(EN_PARTICIONES + FUERA)
+    assert inventario.info("contraprestacion", "100001")[0] == 4
+    # Las keys de la partición 9 después del centinela no se reportan como fuera de las particiones
+    assert fuera_de_particiones(caplog) == [1, len(FUERA) - 1]
+
+
+def test_particiones_no_consecutivas(bucket, caplog):
+    nombres = ["0", "1", "1" + MAXIMO + "x", "2", "4999", "5", "6", "8", "9", "A"]
+    subir(bucket, [n + ".pdf" for n in nombres])
+
+    with caplog.at_level(logging.WARNING):
+        inventario = escanear_inventario(bucket, configuracion("15"))
+
+    assert inventario.store_ids("contraprestacion") == set(nombres)
+    # Antes de "1": 0; entre "1" y "5": 2 y 4999; después de "5": 6, 8, 9 y A
+    assert fuera_de_particiones(caplog) == [1, 2, 4]
+
+
+def test_sin_particiones_un_solo_listado(bucket, caplog):
+    subir(bucket, ["1.pdf", "A.pdf", MAXIMO + ".pdf"])
+    with caplog.at_level(logging.WARNING):
+        inventario = escanear_inventario(bucket, configuracion(""))
+    assert inventario.store_ids("contraprestacion") == {"1", "A", MAXIMO}
+    assert not [r for r in caplog.records if r.levelno >= logging.WARNING]
+
+
+def test_periodo_vacio(bucket):
+    inventario = escanear_inventario(bucket, configuracion("0123456789"))
+    assert inventario.total("contraprestacion") == 0
+
+
+def test_cliente_local_mismo_resultado(tmp_path):
+    nombres = ["0", "100001", "9", "-1", "A"]
+    for nombre in nombres:
+        ruta = tmp_path / "contraprestacion" / "202507" / f"{nombre}.pdf"
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        ruta.write_bytes(b"%PDF")
+    inventario = escanear_inventario(ClienteLocal(), configuracion("0123456789", f"file://{tmp_path}/contraprestacion/"))
+    assert inventario.store_ids("contraprestacion") == set(nombres)
@@ -0,0 +1,53 @@
+import json
+from modules.almacenamiento import ClienteLocal
+from modules.manifiesto_hashes import NOMBRE_MANIFIESTO, ManifiestoHashes
+
+
+def manifiesto(tmp_path):
+    return ManifiestoHashes(ClienteLocal(), str(tmp_path), f"contraprestacion/202507/{NOMBRE_MANIFIESTO}")
+
+
+def leer(tmp_path):
+    return json.loads((tmp_path / "contraprestacion" / "202507" / NOMBRE_MANIFIESTO).read_text())
+
+
+def test_sin_manifiesto_previo(tmp_path):
+    assert manifiesto(tmp_path).hash_anterior("1") is None
+
+
+def test_guardar_y_leer(tmp_path):
+    primero = manifiesto(tmp_path)
+    primero.registrar("1", "aaa")
+    primero.registrar("2", "bbb")
+    primero.guardar()
+    assert leer(tmp_path) == {"1": "aaa", "2": "bbb"}
+    assert primero.nuevos == {}
+
+    segundo = manifiesto(tmp_path)
+    assert segundo.hash_anterior("1") == "aaa"
+    assert segundo.hash_anterior("3") is None
+
+
+def test_guardar_fusiona_con_el_vigente(tmp_path):
+    primero = manifiesto(tmp_path)
+    primero.registrar("1", "aaa")
+    primero.registrar("2", "bbb")
+    primero.guardar()
+
+    # Un reproceso sin leer el manifiesto antes: el vigente se carga al guardar
+    segundo = manifiesto(tmp_path)
+    segundo.registrar("2", "ccc")
+    segundo.guardar()
+    assert leer(tmp_path) == {"1": "aaa", "2": "ccc"}
+
+
+def test_guardar_sin_nuevos_no_escribe(tmp_path):
+    manifiesto(tmp_path).guardar()
+    assert not (tmp_path / "contraprestacion").exists()
+
+
+def test_extraer_nuevos(tmp_path):
+    en_worker = manifiesto(tmp_path)
+    en_worker.registrar("7", "xyz")
+    assert en_worker.extraer_nuevos() == {"7": "xyz"}
+    assert en_worker.extraer_nuevos() == {}
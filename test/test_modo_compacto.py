@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+import pytest
+from modules.data_processor import (
+    armar_resultado, compactar_dataframe, construir_indice_store, normalizar_tablas, obtener_filas_store
+)
+
+
+def test_montos_con_centimos_quedan_en_float64():
+    df = pd.DataFrame({"monto": [12.34, 0.1, 100.01, np.nan], "igv": [0.18, 0.18, 0.18, 0.18]})
+    compacto = compactar_dataframe(df)
+    assert (compacto.dtypes == np.float64).all()
+    pd.testing.assert_frame_equal(compacto, df)
+
+
+@pytest.mark.parametrize("valores", [
+    [1.0, 2.5, 1_000_000.0, -0.75],
+    [0.5, np.nan, 3.0],
+    [float(2 ** 24), 0.0],
+])
+def test_float32_solo_si_el_valor_es_exacto(valores):
+    compacto = compactar_dataframe(pd.DataFrame({"x": valores}))
+    assert compacto["x"].dtype == np.float32
+    np.testing.assert_array_equal(compacto["x"].astype("float64").to_numpy(), np.array(valores))
+
+
+@pytest.mark.parametrize("valores", [
+    [float(2 ** 24 + 1), 1.0],   # entero fuera de la mantisa de float32
+    [0.1],
+    [1e-50],
+])
+def test_sin_representacion_exacta_queda_en_float64(valores):
+    assert compactar_dataframe(pd.DataFrame({"x": valores}))["x"].dtype == np.float64
+
+
+def test_enteros_y_sumas_en_centimos():
+    df = pd.DataFrame({"cantidad": [1, 300, 70_000], "monto": [0.1, 0.2, 0.3]})
+    compacto = compactar_dataframe(df)
+    assert compacto["cantidad"].dtype == np.int32 and compacto["cantidad"].tolist() == [1, 300, 70_000]
+    assert compacto["monto"].sum() == df["monto"].sum()
+
+
+def test_tipos_de_descripciones_e_identificadores():
+    df = pd.DataFrame({
+        "store_id": ["2", "1", "2", "1"],
+        "operation_description": ["PAGO", "PAGO", "RECARGA", "PAGO"],
+        "entity_description": ["A", "B", "C", "D"],
+    })
+    compacto = compactar_dataframe(df)
+    assert compacto["operation_description"].dtype == "category"
+    # Alta cardinalidad: la categoría no ahorraría memoria
+    assert compacto["entity_description"].dtype != "category"
+    assert compacto["store_id"].dtype == pd.StringDtype("pyarrow")
+    assert compacto.astype(object).equals(df.astype(object))
+    assert compactar_dataframe(df.iloc[0:0]).empty
+
+
+@pytest.mark.parametrize("tipo", ["category", pd.StringDtype("pyarrow"), pd.StringDtype("python"), object])
+def test_indice_con_store_id_compacto(tipo):
+    rng = np.random.default_rng(5)
+    df = pd.DataFrame({"store_id": rng.choice(["100002", "100010", "99", "100001"], 200), "orden": np.arange(200)})
+    df["store_id"] = df["store_id"].astype(tipo)
+
+    ordenado, indice = construir_indice_store(df)
+    assert all(isinstance(store_id, str) for store_id in indice)
+    datos = {"t": ordenado, "indices": {"t": indice}}
+    for store_id in ["100002", "100010", "99", "100001", "404"]:
+        esperado = df[df["store_id"] == store_id]["orden"].tolist()
+        assert obtener_filas_store(datos, "t", store_id)["orden"].tolist() == esperado
+
+
+def test_store_id_categorico_con_orden_no_lexicografico():
+    df = pd.DataFrame({"store_id": pd.Categorical(["a", "b", "a", "c"], categories=["c", "b", "a"]), "orden": range(4)})
+    ordenado, indice = construir_indice_store(df)
+    assert indice == {"c": (0, 1), "b": (1, 2), "a": (2, 4)}
+    assert obtener_filas_store({"t": ordenado, "indices": {"t": indice}}, "t", "a")["orden"].tolist() == [0, 2]
+
+
+def test_mismo_contexto_en_modo_compacto(tablas_sinteticas, config_generadores):
+    pytest.importorskip("pdfkit")
+    from modules.pdf_generator import PDFGeneratorAdquirencia, PDFGeneratorContraprestaciones, PDFGeneratorReembolso
+
+    normales = normalizar_tablas({tipo: df.copy() for tipo, df in tablas_sinteticas.items()})
+    datos = armar_resultado(normales)
+    compactos = armar_resultado({tipo: compactar_dataframe(df) for tipo, df in normales.items()})
+    assert (compactos["detalle_contra"]["entity_description"].dtype == "category"
+            or compactos["detalle_contra"]["operation_description"].dtype == "category")
+
+    comparados = 0
+    for clase in (PDFGeneratorContraprestaciones, PDFGeneratorReembolso, PDFGeneratorAdquirencia):
+        generador = clase(config_generadores)
+        ruta = config_generadores["rutas"][generador.template_key]
+        for row in datos["agentes"].to_dict(orient="records"):
+            normal = generador.construir_contexto(row["store_id"], row, datos, config_generadores)
+            compacto = generador.construir_contexto(row["store_id"], row, compactos, config_generadores)
+            assert compacto == normal
+            if normal is not None:
+                # Mismo hash: los PDF ya generados en modo normal no se regeneran en modo compacto
+                assert generador.hash_contexto(ruta, compacto) == generador.hash_contexto(ruta, normal)
+                comparados += 1
+    assert comparados > 12
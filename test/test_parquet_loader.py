@@ -0,0 +1,123 @@
+import time
+import logging
+import threading
+import fsspec
+import pandas as pd
+import pytest
+from benchmarks.datos_sinteticos import escribir_dataset
+from modules.parquet_loader import COLUMNAS_DATASET, cargar_parquets, decodificar_parquet
+
+
+class FilesystemMedido:
+    """
+    Filesystem local que cuenta las lecturas simultáneas (cat_file) y las peticiones por rango.
+    """
+
+    def __init__(self, demora: float = 0.05):
+        self.fs = fsspec.filesystem("file")
+        self.demora = demora
+        self.en_vuelo = 0
+        self.maximo_en_vuelo = 0
+        self.rangos = 0
+        self._lock = threading.Lock()
+
+    def info(self, path):
+        return self.fs.info(path)
+
+    def cat_file(self, path, start=None, end=None):
+        with self._lock:
+            self.en_vuelo += 1
+            self.maximo_en_vuelo = max(self.maximo_en_vuelo, self.en_vuelo)
+            self.rangos += start is not None
+        try:
+            time.sleep(self.demora)
+            return self.fs.cat_file(path, start=start, end=end)
+        finally:
+            with self._lock:
+                self.en_vuelo -= 1
+
+
+def lectura_base(nombre: str, ruta: str, store_ids=None) -> pd.DataFrame:
+    """
+    Camino anterior: pd.read_parquet del archivo completo, proyección y filtro en pandas.
+    """
+    df = pd.read_parquet(ruta)
+    df = df[[c for c in COLUMNAS_DATASET[nombre] if c in df.columns]]
+    if store_ids is not None:
+        df = df[df["store_id"].astype(str).isin(pd.Index(store_ids).astype(str))]
+    return df.reset_index(drop=True)
+
+
+@pytest.fixture(scope="module")
+def dataset(tmp_path_factory):
+    directorio = tmp_path_factory.mktemp("parquet")
+    rutas = escribir_dataset(str(directorio), agentes=30, ops_por_agente=15)
+    # Filas de agentes que no están en la tabla de agentes y una columna que ningún generador usa
+    for nombre in ("contraprestacion", "reembolso"):
+        df = pd.read_parquet(rutas[nombre])
+        extra = df.head(5).assign(store_id=df["store_id"].max() + 1000)
+        pd.concat([df, extra]).assign(columna_sin_uso="x").to_parquet(rutas[nombre], index=False)
+    return rutas
+
+
+def test_cargar_igual_que_read_parquet_filtrado(dataset):
+    fs = FilesystemMedido()
+    dfs, tiempos = cargar_parquets(fs, dataset, {"s3": {"input": {"lectura": {"max_workers": 6}}}}, filtrar_por="agentes")
+
+    agentes = lectura_base("agentes", dataset["agentes"])
+    pd.testing.assert_frame_equal(dfs["agentes"], agentes)
+    for nombre, ruta in dataset.items():
+        esperado = lectura_base(nombre, ruta, agentes["store_id"])
+        pd.testing.assert_frame_equal(dfs[nombre], esperado, check_dtype=True)
+        assert "columna_sin_uso" not in dfs[nombre].columns
+        assert tiempos[nombre]["filas"] == len(esperado) and tiempos[nombre]["peticiones"] == 1
+
+    assert len(pd.read_parquet(dataset["contraprestacion"])) == len(dfs["contraprestacion"]) + 5
+    # Las seis descargas corren a la vez, no una tras otra
+    assert fs.maximo_en_vuelo > 1
+
+
+def test_descarga_por_rangos(dataset):
+    fs = FilesystemMedido(demora=0)
+    config = {"s3": {"input": {"lectura": {"umbral_rangos_mb": 0.001, "tamano_rango_mb": 0.002}}}}
+    dfs, tiempos = cargar_parquets(fs, {"contraprestacion": dataset["contraprestacion"]}, config)
+
+    assert tiempos["contraprestacion"]["peticiones"] > 1
+    assert fs.rangos == tiempos["contraprestacion"]["peticiones"]
+    pd.testing.assert_frame_equal(dfs["contraprestacion"], lectura_base("contraprestacion", dataset["contraprestacion"]))
+
+
+def contenido_parquet(df: pd.DataFrame, tmp_path) -> bytes:
+    ruta = tmp_path / "t.parquet"
+    df.to_parquet(ruta, index=False)
+    return ruta.read_bytes()
+
+
+@pytest.mark.parametrize("columna, consulta, esperados", [
+    # store_id int64 en el archivo, ids str de la tabla de agentes: el filtro se convierte al tipo del archivo
+    ([100001, 100002, 100003, 100002], ["100002", "100003"], [100002, 100003, 100002]),
+    # store_id str en el archivo, ids int
+    (["100001", "100002", "100003", "100002"], [100002], ["100002", "100002"]),
+    # Sin coincidencias
+    ([1, 2, 3], ["9"], []),
+])
+def test_filtro_convierte_al_tipo_del_archivo(tmp_path, columna, consulta, esperados, caplog):
+    contenido = contenido_parquet(pd.DataFrame({"store_id": columna, "monto": range(len(columna))}), tmp_path)
+    with caplog.at_level(logging.WARNING):
+        df = decodificar_parquet("bonos", contenido, ["store_id"], pd.Series(consulta).unique())
+    assert df["store_id"].tolist() == esperados
+    assert list(df.columns) == ["store_id"]
+    assert not caplog.records
+
+
+def test_store_id_no_convertible_se_filtra_despues_de_leer(tmp_path, caplog):
+    contenido = contenido_parquet(pd.DataFrame({"store_id": [100001, 100002, 100003]}), tmp_path)
+    with caplog.at_level(logging.WARNING):
+        df = decodificar_parquet("bonos", contenido, None, ["100003", "A-17"])
+    assert "no convertible" in caplog.text
+    assert df["store_id"].tolist() == [100003]
+
+
+def test_archivo_sin_store_id_no_se_filtra(tmp_path):
+    contenido = contenido_parquet(pd.DataFrame({"otra": [1, 2]}), tmp_path)
+    assert len(decodificar_parquet("bonos", contenido, None, ["1"])) == 2
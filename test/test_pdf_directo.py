@@ -0,0 +1,186 @@
+import io
+import zlib
+import base64
+import struct
+import pytest
+from pypdf import PdfReader
+from modules import pdf_directo
+from modules.pdf_directo import DISENOS, DocumentoPDF, ErrorPNG, cargar_png, formato_monto
+
+
+def texto_pdf(contenido: bytes) -> tuple:
+    paginas = PdfReader(io.BytesIO(contenido)).pages
+    return "\n".join(pagina.extract_text() for pagina in paginas), len(paginas)
+
+
+# === PNG de prueba ===
+
+def _paeth(a, b, c):
+    p = a + b - c
+    pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+    return a if pa <= pb and pa <= pc else (b if pb <= pc else c)
+
+
+def _filtrar(filas: list, bpp: int) -> bytes:
+    """
+    Codifica cada fila con un filtro distinto (0..4 en rotación) para ejercitar el desfiltrado.
+    """
+    salida, anterior = bytearray(), bytes(len(filas[0]))
+    for n, fila in enumerate(filas):
+        filtro = n % 5
+        codificada = bytearray()
+        for i, valor in enumerate(fila):
+            a = fila[i - bpp] if i >= bpp else 0
+            b = anterior[i]
+            c = anterior[i - bpp] if i >= bpp else 0
+            predictor = [0, a, b, (a + b) >> 1, _paeth(a, b, c)][filtro]
+            codificada.append((valor - predictor) & 255)
+        salida += bytes([filtro]) + codificada
+        anterior = fila
+    return bytes(salida)
+
+
+def _chunk(tipo: bytes, datos: bytes) -> bytes:
+    return struct.pack(">I", len(datos)) + tipo + datos + struct.pack(">I", zlib.crc32(tipo + datos))
+
+
+def png(filas: list, tipo_color: int, canales: int, profundidad: int = 8, entrelazado: int = 0) -> bytes:
+    ancho = len(filas[0]) // canales
+    cabecera = struct.pack(">IIBBBBB", ancho, len(filas), profundidad, tipo_color, 0, 0, entrelazado)
+    idat = zlib.compress(_filtrar(filas, canales))
+    # IDAT partido en dos chunks, como los escriben algunos editores
+    return (b"\x89PNG\r\n\x1a\n" + _chunk(b"IHDR", cabecera) + _chunk(b"IDAT", idat[:5]) + _chunk(b"IDAT", idat[5:])
+            + _chunk(b"IEND", b""))
+
+
+FILAS_RGBA = [bytes((x * 40 + y * 7) % 256 for x in range(5 * 4)) for y in range(7)]
+
+
+@pytest.fixture(autouse=True)
+def sin_cache_de_imagenes():
+    pdf_directo._cache_imagenes.clear()
+
+
+def test_png_rgba_separa_color_y_alfa():
+    imagen = cargar_png(png(FILAS_RGBA, tipo_color=6, canales=4))
+    pixeles = b"".join(FILAS_RGBA)
+    assert (imagen["ancho"], imagen["alto"], imagen["colores"]) == (5, 7, 3)
+    assert zlib.decompress(imagen["pixeles"]) == bytes(b for i, b in enumerate(pixeles) if i % 4 != 3)
+    assert zlib.decompress(imagen["alfa"]) == pixeles[3::4]
+
+
+def test_png_rgb_y_gris():
+    filas_rgb = [bytes((x * 13 + y * 31) % 256 for x in range(4 * 3)) for y in range(6)]
+    rgb = cargar_png(png(filas_rgb, tipo_color=2, canales=3))
+    assert zlib.decompress(rgb["pixeles"]) == b"".join(filas_rgb) and rgb["alfa"] is None
+
+    filas_gris = [bytes((x * 50 + y) % 256 for x in range(3)) for y in range(5)]
+    gris = cargar_png(png(filas_gris, tipo_color=0, canales=1))
+    assert gris["colores"] == 1 and zlib.decompress(gris["pixeles"]) == b"".join(filas_gris)
+
+
+def test_logo_del_repositorio():
+    with open("logo_kasnet.png", "rb") as logo:
+        imagen = cargar_png(logo.read())
+    assert (imagen["ancho"], imagen["alto"], imagen["colores"]) == (545, 51, 3)
+    assert len(zlib.decompress(imagen["pixeles"])) == 545 * 51 * 3
+
+
+@pytest.mark.parametrize("contenido, motivo", [
+    (png([bytes(4)] * 2, tipo_color=3, canales=1), "paleta"),
+    (png(FILAS_RGBA, tipo_color=6, canales=4, entrelazado=1), "entrelazado"),
+    (png([bytes(8)] * 2, tipo_color=2, canales=3, profundidad=16), "16 bits"),
+    (b"GIF89a" + bytes(40), "no es un PNG"),
+])
+def test_png_no_soportado_falla_con_el_motivo(contenido, motivo):
+    with pytest.raises(ErrorPNG, match=motivo):
+        cargar_png(contenido)
+    with pytest.raises(ErrorPNG, match=motivo):
+        DocumentoPDF().logo(contenido, 10, 10, 100)
+
+
+def test_texto_winansi_y_caracteres_especiales():
+    doc = DocumentoPDF()
+    doc.texto(20, 40, "Descripción: Peña (año) 100% \\ ok")
+    doc.nueva_pagina()
+    doc.texto(20, 40, "Campañas – Información")
+    texto, paginas = texto_pdf(doc.bytes())
+    assert paginas == 2
+    assert "Descripción: Peña (año) 100% \\ ok" in texto
+    assert "Campañas – Información" in texto
+
+
+def test_tabla_repite_encabezado_en_cada_pagina():
+    doc = DocumentoPDF()
+    filas = [[str(i), f"Operación {i}", formato_monto(i * 1.5)] for i in range(150)]
+    doc.tabla(20, 400, [("#", 0.1, "centro"), ("Descripción", 0.6, "izq"), ("Importe (S/)", 0.3, "der")], filas,
+              [["Sub Total", formato_monto(sum(i * 1.5 for i in range(150)))]])
+    texto, paginas = texto_pdf(doc.bytes())
+    assert paginas > 1
+    assert texto.count("Descripción") == paginas
+    assert "Operación 149" in texto and "Sub Total" in texto and "16762.5" in texto
+
+
+def test_formato_monto_igual_que_round_2_de_jinja():
+    assert [formato_monto(v) for v in (101.7, 115.875, None, 0, "2.5")] == ["101.7", "115.88", "0.0", "0.0", "2.5"]
+
+
+# === Estados completos desde el contexto del motor HTML ===
+
+def contextos(datos, config):
+    pytest.importorskip("pdfkit")
+    from modules.pdf_generator import PDFGeneratorAdquirencia, PDFGeneratorContraprestaciones, PDFGeneratorReembolso
+
+    generadores = {
+        "contraprestacion": PDFGeneratorContraprestaciones(config),
+        "reembolso": PDFGeneratorReembolso(config),
+        "adquirencia": PDFGeneratorAdquirencia(config),
+    }
+    for row in datos["agentes"].to_dict(orient="records"):
+        for tipo, generador in generadores.items():
+            context = generador.construir_contexto(row["store_id"], row, datos, config)
+            if context is not None:
+                yield tipo, row, context
+
+
+def test_estados_contienen_los_campos_del_contexto(datos_sinteticos, config_generadores):
+    tipos = set()
+    for tipo, row, context in contextos(datos_sinteticos, config_generadores):
+        texto, paginas = texto_pdf(DISENOS[tipo](context))
+        tipos.add(tipo)
+        assert paginas >= 2
+
+        esperados = [
+            f"{context['cod_agente']} - {context['nombre_agente']}", context["titular"], context["direccion"],
+            f"{context['nombre_mes']} {context['anio']}", "Información Adicional", "Campañas Activas",
+            config_generadores["textos_fijos"]["campanas_activas"], "Descripción" if tipo != "adquirencia" else "Nro. Operación",
+        ]
+        if tipo == "adquirencia":
+            esperados += [formato_monto(context["total_importe_venta"]), formato_monto(context["total_importe_abonado"])]
+            esperados += [op["numero_operacion"] for op in context["detalle_adquirencia"]]
+        else:
+            esperados += [formato_monto(context["total_deposito"]), formato_monto(context["igv_total"])]
+            esperados += [e["descripcion_entidad"] for e in context["resumen_entidades"]]
+            esperados += [op["numero_operacion"] for e in context["detalle_entidades"] for op in e["operaciones"]]
+        if tipo == "contraprestacion":
+            esperados += [b["descripcion"] for b in context["bonos"]] + [d["descripcion"] for d in context["descuentos"]]
+
+        faltantes = [valor for valor in esperados if str(valor) not in texto]
+        assert not faltantes, f"{tipo} {row['store_id']}: {faltantes}"
+    assert tipos == set(DISENOS)
+
+
+def test_agente_con_tildes_y_enie(datos_sinteticos, config_generadores):
+    for tipo, row, context in contextos(datos_sinteticos, config_generadores):
+        if row["merchant"] == "BODEGA ÑANDÚ" and tipo == "contraprestacion":
+            texto, _ = texto_pdf(DISENOS[tipo](context))
+            assert "BODEGA ÑANDÚ" in texto and "José Peña" in texto
+            return
+    pytest.fail("el agente con ñ no tiene contraprestaciones en el mes sintético")
+
+
+def test_logo_no_soportado_en_la_config_falla_el_estado(datos_sinteticos, config_generadores):
+    config = dict(config_generadores, logo_base64=base64.b64encode(png([bytes(4)] * 2, tipo_color=3, canales=1)).decode())
+    tipo, _, context = next(contextos(datos_sinteticos, config))
+    with pytest.raises(ErrorPNG, match="paleta"):
+        DISENOS[tipo](context)
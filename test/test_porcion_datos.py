@@ -0,0 +1,47 @@
+import pandas as pd
+import pytest
+
+pytest.importorskip("pdfkit")
+from modules.data_processor import construir_indice_store, obtener_filas_store
+from modules.ejecucion import porcion_datos
+
+
+@pytest.fixture
+def datos():
+    detalle = pd.DataFrame({
+        "store_id": ["3", "1", "2", "1", "3", "3", "5"],
+        "transaction_id": [30, 10, 20, 11, 31, 32, 50],
+    })
+    detalle, indice = construir_indice_store(detalle)
+    return {
+        "agentes": pd.DataFrame({"store_id": ["1", "2", "3", "4", "5"], "merchant": list("abcde")}),
+        "detalle_contra": detalle,
+        "totales": {"contra": {"1": 2.0, "2": 1.0, "3": 3.0, "5": 1.0}},
+        "indices": {"detalle_contra": indice},
+    }
+
+
+def test_filas_de_cada_agente(datos):
+    porcion = porcion_datos(datos, ["3", "1", "4"])
+    assert porcion["agentes"]["store_id"].tolist() == ["1", "3", "4"]
+    assert len(porcion["detalle_contra"]) == 5
+    for store_id in ["1", "3", "4"]:
+        esperado = obtener_filas_store(datos, "detalle_contra", store_id)["transaction_id"].tolist()
+        assert obtener_filas_store(porcion, "detalle_contra", store_id)["transaction_id"].tolist() == esperado
+
+
+def test_offsets_recalculados(datos):
+    porcion = porcion_datos(datos, ["5", "3"])
+    assert porcion["indices"]["detalle_contra"] == {"3": (0, 3), "5": (3, 4)}
+    assert porcion["detalle_contra"].index.tolist() == [0, 1, 2, 3]
+
+
+def test_totales_filtrados(datos):
+    assert porcion_datos(datos, ["2", "4"])["totales"] == {"contra": {"2": 1.0}}
+
+
+def test_porcion_vacia(datos):
+    porcion = porcion_datos(datos, [])
+    assert porcion["agentes"].empty
+    assert porcion["detalle_contra"].empty
+    assert porcion["indices"]["detalle_contra"] == {}
@@ -0,0 +1,131 @@
+import os
+import sys
+import stat
+import time
+import pytest
+from modules.render_pool import (
+    FALLO, FIN, IGNORAR, MENSAJE, ErrorRender, PoolRender, WorkerWkhtmltopdf, clasificar_linea_stderr
+)
+
+# Sustituto de wkhtmltopdf --read-args-from-stdin con la salida de stderr de 0.12.x. El contenido
+# del HTML decide el caso: COLGAR (no termina), MORIR (el proceso cae), FALLA (Error + Exit with code).
+SUSTITUTO = '''
+import sys, time, shlex
+for linea in sys.stdin:
+    entrada, salida = shlex.split(linea)[-2:]
+    try:
+        html = open(entrada, encoding="utf-8").read()
+    except FileNotFoundError:
+        html = "FALLA"
+    sys.stderr.write("Loading pages (1/6)\\n[>                    ] 0%\\r[==========>         ] 50%\\r")
+    sys.stderr.flush()
+    if "COLGAR" in html:
+        time.sleep(60)
+    if "MORIR" in html:
+        sys.exit(1)
+    if "FALLA" in html:
+        sys.stderr.write("Error: Failed loading page file:///" + entrada + "\\n")
+        sys.stderr.write("Exit with code 1 due to network error: ContentNotFoundError\\n")
+    else:
+        open(salida, "wb").write(b"%PDF-1.4 " + html.encode("utf-8"))
+        sys.stderr.write("Printing pages (6/6)\\n[====================] Page 1 of 1\\nDone\\n")
+    sys.stderr.flush()
+'''
+
+
+@pytest.mark.parametrize("linea, estado", [
+    ("Done", FIN),
+    ("Done\n", FIN),
+    ("Exit with code 1 due to network error: ContentNotFoundError", FALLO),
+    ("Exit with code 1, due to unknown error.", FALLO),
+    ("Error: Failed loading page file:///tmp/x.html", MENSAJE),
+    ("Warning: Failed to load file:///tmp/logo.png (ignore)", MENSAJE),
+    ("Loading pages (1/6)", MENSAJE),
+    ("QStandardPaths: XDG_RUNTIME_DIR not set, defaulting to '/tmp/runtime-root'", MENSAJE),
+    ("[==============================>                             ] 50%", IGNORAR),
+    ("[============================================================] Page 1 of 1", IGNORAR),
+    ("", IGNORAR),
+    ("   ", IGNORAR),
+])
+def test_clasificar_linea_stderr(linea, estado):
+    assert clasificar_linea_stderr(linea) == estado
+
+
+@pytest.fixture
+def ejecutable(tmp_path):
+    if os.name == "nt":
+        pytest.skip("el sustituto de wkhtmltopdf es un script con shebang")
+    ruta = tmp_path / "wkhtmltopdf"
+    ruta.write_text(f"#!{sys.executable}\n{SUSTITUTO}", encoding="utf-8")
+    ruta.chmod(ruta.stat().st_mode | stat.S_IXUSR)
+    return str(ruta)
+
+
+def test_lote_en_un_worker(ejecutable):
+    worker = WorkerWkhtmltopdf(ejecutable, {}, timeout=10)
+    try:
+        pdfs = worker.renderizar_lote([f"agente {i}" for i in range(3)])
+    finally:
+        worker.cerrar()
+    assert pdfs == [f"%PDF-1.4 agente {i}".encode() for i in range(3)]
+
+
+def test_fallo_no_desfasa_la_conversion_siguiente(ejecutable):
+    worker = WorkerWkhtmltopdf(ejecutable, {}, timeout=10)
+    try:
+        with pytest.raises(ErrorRender, match="Exit with code 1") as error:
+            worker.renderizar_lote(["FALLA"])
+        assert "Error: Failed loading page" in str(error.value)
+        assert worker.renderizar_lote(["siguiente"]) == [b"%PDF-1.4 siguiente"]
+    finally:
+        worker.cerrar()
+
+
+def test_timeout_reemplaza_el_worker(ejecutable):
+    pool = PoolRender(ejecutable, {}, workers=1, max_trabajos_por_worker=500, timeout=1)
+    try:
+        pool.renderizar("antes del timeout")
+        colgado = pool._libres.queue[0]
+        inicio = time.monotonic()
+        with pytest.raises(ErrorRender, match="Timeout"):
+            pool.renderizar("COLGAR")
+        assert pool._libres.empty()
+        # El worker colgado se mata sin esperar los 10s de cierre ordenado, y se recoge (sin zombie)
+        assert time.monotonic() - inicio < 5
+        assert colgado.proceso.returncode is not None
+        assert pool.renderizar("tras timeout") == b"%PDF-1.4 tras timeout"
+    finally:
+        pool.cerrar()
+
+
+def test_caida_del_proceso(ejecutable):
+    pool = PoolRender(ejecutable, {}, workers=1, max_trabajos_por_worker=500, timeout=10)
+    try:
+        with pytest.raises(ErrorRender, match="terminó inesperadamente"):
+            pool.renderizar("MORIR")
+        assert pool.renderizar("tras la caída") == "%PDF-1.4 tras la caída".encode()
+    finally:
+        pool.cerrar()
+
+
+def test_escritura_a_un_proceso_terminado(ejecutable):
+    worker = WorkerWkhtmltopdf(ejecutable, {}, timeout=10)
+    try:
+        worker.proceso.kill()
+        worker.proceso.wait()
+        with pytest.raises(ErrorRender, match="terminó inesperadamente"):
+            worker.renderizar_lote(["x" * 1_000_000])
+    finally:
+        worker.cerrar()
+
+
+def test_cerrar_recoge_el_proceso(ejecutable):
+    worker = WorkerWkhtmltopdf(ejecutable, {}, timeout=10)
+    worker.cerrar()
+    assert worker.proceso.returncode == 0
+
+    worker = WorkerWkhtmltopdf(ejecutable, {}, timeout=10)
+    worker.cerrar(forzar=True)
+    # returncode lo fija wait(): el proceso terminado ya no queda como zombie
+    assert worker.proceso.returncode is not None
+    assert not os.path.exists(worker.directorio)
@@ -0,0 +1,135 @@
+import logging
+import fsspec
+import pandas as pd
+import pytest
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+pytest.importorskip("pdfkit")
+from modules import streaming
+from modules.parquet_loader import COLUMNAS_DATASET
+from modules.streaming import CursorStore, _orden_recorrido, generar_en_streaming
+
+
+def escribir_bonos(ruta, store_ids, row_group_size=2):
+    tabla = pa.table({
+        "store_id": store_ids,
+        "description": [f"bono {i}" for i in range(len(store_ids))],
+        "amount": [float(i) for i in range(len(store_ids))],
+    })
+    pq.write_table(tabla, ruta, row_group_size=row_group_size)
+    return str(ruta)
+
+
+def test_filas_por_agente_entre_lotes(tmp_path):
+    archivo = escribir_bonos(tmp_path / "bonos.parquet", [1, 1, 1, 2, 4, 4, 4, 4, 7])
+    cursor = CursorStore("bonos", archivo, batch_size=2)
+    assert cursor.filas(1).column("description").to_pylist() == ["bono 0", "bono 1", "bono 2"]
+    assert cursor.filas(2).num_rows == 1
+    assert cursor.filas(3).num_rows == 0
+    assert cursor.filas(4).column("amount").to_pylist() == [4.0, 5.0, 6.0, 7.0]
+    assert cursor.filas(9).num_rows == 0
+
+
+def test_agente_sin_filas_conserva_columnas(tmp_path):
+    archivo = escribir_bonos(tmp_path / "bonos.parquet", [5, 6])
+    vacia = CursorStore("bonos", archivo).filas(1)
+    assert vacia.num_rows == 0
+    assert vacia.column_names == ["store_id", "description", "amount"]
+
+
+def test_pedidos_fuera_de_orden(tmp_path):
+    cursor = CursorStore("bonos", escribir_bonos(tmp_path / "bonos.parquet", [1, 2, 3]))
+    cursor.filas(2)
+    with pytest.raises(ValueError, match="fuera de orden"):
+        cursor.filas(1)
+
+
+def test_row_groups_desordenados_se_detectan_al_abrir(tmp_path):
+    with pytest.raises(ValueError, match="row group 1"):
+        CursorStore("bonos", escribir_bonos(tmp_path / "bonos.parquet", [1, 3, 2, 4]), batch_size=2)
+
+
+def test_desorden_dentro_de_un_row_group_se_detecta_al_leer(tmp_path):
+    archivo = escribir_bonos(tmp_path / "bonos.parquet", [1, 3, 2, 4], row_group_size=10)
+    cursor = CursorStore("bonos", archivo, batch_size=2)
+    assert cursor.filas(1).num_rows == 1
+    with pytest.raises(ValueError, match="no está ordenado"):
+        cursor.filas(4)
+
+
+def test_orden_recorrido_sigue_el_tipo_del_detalle(tmp_path):
+    # Agentes int y detalle string: el detalle está ordenado como texto ("10" < "2")
+    archivo = escribir_bonos(tmp_path / "bonos.parquet", ["1", "10", "10", "2", "3"])
+    cursores = {"bonos": CursorStore("bonos", archivo, batch_size=2)}
+    ids_agentes = [1, 2, 3, 10]
+    ids_por_tipo = {"bonos": pa.array(ids_agentes).cast(pa.string()).to_pylist()}
+
+    orden = _orden_recorrido(ids_por_tipo, cursores)
+    assert [ids_agentes[posicion] for posicion in orden] == [1, 10, 2, 3]
+    filas = [cursores["bonos"].filas(ids_por_tipo["bonos"][posicion]).num_rows for posicion in orden]
+    assert filas == [1, 2, 1, 1]
+
+
+def test_orden_recorrido_rechaza_detalles_mixtos(tmp_path):
+    cursores = {
+        "bonos": CursorStore("bonos", escribir_bonos(tmp_path / "a.parquet", [1, 2])),
+        "descuentos": CursorStore("bonos", escribir_bonos(tmp_path / "b.parquet", ["1", "2"])),
+    }
+    with pytest.raises(ValueError, match="mezcla tipos"):
+        _orden_recorrido({"bonos": [1, 2], "descuentos": ["1", "2"]}, cursores)
+
+
+class GeneradorPrueba:
+    """
+    Generador mínimo: "falla" lanza una excepción, el resto se genera.
+    """
+
+    def __init__(self):
+        self.generados = []
+
+    def generar_agente(self, store_id, row, datos, config, cabecera):
+        if row["merchant"] == "falla":
+            raise RuntimeError("render fallido")
+        self.generados.append(store_id)
+        return "generado"
+
+    def extraer_subidas_fallidas(self):
+        return set()
+
+    def guardar_manifiestos(self):
+        pass
+
+
+def escribir_dataset(ruta, tipo, store_ids):
+    columnas = {columna: [0.0] * len(store_ids) for columna in COLUMNAS_DATASET[tipo]}
+    columnas.update({columna: ["x"] * len(store_ids) for columna in COLUMNAS_DATASET[tipo] if "description" in columna})
+    columnas["store_id"] = pd.array(store_ids, dtype="string")
+    pd.DataFrame(columnas).to_parquet(ruta / tipo)
+
+
+def test_generar_en_streaming_registra_el_conteo(tmp_path, monkeypatch, caplog):
+    escribir_dataset(tmp_path, "contraprestacion", ["1", "2", "4"])
+    for tipo in ["bonos", "descuentos", "reembolso", "adquirencia"]:
+        escribir_dataset(tmp_path, tipo, [])
+    monkeypatch.setattr(streaming, "construir_path_parquet", lambda tipo, config: str(tmp_path / tipo))
+
+    agentes = pd.DataFrame({
+        "store_id": ["1", "2", "3", "4"], "merchant": ["ok", "falla", "ok", "ok"], "store_owner": "o",
+        "address": "a", "province": "p", "region": "r", "email": "e"
+    })
+    generador = GeneradorPrueba()
+    config = {
+        "periodo": {"mes": 7, "anio": 2025}, "ejecucion": {"max_workers": 2}, "logo_base64": "",
+        "textos_fijos": {"informacion_adicional": "", "nota_importante": "", "campanas_activas": ""}
+    }
+
+    with caplog.at_level(logging.INFO):
+        generar_en_streaming(
+            config, agentes, {"contraprestacion": (generador, "detalle_contra")},
+            {"contraprestacion": {"4"}}, fsspec.filesystem("file")
+        )
+
+    assert generador.generados == ["1"]
+    assert ("contraprestacion: 1 generados, 1 sin datos, 0 sin cambios, 1 con error (de 3 pendientes)."
+            in caplog.text)
@@ -0,0 +1,48 @@
+import os
+import shutil
+import pytest
+
+pytest.importorskip("pdfkit")
+from modules.pdf_generator import PDFGeneratorContraprestaciones, compilar_templates  # noqa: E402
+
+# "{#" abre un comentario Jinja2: si la hoja de estilos se compilara como template, la precompilación fallaría
+CSS_CON_LLAVES = "\n/* selector a{#b */\n.marca-prueba { color: #{c0ffee}; }\n"
+
+
+@pytest.fixture
+def templates(tmp_path):
+    directorio = tmp_path / "templates"
+    shutil.copytree(os.path.join(os.path.dirname(os.path.dirname(__file__)), "templates"), directorio)
+    with open(directorio / "estilos" / "template_contraprestaciones.css", "a", encoding="utf-8") as f:
+        f.write(CSS_CON_LLAVES)
+    return directorio
+
+
+def test_precompila_solo_los_html(templates, tmp_path):
+    destino = compilar_templates(str(templates), str(tmp_path / "compilados"))
+    html = [ruta for _, _, archivos in os.walk(templates) for ruta in archivos if ruta.endswith(".html")]
+    assert len([m for m in os.listdir(destino) if m.endswith(".py")]) == len(html)
+    # Misma huella: se reutiliza el directorio publicado
+    assert compilar_templates(str(templates), str(tmp_path / "compilados")) == destino
+
+
+def html_agente(config: dict, datos: dict) -> str:
+    generador = PDFGeneratorContraprestaciones(config)
+    ruta = config["rutas"]["template_contraprestaciones"]
+    row = datos["agentes"].to_dict(orient="records")[0]
+    context = generador.construir_contexto(row["store_id"], row, datos, config)
+    context = dict(context, fijos=generador.fragmentos_fijos(ruta, context))
+    return generador._obtener_template(ruta).render(context)
+
+
+def test_precompilado_renderiza_igual_que_filesystem(templates, tmp_path, config_generadores, datos_sinteticos):
+    config = dict(config_generadores, rutas=dict(config_generadores["rutas"]))
+    config["rutas"]["template_contraprestaciones"] = str(templates / "template_contraprestaciones.html")
+    precompilado = dict(config, opciones={
+        "precompilar_templates": True, "directorio_templates_compilados": str(tmp_path / "compilados")
+    })
+
+    html = html_agente(precompilado, datos_sinteticos)
+    assert CSS_CON_LLAVES.strip() in html
+    assert "BODEGA ÑANDÚ" in html
+    assert html == html_agente(config, datos_sinteticos)
@@ -0,0 +1,177 @@
+import errno
+import threading
+import boto3
+import pytest
+from botocore.exceptions import ClientError, EndpointConnectionError
+from modules import transferencias_s3
+from modules.transferencias_s3 import TransferenciasS3, _es_transitorio, opciones_transferencias
+
+# Dependencias opcionales: aiobotocore para el motor y moto como S3 local
+pytest.importorskip("aiobotocore")
+ThreadedMotoServer = pytest.importorskip("moto.server").ThreadedMotoServer
+
+BUCKET = "estados-prueba"
+
+
+@pytest.fixture(scope="module")
+def endpoint():
+    servidor = ThreadedMotoServer(port=0, verbose=False)
+    servidor.start()
+    yield f"http://127.0.0.1:{servidor.get_host_and_port()[1]}"
+    servidor.stop()
+
+
+@pytest.fixture
+def s3(endpoint, monkeypatch):
+    for variable, valor in {"AWS_ACCESS_KEY_ID": "prueba", "AWS_SECRET_ACCESS_KEY": "prueba", "AWS_DEFAULT_REGION": "us-east-1"}.items():
+        monkeypatch.setenv(variable, valor)
+    # Sin modules/aws_credentials.py: credenciales de prueba para moto
+    monkeypatch.setattr(
+        transferencias_s3, "credenciales",
+        lambda cuenta: {"aws_access_key_id": "prueba", "aws_secret_access_key": "prueba", "aws_session_token": None}
+    )
+    cliente = boto3.client("s3", endpoint_url=endpoint)
+    cliente.create_bucket(Bucket=BUCKET)
+    yield cliente
+    for obj in cliente.list_objects_v2(Bucket=BUCKET).get("Contents", []):
+        cliente.delete_object(Bucket=BUCKET, Key=obj["Key"])
+    cliente.delete_bucket(Bucket=BUCKET)
+
+
+@pytest.fixture
+def motor(s3, endpoint):
+    config = {"s3": {"transferencias": {
+        "habilitado": True, "endpoint_url": endpoint, "max_en_vuelo": 8, "reintentos": 3, "espera_base_segundos": 0.01
+    }}}
+    motor = TransferenciasS3("output", opciones_transferencias(config), config)
+    yield motor
+    motor.cerrar()
+
+
+def error_s3(codigo: str, estado: int) -> ClientError:
+    return ClientError({"Error": {"Code": codigo}, "ResponseMetadata": {"HTTPStatusCode": estado}}, "PutObject")
+
+
+def interceptar_put(motor, fallos: list):
+    """
+    Reemplaza put_object del cliente aiobotocore: las primeras llamadas lanzan los errores de fallos.
+    """
+    original = motor._cliente.put_object
+    llamadas = []
+
+    async def put_object(**argumentos):
+        llamadas.append(argumentos["Key"])
+        if len(llamadas) <= len(fallos):
+            raise fallos[len(llamadas) - 1]
+        return await original(**argumentos)
+
+    motor._cliente.put_object = put_object
+    return llamadas
+
+
+@pytest.mark.parametrize("error, transitorio", [
+    (error_s3("SlowDown", 503), True),
+    (error_s3("InternalError", 500), True),
+    (error_s3("AccessDenied", 403), False),
+    (error_s3("NoSuchBucket", 404), False),
+    (EndpointConnectionError(endpoint_url="http://s3"), True),
+    (ConnectionResetError(errno.ECONNRESET, "reset"), True),
+    (TimeoutError(), True),
+    (OSError(errno.ENETUNREACH, "network unreachable"), True),
+    (FileNotFoundError(errno.ENOENT, "no existe"), False),
+    (PermissionError(errno.EACCES, "sin permiso"), False),
+    (ValueError("otro"), False),
+])
+def test_es_transitorio(error, transitorio):
+    assert _es_transitorio(error) is transitorio
+
+
+def test_subidas_en_paralelo(motor, s3):
+    en_vuelo, maximo, lock = 0, 0, threading.Lock()
+    original = motor._cliente.put_object
+
+    async def put_object(**argumentos):
+        nonlocal en_vuelo, maximo
+        with lock:
+            en_vuelo += 1
+            maximo = max(maximo, en_vuelo)
+        try:
+            return await original(**argumentos)
+        finally:
+            with lock:
+                en_vuelo -= 1
+
+    motor._cliente.put_object = put_object
+    futuros = [motor.subir(BUCKET, f"202507/{i}.pdf", f"%PDF {i}".encode(), ContentType="application/pdf") for i in range(40)]
+    motor.esperar()
+
+    assert all(futuro.done() and futuro.exception() is None for futuro in futuros)
+    assert s3.list_objects_v2(Bucket=BUCKET)["KeyCount"] == 40
+    assert s3.get_object(Bucket=BUCKET, Key="202507/7.pdf")["Body"].read() == b"%PDF 7"
+    assert 1 < maximo <= 8
+
+
+def test_reintento_ante_error_transitorio(motor, s3):
+    llamadas = interceptar_put(motor, [error_s3("SlowDown", 503), ConnectionResetError(errno.ECONNRESET, "reset")])
+    motor.subir(BUCKET, "202507/1.pdf", b"%PDF").result(timeout=30)
+
+    assert llamadas == ["202507/1.pdf"] * 3
+    assert s3.get_object(Bucket=BUCKET, Key="202507/1.pdf")["Body"].read() == b"%PDF"
+
+
+def test_error_permanente_no_se_reintenta(motor, s3):
+    llamadas = interceptar_put(motor, [error_s3("AccessDenied", 403)])
+    with pytest.raises(ClientError):
+        motor.subir(BUCKET, "202507/1.pdf", b"%PDF").result(timeout=30)
+    assert len(llamadas) == 1
+
+
+def test_reintentos_agotados(motor):
+    llamadas = interceptar_put(motor, [error_s3("SlowDown", 503)] * 10)
+    with pytest.raises(ClientError):
+        motor.subir(BUCKET, "202507/1.pdf", b"%PDF").result(timeout=30)
+    assert len(llamadas) == 1 + 3
+
+
+def test_descarga_inexistente_es_none(motor, s3):
+    s3.put_object(Bucket=BUCKET, Key="202507/1.pdf", Body=b"%PDF")
+    assert motor.descargar_varios({"1.pdf": (BUCKET, "202507/1.pdf"), "2.pdf": (BUCKET, "202507/2.pdf")}) == {
+        "1.pdf": b"%PDF", "2.pdf": None
+    }
+
+
+def test_subidas_fallidas_del_generador(s3, endpoint, monkeypatch):
+    pytest.importorskip("pdfkit")
+    from modules import pdf_generator
+    from modules.ejecucion import ESTADOS, reclasificar_fallidas, subidas_fallidas
+
+    class MotorFijo:
+        nombre = "fijo"
+
+        def renderizar(self, *argumentos):
+            return b"%PDF-1.4 prueba"
+
+    monkeypatch.setattr(pdf_generator, "obtener_motor", lambda config, tipo: MotorFijo())
+    config = {
+        "periodo": {"mes": 7, "anio": 2025},
+        "rutas": {"template_reembolso": "templates/template_reembolso.html",
+                  "salida_s3": {"reembolso": f"s3://{BUCKET}/reembolso/"}},
+        "s3": {"transferencias": {"habilitado": True, "endpoint_url": endpoint, "reintentos": 1, "espera_base_segundos": 0.01}}
+    }
+    try:
+        generador = pdf_generator.PDFGeneratorReembolso(config, s3_client=s3)
+        interceptar_put(generador.transferencias, [error_s3("AccessDenied", 403), error_s3("AccessDenied", 403)])
+        for store_id in ["1", "2", "3", "4"]:
+            assert generador._render_pdf(config["rutas"]["template_reembolso"], {"store_id": store_id}, "reembolso", store_id)
+
+        conteo = {"reembolso": dict.fromkeys(ESTADOS, 0)}
+        conteo["reembolso"]["generado"] = 4
+        fallidas = subidas_fallidas({"reembolso": generador})
+        reclasificar_fallidas(conteo, fallidas)
+    finally:
+        transferencias_s3.cerrar_transferencias()
+
+    # Las dos primeras subidas fallan (put_object se ejecuta en orden de llegada al event loop)
+    assert fallidas == {"reembolso": {"1", "2"}}
+    assert conteo["reembolso"]["generado"] == 2 and conteo["reembolso"]["error"] == 2
+    assert s3.list_objects_v2(Bucket=BUCKET, Prefix="reembolso/")["KeyCount"] == 2
@@ -0,0 +1,89 @@
+import logging
+import threading
+import boto3
+import pytest
+from botocore.exceptions import ClientError
+from modules.almacenamiento import ClienteLocal
+from modules.utils_s3 import obtener_pdf_s3, obtener_pdfs_s3, separar_uri_s3
+
+ThreadedMotoServer = pytest.importorskip("moto.server").ThreadedMotoServer
+
+BUCKET = "adjuntos-prueba"
+
+
+@pytest.fixture(scope="module")
+def s3():
+    servidor = ThreadedMotoServer(port=0, verbose=False)
+    servidor.start()
+    cliente = boto3.client(
+        "s3", endpoint_url=f"http://127.0.0.1:{servidor.get_host_and_port()[1]}",
+        aws_access_key_id="prueba", aws_secret_access_key="prueba", region_name="us-east-1"
+    )
+    cliente.create_bucket(Bucket=BUCKET)
+    cliente.put_object(Bucket=BUCKET, Key="contraprestacion/202507/100001.pdf", Body=b"%PDF-contra")
+    cliente.put_object(Bucket=BUCKET, Key="reembolso/202507/100001.pdf", Body=b"%PDF-reembolso")
+    yield cliente
+    servidor.stop()
+
+
+def test_separar_uri_s3():
+    assert separar_uri_s3("s3://bucket/ruta/archivo.pdf") == ("bucket", "ruta/archivo.pdf")
+    assert separar_uri_s3("s3://bucket/") == ("bucket", "")
+
+
+def test_pdf_existente(s3):
+    assert obtener_pdf_s3(s3, BUCKET, "contraprestacion/202507/100001.pdf") == b"%PDF-contra"
+
+
+def test_no_such_key_es_none(s3, caplog):
+    with caplog.at_level(logging.WARNING):
+        assert obtener_pdf_s3(s3, BUCKET, "adquirencia/202507/100001.pdf") is None
+    assert "adquirencia/202507/100001.pdf" in caplog.text
+
+
+def test_bucket_inexistente_no_es_un_faltante(s3):
+    # Solo NoSuchKey es "el agente no tiene ese PDF"; otros errores se propagan
+    with pytest.raises(ClientError) as error:
+        obtener_pdf_s3(s3, "bucket-que-no-existe", "x.pdf")
+    assert error.value.response["Error"]["Code"] == "NoSuchBucket"
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_varios_en_paralelo_conservan_el_orden(s3, max_workers):
+    objetos = {
+        "adquirencia": (BUCKET, "adquirencia/202507/100001.pdf"),
+        "contraprestacion": (BUCKET, "contraprestacion/202507/100001.pdf"),
+        "reembolso": (BUCKET, "reembolso/202507/100001.pdf"),
+    }
+    pdfs = obtener_pdfs_s3(s3, objetos, max_workers=max_workers)
+    assert list(pdfs) == list(objetos)
+    assert pdfs == {"adquirencia": None, "contraprestacion": b"%PDF-contra", "reembolso": b"%PDF-reembolso"}
+
+
+def test_varios_usan_hilos():
+    hilos = set()
+
+    class ClienteSinObjetos(ClienteLocal):
+        def get_object(self, Bucket, Key):
+            hilos.add(threading.get_ident())
+            raise self.exceptions.NoSuchKey(Key)
+
+    pdfs = obtener_pdfs_s3(ClienteSinObjetos(), {str(i): ("", f"/no/existe/{i}.pdf") for i in range(3)})
+    assert pdfs == {"0": None, "1": None, "2": None}
+    assert threading.get_ident() not in hilos
+
+
+def test_un_solo_objeto_y_ninguno(s3):
+    assert obtener_pdfs_s3(s3, {"contraprestacion": (BUCKET, "contraprestacion/202507/100001.pdf")}) == {
+        "contraprestacion": b"%PDF-contra"
+    }
+    assert obtener_pdfs_s3(s3, {}) == {}
+
+
+def test_cliente_local(tmp_path):
+    ruta = tmp_path / "reembolso" / "202507" / "100001.pdf"
+    ruta.parent.mkdir(parents=True)
+    ruta.write_bytes(b"%PDF-local")
+    bucket, key = separar_uri_s3(f"file://{ruta}")
+    assert obtener_pdf_s3(ClienteLocal(), bucket, key) == b"%PDF-local"
+    assert obtener_pdf_s3(ClienteLocal(), bucket, key.replace("100001", "100002")) is None